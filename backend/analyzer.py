@@ -1,16 +1,22 @@
 """TF-Lite bird analysis: watches StreamData/ and runs inference on new WAV files."""
 
+import argparse
+import heapq
+import multiprocessing
+import os
+import queue
 import signal
-import subprocess
 import sys
+import threading
 import time
 import logging
-from collections import defaultdict
-from dataclasses import dataclass
-from datetime import datetime
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, replace
+from datetime import date, datetime, timedelta
 from pathlib import Path
 
-import librosa
 import numpy as np
 import yaml
 
@@ -25,11 +31,22 @@ except ImportError:
         from tensorflow.lite.python.interpreter import Interpreter
         _INTERP_BACKEND = "tensorflow.lite"
 
+# Selects the op resolver without XNNPACK when model.xnnpack is false
+_OpResolverType = getattr(sys.modules[Interpreter.__module__], "OpResolverType", None)
+
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
+import capture
+import clip_encoder
 import database
+import metrics
+import remote_client
+import score_store
 import spectrogram as spec_module
+from audio_loader import audio_duration, iter_blocks, load_audio
+from capture import StreamCapture
+from energy_gate import EnergyGate
 
 logging.basicConfig(
     level=logging.INFO,
@@ -43,9 +60,24 @@ config = None
 interpreter = None
 input_details = None
 output_details = None
+batch_size = 1
 labels = []
+label_scientific: np.ndarray = np.empty(0, dtype=object)  # parallel to labels
+label_common: np.ndarray = np.empty(0, dtype=object)
 data_dir = None
 
+_DEBUG_TOP_K = 5
+
+# Location/season species filter (see load_species_filter)
+_species_source: str | None = None  # "model", "list" or None (no filtering)
+_species_cache: dict[tuple[int, int], np.ndarray] = {}  # ISO (year, week) -> label indices
+_meta_interpreter = None
+
+energy_gate: EnergyGate | None = None
+_worker_gates: dict[int, dict] = {}  # pool mode: worker pid -> its latest gate snapshot
+raw_scores: score_store.ScoreStore | None = None
+_pool_worker = False  # set in pool workers, which return scores to the parent's store
+
 
 def load_config():
     global config, data_dir
@@ -58,11 +90,43 @@ def load_config():
                 data_dir, config["confidence_threshold"])
 
 
-def load_model():
-    global interpreter, input_details, output_details
-    model_path = Path(__file__).parent / config["model"]["path"]
+def _model_path(variant: str | None = None) -> Path:
+    """Resolve the model file for a variant (fp32/fp16/int8) from config."""
+    model_cfg = config["model"]
+    variants = model_cfg.get("variants")
+    if not variants:
+        return Path(__file__).parent / model_cfg["path"]
+    variant = variant or model_cfg.get("variant", "fp32")
+    if variant not in variants:
+        logger.error("Unknown model variant %r (have: %s)", variant, ", ".join(variants))
+        sys.exit(1)
+    return Path(__file__).parent / variants[variant]
+
+
+def _make_interpreter(model_path: Path, num_threads: int | None, xnnpack: bool):
+    kwargs = {"model_path": str(model_path)}
+    if num_threads:
+        kwargs["num_threads"] = num_threads
+    if not xnnpack:
+        if _OpResolverType is None:
+            logger.warning("%s cannot disable XNNPACK — ignoring model.xnnpack", _INTERP_BACKEND)
+        else:
+            kwargs["experimental_op_resolver_type"] = \
+                _OpResolverType.BUILTIN_WITHOUT_DEFAULT_DELEGATES
+    return Interpreter(**kwargs)
+
+
+def load_model(variant: str | None = None, num_threads: int | None = None,
+               xnnpack: bool | None = None):
+    """Load the configured model variant; arguments override config (used by --bench-model)."""
+    global interpreter, input_details, output_details, batch_size
+    model_cfg = config["model"]
+    model_path = _model_path(variant)
+    num_threads = num_threads if num_threads is not None else model_cfg.get("num_threads")
+    xnnpack = xnnpack if xnnpack is not None else bool(model_cfg.get("xnnpack", True))
     logger.info("TFLite backend: %s", _INTERP_BACKEND)
-    logger.info("Loading model from %s", model_path)
+    logger.info("Loading model from %s (num_threads=%s, xnnpack=%s)",
+                model_path, num_threads or "default", xnnpack)
 
     if not model_path.exists():
         logger.error("Model file NOT FOUND: %s", model_path)
@@ -70,18 +134,36 @@ def load_model():
 
     logger.debug("Model file size: %.1f MB", model_path.stat().st_size / 1e6)
 
-    interpreter = Interpreter(model_path=str(model_path))
+    interpreter = _make_interpreter(model_path, num_threads, xnnpack)
+    input_details = interpreter.get_input_details()
+
+    # Resize the input tensor so one invoke() covers several chunks
+    batch_size = max(1, int(model_cfg.get("batch_size", 1)))
+    if batch_size > 1:
+        shape = list(input_details[0]["shape"])
+        if len(shape) == 2:
+            try:
+                interpreter.resize_tensor_input(input_details[0]["index"],
+                                                [batch_size, shape[1]])
+            except Exception as e:
+                logger.warning("Could not resize input to batch %d (%s) — using 1",
+                               batch_size, e)
+                batch_size = 1
+        else:
+            logger.warning("Input shape %s has no batch axis — using batch_size=1", shape)
+            batch_size = 1
+
     interpreter.allocate_tensors()
     input_details = interpreter.get_input_details()
     output_details = interpreter.get_output_details()
 
-    logger.info("Model loaded. Input shape=%s dtype=%s | Output shape=%s dtype=%s",
+    logger.info("Model loaded. Input shape=%s dtype=%s | Output shape=%s dtype=%s | batch_size=%d",
                 input_details[0]["shape"], input_details[0]["dtype"],
-                output_details[0]["shape"], output_details[0]["dtype"])
+                output_details[0]["shape"], output_details[0]["dtype"], batch_size)
 
 
 def load_labels():
-    global labels
+    global labels, label_scientific, label_common
     labels_path = Path(__file__).parent / config["model"]["labels"]
     logger.debug("Loading labels from %s", labels_path)
 
@@ -91,24 +173,138 @@ def load_labels():
 
     with open(labels_path) as f:
         labels = [line.strip() for line in f if line.strip()]
+
+    # Split "Scientific name_Common Name" once instead of on every detection
+    scientific, common = [], []
+    for label in labels:
+        sci, _, com = label.partition("_")
+        scientific.append(sci)
+        common.append(com or sci)
+    label_scientific = np.array(scientific, dtype=object)
+    label_common = np.array(common, dtype=object)
+
     logger.info("Loaded %d labels. First: %r  Last: %r", len(labels), labels[0], labels[-1])
 
 
+def _birdnet_week(day: date) -> int:
+    """BirdNET's 48-week year: four weeks per month."""
+    return (day.month - 1) * 4 + min(4, (day.day - 1) // 7 + 1)
+
+
+def _load_species_list(path: Path) -> np.ndarray:
+    """Mask from a file of allowed species (full labels or scientific names)."""
+    with open(path) as f:
+        wanted = {line.strip() for line in f if line.strip()}
+    mask = np.array([label in wanted or sci in wanted
+                     for label, sci in zip(labels, label_scientific)], dtype=bool)
+    unknown = len(wanted) - int(mask.sum())
+    if unknown > 0:
+        logger.warning("Species list %s: %d entr(y/ies) matched no label", path.name, unknown)
+    return mask
+
+
+def _species_mask_from_model(week_48: int) -> np.ndarray:
+    """Mask from the BirdNET metadata model for this station's coordinates."""
+    global _meta_interpreter
+    sf_cfg = config.get("species_filter", {})
+    if _meta_interpreter is None:
+        meta_path = Path(__file__).parent / sf_cfg["meta_model"]
+        _meta_interpreter = Interpreter(model_path=str(meta_path))
+        _meta_interpreter.allocate_tensors()
+    inp = _meta_interpreter.get_input_details()[0]
+    out = _meta_interpreter.get_output_details()[0]
+    sample = np.array([[config["latitude"], config["longitude"], week_48]], dtype=np.float32)
+    _meta_interpreter.set_tensor(inp["index"], sample)
+    _meta_interpreter.invoke()
+    scores = _meta_interpreter.get_tensor(out["index"]).reshape(-1)[:len(labels)]
+    return scores >= float(sf_cfg.get("threshold", 0.03))
+
+
+def load_species_filter():
+    """Decide whether detections are restricted to a location/season species set."""
+    global _species_source
+    _species_cache.clear()
+    _species_source = None
+    sf_cfg = config.get("species_filter", {})
+    if not sf_cfg.get("enabled", False):
+        logger.info("Species filter disabled — scoring all %d classes", len(labels))
+        return
+
+    base = Path(__file__).parent
+    if sf_cfg.get("species_list"):
+        list_path = base / sf_cfg["species_list"]
+        if not list_path.exists():
+            logger.error("Species list NOT FOUND: %s — filter disabled", list_path)
+            return
+        _species_source = "list"
+    else:
+        if config.get("latitude", 0.0) == 0.0 and config.get("longitude", 0.0) == 0.0:
+            logger.warning("latitude/longitude not set — species filter disabled")
+            return
+        meta_path = base / sf_cfg.get("meta_model", "")
+        if not meta_path.is_file():
+            logger.error("Metadata model NOT FOUND: %s — species filter disabled", meta_path)
+            return
+        _species_source = "model"
+
+    allowed = _allowed_species(datetime.now())
+    logger.info("Species filter (%s): %d of %d classes allowed this week",
+                _species_source, len(allowed), len(labels))
+
+
+def _allowed_species(when: datetime) -> np.ndarray | None:
+    """Label indices allowed at this date, cached per ISO week; None = all."""
+    if _species_source is None:
+        return None
+    iso = when.isocalendar()
+    key = (iso[0], iso[1])
+    allowed = _species_cache.get(key)
+    if allowed is None:
+        if _species_source == "list":
+            mask = _load_species_list(Path(__file__).parent / config["species_filter"]["species_list"])
+        else:
+            mask = _species_mask_from_model(_birdnet_week(when.date()))
+        allowed = np.flatnonzero(mask)
+        _species_cache[key] = allowed
+        logger.debug("Species mask for ISO week %d-W%02d: %d classes", key[0], key[1], len(allowed))
+    return allowed
+
+
 def _sigmoid(x: np.ndarray) -> np.ndarray:
     """Apply sigmoid to convert raw logits to probabilities (0–1)."""
     return 1.0 / (1.0 + np.exp(-np.clip(x, -15.0, 15.0)))
 
 
+_PCM_SCALE = np.float32(32768.0)
+
+
 @dataclass
 class PendingDetection:
-    """A detection buffered until the species reaches the confirmation threshold."""
-    audio_chunk: np.ndarray
+    """A detection buffered until the species reaches the confirmation threshold.
+
+    Held audio is int16 (half the size of float32, and lossless for audio
+    that came from the recorder's S16_LE WAVs). Detections saved straight
+    away keep their float32 chunk and skip the round trip.
+    """
+    audio_pcm: np.ndarray | None
     sr: int
     detection_time: datetime
     common_name: str
     scientific_name: str
     confidence: float
-    mono_ts: float  # time.monotonic() when recorded
+    ts: float  # tracker clock: audio time (epoch s) or time.monotonic()
+    pending: bool = True  # False once flushed, expired or evicted
+    audio_float: np.ndarray | None = None  # set instead of audio_pcm when not held
+
+    @property
+    def audio_chunk(self) -> np.ndarray:
+        if self.audio_float is not None:
+            return self.audio_float
+        return self.audio_pcm.astype(np.float32) / _PCM_SCALE
+
+    @property
+    def nbytes(self) -> int:
+        return 0 if self.audio_pcm is None else self.audio_pcm.nbytes
 
 
 class DetectionTracker:
@@ -117,94 +313,164 @@ class DetectionTracker:
     A species must be detected min_count times within window_seconds before
     any of its detections are saved. Once confirmed, subsequent detections
     for that species are saved immediately until the window expires.
+
+    Pending detections sit in per-species deques plus one global deque in
+    arrival order, so expiry only looks at the oldest entries. Their audio
+    counts against max_pending_bytes; past that budget the oldest pending
+    detections are evicted.
     """
 
-    def __init__(self, min_count: int, window_seconds: float):
+    def __init__(self, min_count: int, window_seconds: float,
+                 max_pending_bytes: int = 64 * 1024 * 1024):
         self.min_count = min_count
         self.window_seconds = window_seconds
-        self._pending: dict[str, list[PendingDetection]] = defaultdict(list)
-        self._confirmed: dict[str, float] = {}  # species -> mono_ts of confirmation
+        self.max_pending_bytes = max_pending_bytes
+        self._pending: dict[str, deque[PendingDetection]] = {}
+        self._order: deque[PendingDetection] = deque()  # all pending, oldest first
+        self._confirmed: dict[str, float] = {}  # species -> ts of confirmation
+        self._confirm_order: deque[tuple[float, str]] = deque()
+        self.pending_bytes = 0
+        self.stats = {"expired": 0, "evicted": 0, "flushed": 0}
 
     def track(self, audio_chunk: np.ndarray, sr: int, detection_time: datetime,
               common_name: str, scientific_name: str,
-              confidence: float) -> list[PendingDetection]:
-        """Buffer a detection and return any that should be saved now."""
+              confidence: float, now: float | None = None) -> list[PendingDetection]:
+        """Buffer a detection and return any that should be saved now.
+
+        now is the time the window is measured in; pass the audio's own
+        timestamp so files and backlogs analysed faster than real time are
+        filtered the way score_store.replay() models them. Defaults to
+        time.monotonic().
+        """
         det = PendingDetection(
-            audio_chunk=audio_chunk, sr=sr, detection_time=detection_time,
+            audio_pcm=None, audio_float=audio_chunk,
+            sr=sr, detection_time=detection_time,
             common_name=common_name, scientific_name=scientific_name,
-            confidence=confidence, mono_ts=time.monotonic(),
+            confidence=confidence, ts=time.monotonic() if now is None else now,
         )
 
         # Pass-through when filtering is disabled
         if self.min_count <= 1:
             return [det]
 
-        self._prune()
+        self._prune(det.ts)
 
-        # Already confirmed — save immediately
-        if scientific_name in self._confirmed:
+        # ts can go backwards (a live file analysed before the rest of a
+        # backlog), which _prune can't see, so only confirmations and pending
+        # hits within the window of this one in either direction count
+        confirmed_at = self._confirmed.get(scientific_name)
+        if confirmed_at is not None and abs(det.ts - confirmed_at) < self.window_seconds:
             logger.debug("  Species %s already confirmed — saving immediately", scientific_name)
             return [det]
 
         # Buffer and check threshold
-        self._pending[scientific_name].append(det)
-        count = len(self._pending[scientific_name])
+        det.audio_pcm = np.clip(audio_chunk * _PCM_SCALE, -32768, 32767).astype(np.int16)
+        det.audio_float = None
+        species_dets = self._pending.setdefault(scientific_name, deque())
+        for old in [d for d in species_dets if abs(det.ts - d.ts) >= self.window_seconds]:
+            species_dets.remove(old)
+            self._release(old)
+            self.stats["expired"] += 1
+            logger.debug("  Dropped pending detection for %s outside the window", scientific_name)
+        species_dets.append(det)
+        self._order.append(det)
+        self.pending_bytes += det.nbytes
+        count = len(species_dets)
         logger.debug("  Buffered detection #%d for %s (need %d)",
                      count, scientific_name, self.min_count)
 
         if count >= self.min_count:
             # Confirm species and flush all pending detections
-            self._confirmed[scientific_name] = time.monotonic()
-            flushed = self._pending.pop(scientific_name)
+            self._confirmed[scientific_name] = det.ts
+            self._confirm_order.append((det.ts, scientific_name))
+            # The caller gets copies; the originals left in _order drop their audio
+            flushed = [replace(d, pending=False) for d in self._pending.pop(scientific_name)]
+            for d in species_dets:
+                self._release(d)
+            self.stats["flushed"] += len(flushed)
             logger.info("  Species %s confirmed (%d detections in window) — "
                         "flushing %d pending", scientific_name, count, len(flushed))
             return flushed
 
+        self._enforce_budget()
         return []
 
-    def _prune(self):
+    def _release(self, det: PendingDetection):
+        """Stop accounting for det and free its audio.
+
+        det may stay in _order until it reaches the head, so its audio must
+        not be kept alive there.
+        """
+        det.pending = False
+        self.pending_bytes -= det.nbytes
+        det.audio_pcm = None
+
+    def _drop_oldest(self, det: PendingDetection):
+        """Remove det (the oldest entry for its species) from the species deque."""
+        species_dets = self._pending.get(det.scientific_name)
+        if species_dets:
+            if species_dets[0] is det:
+                species_dets.popleft()
+            else:
+                species_dets.remove(det)
+            if not species_dets:
+                del self._pending[det.scientific_name]
+        self._release(det)
+
+    def _enforce_budget(self):
+        """Evict the oldest pending detections until under max_pending_bytes."""
+        while self.pending_bytes > self.max_pending_bytes and self._order:
+            det = self._order.popleft()
+            if not det.pending:
+                continue
+            self._drop_oldest(det)
+            self.stats["evicted"] += 1
+            logger.warning("  Pending audio over budget (%d bytes) — evicted %s from %s",
+                           self.max_pending_bytes, det.scientific_name,
+                           det.detection_time.strftime("%H:%M:%S"))
+
+    def _prune(self, now: float | None = None):
         """Remove stale pending detections and expired confirmations."""
-        now = time.monotonic()
+        now = time.monotonic() if now is None else now
         cutoff = now - self.window_seconds
 
-        # Prune pending
-        stale_keys = []
-        for species, dets in self._pending.items():
-            before = len(dets)
-            self._pending[species] = [d for d in dets if d.mono_ts > cutoff]
-            pruned = before - len(self._pending[species])
-            if pruned:
-                logger.debug("  Pruned %d stale pending detection(s) for %s", pruned, species)
-            if not self._pending[species]:
-                stale_keys.append(species)
-        for key in stale_keys:
-            del self._pending[key]
+        # Prune pending — only the oldest entries can be stale
+        while self._order and (not self._order[0].pending or self._order[0].ts <= cutoff):
+            det = self._order.popleft()
+            if det.pending:
+                self._drop_oldest(det)
+                self.stats["expired"] += 1
+                logger.debug("  Pruned stale pending detection for %s", det.scientific_name)
 
         # Expire confirmations
-        expired = [sp for sp, ts in self._confirmed.items() if ts <= cutoff]
-        for sp in expired:
-            logger.debug("  Confirmation expired for %s", sp)
-            del self._confirmed[sp]
+        while self._confirm_order and self._confirm_order[0][0] <= cutoff:
+            ts, sp = self._confirm_order.popleft()
+            if self._confirmed.get(sp) == ts:
+                logger.debug("  Confirmation expired for %s", sp)
+                del self._confirmed[sp]
+
+    def snapshot(self) -> dict:
+        """Pending memory and counters for the stats log."""
+        return {
+            "pending": sum(len(d) for d in self._pending.values()),
+            "pending_bytes": self.pending_bytes,
+            "species_pending": len(self._pending),
+            **self.stats,
+        }
 
 
 detection_tracker: DetectionTracker | None = None
 
 
-def analyze_chunk(audio_chunk: np.ndarray, chunk_idx: int) -> list[tuple[str, str, float]]:
-    """Run inference on a 3s audio chunk.
-
-    Returns list of (common_name, scientific_name, confidence) tuples
-    where confidence is a sigmoid probability (0–1).
-    """
+def _expected_samples() -> int:
+    """Number of samples the model expects per chunk."""
     expected_shape = input_details[0]["shape"]
-    expected_samples = expected_shape[-1] if len(expected_shape) > 1 else expected_shape[0]
+    return int(expected_shape[-1] if len(expected_shape) > 1 else expected_shape[0])
 
-    logger.debug("  Chunk %d: raw audio samples=%d, min=%.4f, max=%.4f, rms=%.4f",
-                 chunk_idx, len(audio_chunk),
-                 float(audio_chunk.min()), float(audio_chunk.max()),
-                 float(np.sqrt(np.mean(audio_chunk ** 2))))
 
-    # Pad or trim to expected length
+def _fit_chunk(audio_chunk: np.ndarray, chunk_idx: int) -> np.ndarray:
+    """Pad or trim a chunk to the model's input length."""
+    expected_samples = _expected_samples()
     if len(audio_chunk) < expected_samples:
         logger.debug("  Chunk %d: padding %d → %d samples",
                      chunk_idx, len(audio_chunk), expected_samples)
@@ -213,44 +479,116 @@ def analyze_chunk(audio_chunk: np.ndarray, chunk_idx: int) -> list[tuple[str, st
         logger.debug("  Chunk %d: trimming %d → %d samples",
                      chunk_idx, len(audio_chunk), expected_samples)
         audio_chunk = audio_chunk[:expected_samples]
+    return audio_chunk
 
-    input_data = audio_chunk.astype(np.float32).reshape(expected_shape)
-
-    interpreter.set_tensor(input_details[0]["index"], input_data)
-    interpreter.invoke()
-
-    output_data = interpreter.get_tensor(output_details[0]["index"])
-    raw_logits = output_data.flatten()
-
-    logger.debug("  Chunk %d: raw logits  min=%.4f, max=%.4f, mean=%.4f",
-                 chunk_idx, float(raw_logits.min()), float(raw_logits.max()),
-                 float(raw_logits.mean()))
 
-    predictions = _sigmoid(raw_logits)
-
-    logger.debug("  Chunk %d: sigmoid probs min=%.4f, max=%.4f, mean=%.4f",
-                 chunk_idx, float(predictions.min()), float(predictions.max()),
-                 float(predictions.mean()))
-
-    # Log top-5 predictions regardless of threshold
-    top5_idx = np.argsort(predictions)[-5:][::-1]
-    logger.debug("  Chunk %d: top-5 predictions (threshold=%.2f):",
-                 chunk_idx, config["confidence_threshold"])
-    for rank, idx in enumerate(top5_idx):
-        label = labels[idx] if idx < len(labels) else f"<unknown idx {idx}>"
-        logger.debug("    #%d  conf=%.4f  label=%r", rank + 1, float(predictions[idx]), label)
+def _run_inference(batch: np.ndarray) -> np.ndarray:
+    """Invoke the interpreter over a (n, samples) float32 array.
 
+    Rows are fed batch_size at a time; a short final group is zero-padded so
+    the input tensor never has to be reallocated. Returns (n, classes) logits.
+    """
+    n = len(batch)
+    if batch_size == 1:
+        outputs = []
+        for row in batch:
+            interpreter.set_tensor(input_details[0]["index"],
+                                   _quantize_input(row.reshape(input_details[0]["shape"])))
+            with metrics.timed("invoke"):
+                interpreter.invoke()
+            outputs.append(_dequantize_output(
+                interpreter.get_tensor(output_details[0]["index"])).reshape(-1))
+        return np.stack(outputs)
+
+    outputs = []
+    for start in range(0, n, batch_size):
+        group = batch[start:start + batch_size]
+        if len(group) < batch_size:
+            group = np.concatenate(
+                [group, np.zeros((batch_size - len(group), group.shape[1]), dtype=np.float32)]
+            )
+        interpreter.set_tensor(input_details[0]["index"], _quantize_input(group))
+        with metrics.timed("invoke"):
+            interpreter.invoke()
+        out = _dequantize_output(interpreter.get_tensor(output_details[0]["index"]))
+        outputs.append(out.reshape(batch_size, -1)[:min(batch_size, n - start)])
+    return np.concatenate(outputs)
+
+
+def _quantize_input(x: np.ndarray) -> np.ndarray:
+    """Map float audio onto an integer input tensor (fully quantized models only)."""
+    dtype = input_details[0]["dtype"]
+    if not np.issubdtype(dtype, np.integer):
+        return x
+    scale, zero_point = input_details[0]["quantization"]
+    info = np.iinfo(dtype)
+    return np.clip(np.rint(x / scale + zero_point), info.min, info.max).astype(dtype)
+
+
+def _dequantize_output(y: np.ndarray) -> np.ndarray:
+    if not np.issubdtype(y.dtype, np.integer):
+        return y
+    scale, zero_point = output_details[0]["quantization"]
+    return (y.astype(np.float32) - zero_point) * scale
+
+
+def _logit(p: float) -> float:
+    """Inverse of _sigmoid for a scalar probability."""
+    if p <= 0.0:
+        return -np.inf
+    if p >= 1.0:
+        return np.inf
+    return float(np.log(p / (1.0 - p)))
+
+
+def _postprocess(raw_logits: np.ndarray, chunk_idx: int,
+                 allowed: np.ndarray | None = None) -> list[tuple[str, str, float]]:
+    """Turn one chunk's raw logits into (common_name, scientific_name, confidence) tuples.
+
+    Thresholding happens in logit space so the sigmoid only runs on the
+    handful of classes that can pass; diagnostics are computed only when
+    DEBUG logging is enabled. allowed, if given, restricts scoring to those
+    label indices (the species filter).
+    """
     threshold = config["confidence_threshold"]
-    results = []
-    for idx, conf in enumerate(predictions):
-        if conf >= threshold and idx < len(labels):
-            label = labels[idx]
-            if "_" in label:
-                scientific_name, common_name = label.split("_", 1)
-            else:
-                scientific_name = label
-                common_name = label
-            results.append((common_name, scientific_name, float(conf)))
+    if allowed is None:
+        raw_logits = raw_logits[:len(labels)]
+        label_idx = None
+    else:
+        raw_logits = raw_logits[allowed]
+        label_idx = allowed
+    if raw_logits.size == 0:
+        # Species filter allows nothing this week; min()/max() would raise
+        return []
+
+    if logger.isEnabledFor(logging.DEBUG):
+        predictions = _sigmoid(raw_logits)
+        logger.debug("  Chunk %d: raw logits  min=%.4f, max=%.4f, mean=%.4f",
+                     chunk_idx, float(raw_logits.min()), float(raw_logits.max()),
+                     float(raw_logits.mean()))
+        logger.debug("  Chunk %d: sigmoid probs min=%.4f, max=%.4f, mean=%.4f",
+                     chunk_idx, float(predictions.min()), float(predictions.max()),
+                     float(predictions.mean()))
+
+        # Log top-k predictions regardless of threshold
+        k = min(_DEBUG_TOP_K, len(predictions))
+        top_idx = np.argpartition(predictions, -k)[-k:] if k else np.empty(0, dtype=np.intp)
+        top_idx = top_idx[np.argsort(predictions[top_idx])[::-1]]
+        logger.debug("  Chunk %d: top-%d predictions (threshold=%.2f):",
+                     chunk_idx, k, threshold)
+        for rank, idx in enumerate(top_idx):
+            label = labels[idx if label_idx is None else label_idx[idx]]
+            logger.debug("    #%d  conf=%.4f  label=%r", rank + 1, float(predictions[idx]), label)
+
+    hits = np.flatnonzero(raw_logits >= _logit(threshold))
+    confs = _sigmoid(raw_logits[hits])
+    keep = confs >= threshold  # exact check against the clipped sigmoid
+    hits, confs = hits[keep], confs[keep]
+    if label_idx is not None:
+        hits = label_idx[hits]
+
+    results = list(zip(label_common[hits].tolist(), label_scientific[hits].tolist(),
+                       confs.tolist()))
 
     if results:
         logger.info("  Chunk %d: %d detection(s) above threshold %.2f",
@@ -264,6 +602,137 @@ def analyze_chunk(audio_chunk: np.ndarray, chunk_idx: int) -> list[tuple[str, st
     return results
 
 
+def analyze_batch(chunks: np.ndarray, chunk_indices: list[int],
+                  when: datetime | None = None,
+                  scores: list | None = None) -> list[list[tuple[str, str, float]]]:
+    """Run inference on a stack of model-length chunks.
+
+    chunks is a (n, samples) array; chunk_indices labels each row for logging.
+    when selects the species-filter week (default: now).
+    Returns one list of (common_name, scientific_name, confidence) per row.
+    If scores is a list, (rows, top-k label indices, probabilities) for the
+    raw-score store is appended to it, before any species filtering.
+    """
+    if len(chunks) == 0:
+        return []
+    logger.debug("  Batched inference: %d chunk(s), batch_size=%d", len(chunks), batch_size)
+    raw_logits = _run_inference(np.ascontiguousarray(chunks, dtype=np.float32))
+    if scores is not None:
+        top_idx, top_logits = score_store.top_k(raw_logits, _score_k())
+        scores.append((np.arange(len(chunks)), top_idx, _sigmoid(top_logits)))
+    allowed = _allowed_species(when or datetime.now())
+    with metrics.timed("postprocess"):
+        results = [_postprocess(raw_logits[i], chunk_idx, allowed)
+                   for i, chunk_idx in enumerate(chunk_indices)]
+    metrics.inc("chunks_analyzed", len(chunks))
+    metrics.inc("detections_raw", sum(len(r) for r in results))
+    return results
+
+
+def _score_k() -> int:
+    """Top-k width of the raw-score store, or 0 when it is disabled."""
+    cfg = config.get("score_store", {})
+    return int(cfg.get("top_k", 10)) if cfg.get("enabled", False) else 0
+
+
+def load_score_store():
+    """Open the per-day raw-score store (main process only; workers return scores)."""
+    global raw_scores
+    if not _score_k():
+        raw_scores = None
+        return
+    raw_scores = score_store.ScoreStore(data_dir / "scores", _score_k(), len(label_scientific))
+    logger.info("Raw-score store: top-%d per chunk in %s", raw_scores.k, raw_scores.scores_dir)
+
+
+def _close_score_store():
+    if raw_scores is not None:
+        raw_scores.close()
+        logger.info("Raw-score store: %d record(s) written", raw_scores.records)
+
+
+def _merge_scores(scores: list) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Concatenate the (rows, idx, probs) parts collected by analyze_batch."""
+    rows, idx, probs = (np.concatenate(part) for part in zip(*scores))
+    return rows, idx, probs
+
+
+def _store_scores(scores: list | None, times: list[datetime]):
+    """Append collected scores to the store; times is indexed by chunk row."""
+    if raw_scores is None or not scores:
+        return
+    rows, idx, probs = _merge_scores(scores)
+    raw_scores.append([times[r] for r in rows], idx, probs)
+
+
+def load_energy_gate():
+    """Set up the pre-inference energy gate from config (disabled by default)."""
+    global energy_gate
+    gate_cfg = config.get("energy_gate", {})
+    if not gate_cfg.get("enabled", False):
+        energy_gate = None
+        return
+    energy_gate = EnergyGate(
+        config["audio"]["sample_rate"],
+        band_hz=tuple(gate_cfg.get("band_hz", (1000, 10000))),
+        margin_db=float(gate_cfg.get("margin_db", 6.0)),
+        audit=bool(gate_cfg.get("audit", False)),
+    )
+    logger.info("Energy gate: band=%s Hz, margin=%.1f dB%s", gate_cfg.get("band_hz", (1000, 10000)),
+                energy_gate.margin_db, " (audit mode)" if energy_gate.audit else "")
+
+
+def _analyze_gated(chunks: np.ndarray, chunk_indices: list[int],
+                   when: datetime | None = None,
+                   scores: list | None = None) -> list[list[tuple[str, str, float]]]:
+    """analyze_batch, skipping chunks the energy gate judges empty.
+
+    In audit mode every chunk is still analyzed and detections on gated
+    chunks are counted as misses. Gated chunks get no raw-score record.
+    """
+    if energy_gate is None or len(chunks) == 0:
+        return analyze_batch(chunks, chunk_indices, when, scores)
+
+    with metrics.timed("gate"):
+        passed = energy_gate.evaluate(chunks)
+    metrics.inc("chunks_gated", int((~passed).sum()))
+    run = np.ones_like(passed) if energy_gate.audit else passed
+    selected = np.flatnonzero(run)
+    logger.debug("  Energy gate: %d of %d chunk(s) pass", int(passed.sum()), len(passed))
+
+    results: list[list[tuple[str, str, float]]] = [[] for _ in chunk_indices]
+    sub_scores = [] if scores is not None else None
+    sub = analyze_batch(chunks[selected], [chunk_indices[i] for i in selected], when, sub_scores)
+    for i, r in zip(selected, sub):
+        results[i] = r
+    if scores is not None:
+        scores.extend((selected[rows], idx, probs) for rows, idx, probs in sub_scores)
+
+    if energy_gate.audit:
+        gated = np.flatnonzero(~passed)
+        missed = sum(1 for i in gated if results[i])
+        if missed:
+            logger.info("  Energy gate audit: %d gated chunk(s) had detections", missed)
+        energy_gate.record_audit(missed, len(gated))
+    return results
+
+
+def analyze_chunk(audio_chunk: np.ndarray, chunk_idx: int) -> list[tuple[str, str, float]]:
+    """Run inference on a 3s audio chunk.
+
+    Returns list of (common_name, scientific_name, confidence) tuples
+    where confidence is a sigmoid probability (0–1).
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("  Chunk %d: raw audio samples=%d, min=%.4f, max=%.4f, rms=%.4f",
+                     chunk_idx, len(audio_chunk),
+                     float(audio_chunk.min()), float(audio_chunk.max()),
+                     float(np.sqrt(np.mean(audio_chunk ** 2))))
+
+    audio_chunk = _fit_chunk(audio_chunk, chunk_idx)
+    return analyze_batch(audio_chunk[np.newaxis, :], [chunk_idx])[0]
+
+
 def _wait_for_file_ready(path: Path, timeout: float = 15.0) -> bool:
     """Wait until the file size stops growing (i.e. arecord has finished writing)."""
     deadline = time.monotonic() + timeout
@@ -282,8 +751,38 @@ def _wait_for_file_ready(path: Path, timeout: float = 15.0) -> bool:
     return True  # proceed anyway
 
 
-def process_wav(wav_path: Path):
-    """Process a single WAV file: split into chunks, analyze, save detections."""
+@dataclass
+class PreparedWav:
+    """A decoded WAV split into model-length chunks, ready for inference."""
+    path: Path
+    sr: int
+    file_dt: datetime
+    chunk_indices: list[int]
+    chunk_offsets: list[float]  # window start, seconds from file_dt (negative for carried audio)
+    chunks: np.ndarray  # (n, samples) float32
+    # (chunk start times, top-k indices, probabilities) for the raw-score store
+    scores: tuple[list[datetime], np.ndarray, np.ndarray] | None = None
+
+
+# (end time, unanalysed tail) of the previous file, so overlapping windows
+# continue across consecutive recordings. Process-local: each pool worker
+# only carries audio between files it handles back to back.
+_carry: tuple[datetime, np.ndarray] | None = None
+
+
+def _window_hop(sr: int) -> int:
+    """Samples between window starts, from audio.overlap (seconds)."""
+    chunk_samples = sr * config["audio"]["chunk_duration"]
+    overlap = float(config["audio"].get("overlap", 0.0))
+    hop = chunk_samples - int(round(overlap * sr))
+    if not 0 < hop <= chunk_samples:
+        logger.warning("Invalid audio.overlap=%s — using non-overlapping windows", overlap)
+        return chunk_samples
+    return hop
+
+
+def prepare_wav(wav_path: Path) -> PreparedWav | None:
+    """Load a WAV file and split it into a stack of chunks."""
     logger.info(">>> Processing %s", wav_path.name)
 
     try:
@@ -291,23 +790,26 @@ def process_wav(wav_path: Path):
         logger.debug("  File size: %d bytes (%.1f KB)", file_size, file_size / 1024)
     except FileNotFoundError:
         logger.error("File not found (may have been deleted): %s", wav_path)
-        return
+        return None
 
     try:
-        audio, sr = librosa.load(str(wav_path), sr=config["audio"]["sample_rate"],
-                                 mono=True, res_type="kaiser_fast")
+        with metrics.timed("decode"):
+            audio, sr = load_audio(wav_path, config["audio"]["sample_rate"])
     except Exception as e:
         logger.error("Failed to load %s: %s", wav_path.name, e)
-        return
+        metrics.inc("files_failed")
+        return None
+    chunk_started = time.perf_counter()
 
     duration_s = len(audio) / sr
-    logger.info("  Audio loaded: duration=%.2fs, sr=%dHz, samples=%d, min=%.4f, max=%.4f, rms=%.4f",
-                duration_s, sr, len(audio),
-                float(audio.min()), float(audio.max()),
-                float(np.sqrt(np.mean(audio ** 2))))
+    rms = float(np.sqrt(np.dot(audio, audio) / max(1, len(audio))))
+    logger.info("  Audio loaded: duration=%.2fs, sr=%dHz, samples=%d, rms=%.4f",
+                duration_s, sr, len(audio), rms)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("  Audio range: min=%.4f, max=%.4f", float(audio.min()), float(audio.max()))
 
-    if float(np.sqrt(np.mean(audio ** 2))) < 1e-6:
-        logger.warning("  Audio appears to be silent (near-zero RMS) — skipping inference")
+    if rms < 1e-6:
+        logger.warning("  Audio appears to be silent (near-zero RMS)")
 
     chunk_duration = config["audio"]["chunk_duration"]
     chunk_samples = sr * chunk_duration
@@ -321,177 +823,1549 @@ def process_wav(wav_path: Path):
         logger.warning("  Could not parse timestamp from filename %r, using now()", stem)
         file_dt = datetime.now()
 
-    num_chunks = len(audio) // chunk_samples
-    remainder = len(audio) % chunk_samples
-    logger.debug("  chunk_samples=%d, num_full_chunks=%d, remainder=%d samples",
-                 chunk_samples, num_chunks, remainder)
-
-    chunks = []
-    for i in range(num_chunks):
-        start = i * chunk_samples
-        chunks.append((i, audio[start:start + chunk_samples]))
+    hop = _window_hop(sr)
+    if hop < chunk_samples:
+        chunks, chunk_offsets = _sliding_windows(audio, sr, file_dt, chunk_samples, hop)
+        chunks = [chunks]
+        chunk_indices = list(range(len(chunk_offsets)))
+    else:
+        num_chunks = len(audio) // chunk_samples
+        remainder = len(audio) % chunk_samples
+        logger.debug("  chunk_samples=%d, num_full_chunks=%d, remainder=%d samples",
+                     chunk_samples, num_chunks, remainder)
+
+        chunks = [audio[:num_chunks * chunk_samples].reshape(num_chunks, chunk_samples)]
+        chunk_indices = list(range(num_chunks))
+
+        if remainder >= min_samples:
+            logger.debug("  Last partial chunk (%d samples) >= min (%d) — padding and including",
+                         remainder, min_samples)
+            last_chunk = np.pad(audio[num_chunks * chunk_samples:],
+                                (0, chunk_samples - remainder))
+            chunks.append(last_chunk[np.newaxis, :])
+            chunk_indices.append(num_chunks)
+        elif remainder > 0:
+            logger.debug("  Last partial chunk (%d samples) < min (%d) — discarding",
+                         remainder, min_samples)
+        chunk_offsets = [float(i * chunk_duration) for i in chunk_indices]
+
+    stacked = np.concatenate(chunks).astype(np.float32, copy=False)
+    if chunk_samples != _expected_samples():
+        stacked = np.stack([_fit_chunk(c, i) for i, c in zip(chunk_indices, stacked)])
+
+    metrics.observe("chunk", time.perf_counter() - chunk_started)
+    metrics.inc("audio_seconds", duration_s)
+    return PreparedWav(path=wav_path, sr=sr, file_dt=file_dt,
+                       chunk_indices=chunk_indices, chunk_offsets=chunk_offsets,
+                       chunks=stacked)
+
+
+def _sliding_windows(audio: np.ndarray, sr: int, file_dt: datetime,
+                     chunk_samples: int, hop: int) -> tuple[np.ndarray, list[float]]:
+    """Overlapping windows as a strided view, continuing the previous file's tail.
+
+    Returns the (n, chunk_samples) view and each window's start offset in
+    seconds relative to file_dt. Audio after the last window start is kept
+    in _carry for the next file.
+    """
+    global _carry
+    lead = 0
+    if _carry is not None:
+        end_dt, tail = _carry
+        # Filenames have 1 s resolution; arecord restarts within that
+        if abs((file_dt - end_dt).total_seconds()) <= 1.0 and len(tail):
+            audio = np.concatenate([tail, audio])
+            lead = len(tail)
+            logger.debug("  Continuing %d carried samples from previous file", lead)
+        elif len(tail):
+            logger.debug("  Previous file not contiguous — dropping %d carried samples", len(tail))
+
+    if len(audio) >= chunk_samples:
+        n_windows = (len(audio) - chunk_samples) // hop + 1
+        windows = np.lib.stride_tricks.sliding_window_view(audio, chunk_samples)[::hop][:n_windows]
+    else:
+        n_windows = 0
+        windows = np.empty((0, chunk_samples), dtype=np.float32)
 
-    if remainder >= min_samples:
-        logger.debug("  Last partial chunk (%d samples) >= min (%d) — padding and including",
-                     remainder, min_samples)
-        last_chunk = np.pad(audio[num_chunks * chunk_samples:],
-                            (0, chunk_samples - remainder))
-        chunks.append((num_chunks, last_chunk))
-    elif remainder > 0:
-        logger.debug("  Last partial chunk (%d samples) < min (%d) — discarding",
-                     remainder, min_samples)
+    next_start = n_windows * hop
+    end_dt = file_dt + timedelta(seconds=(len(audio) - lead) / sr)
+    _carry = (end_dt, audio[next_start:].copy())
+    logger.debug("  %d window(s) of %d samples, hop=%d, carrying %d samples",
+                 n_windows, chunk_samples, hop, len(audio) - next_start)
 
-    logger.info("  Running inference on %d chunk(s)", len(chunks))
+    return windows, [(i * hop - lead) / sr for i in range(n_windows)]
 
-    total_detections = 0
-    for chunk_idx, chunk_audio in chunks:
-        chunk_offset = chunk_idx * chunk_duration
-        chunk_time = file_dt.replace(
-            second=min(59, file_dt.second + chunk_offset)
-        )
 
-        results = analyze_chunk(chunk_audio, chunk_idx)
-        total_detections += len(results)
+def _track_and_save(chunk_audio: np.ndarray, sr: int, chunk_time: datetime,
+                    chunk_results: list[tuple[str, str, float]]):
+    """Pass one chunk's detections through the tracker and save any it releases.
 
-        for common_name, scientific_name, confidence in results:
+    The tracker window runs on chunk_time rather than the wall clock, so a
+    backlog analysed in minutes is still confirmed per window of audio.
+    """
+    now = chunk_time.timestamp()
+    for common_name, scientific_name, confidence in chunk_results:
+        with metrics.timed("tracker"):
             to_save = detection_tracker.track(
                 chunk_audio, sr, chunk_time,
-                common_name, scientific_name, confidence,
+                common_name, scientific_name, confidence, now=now,
+            )
+        for det in to_save:
+            save_detection(
+                det.audio_chunk, det.sr, det.detection_time,
+                det.common_name, det.scientific_name, det.confidence,
             )
-            for det in to_save:
-                save_detection(
-                    det.audio_chunk, det.sr, det.detection_time,
-                    det.common_name, det.scientific_name, det.confidence,
-                )
 
-    logger.info("  Total detections in %s: %d", wav_path.name, total_detections)
 
-    # Delete the original WAV after processing
+def _handle_results(prepared: PreparedWav, results: list[list[tuple[str, str, float]]]):
+    """Feed a file's per-chunk results through the tracker, then delete the WAV."""
+    if raw_scores is not None and prepared.scores is not None:
+        raw_scores.append(*prepared.scores)
+    total_detections = 0
+    for chunk_offset, chunk_audio, chunk_results in zip(
+            prepared.chunk_offsets, prepared.chunks, results):
+        chunk_time = prepared.file_dt + timedelta(seconds=chunk_offset)
+        total_detections += len(chunk_results)
+        _track_and_save(chunk_audio, prepared.sr, chunk_time, chunk_results)
+
+    logger.info("  Total detections in %s: %d", prepared.path.name, total_detections)
+    metrics.inc("files_processed")
+
+    # Delete the original WAV once the detections saved from it are stored
+    if wav_reaper is not None:
+        wav_reaper.submit(prepared.path)
+    else:
+        _delete_wav(prepared.path)
+
+
+def _delete_wav(path: Path):
     try:
-        wav_path.unlink()
-        logger.debug("  Deleted %s", wav_path.name)
+        path.unlink()
+        logger.debug("  Deleted %s", path.name)
     except OSError as e:
-        logger.warning("  Could not delete %s: %s", wav_path.name, e)
+        logger.warning("  Could not delete %s: %s", path.name, e)
+
+
+def _infer_files(wav_paths: list[Path]) -> list[tuple[PreparedWav, list[list[tuple[str, str, float]]]]]:
+    """Decode and run inference on several WAVs, stacking their chunks into shared invokes.
+
+    Runs in the main process or in a pool worker. Chunks without detections
+    are dropped from the returned PreparedWav so little audio crosses the
+    process boundary.
+    """
+    prepared = [p for p in (prepare_wav(path) for path in wav_paths) if p is not None]
+    if not prepared:
+        return []
+
+    stacked = np.concatenate([p.chunks for p in prepared])
+    indices = [i for p in prepared for i in p.chunk_indices]
+    logger.info("  Running inference on %d chunk(s) from %d file(s)",
+                len(stacked), len(prepared))
+
+    # Skip top-k work when nothing will store it (e.g. bench.py)
+    scores = [] if raw_scores is not None or (_pool_worker and _score_k()) else None
+    results = _analyze_gated(stacked, indices, prepared[0].file_dt, scores)
+    if scores:
+        rows, top_idx, top_probs = _merge_scores(scores)
+
+    out = []
+    offset = 0
+    for p in prepared:
+        file_results = results[offset:offset + len(p.chunks)]
+        file_scores = None
+        if scores:
+            sel = (rows >= offset) & (rows < offset + len(p.chunks))
+            file_scores = ([p.file_dt + timedelta(seconds=p.chunk_offsets[r - offset])
+                            for r in rows[sel]], top_idx[sel], top_probs[sel])
+        offset += len(p.chunks)
+        keep = [i for i, r in enumerate(file_results) if r]
+        out.append((
+            PreparedWav(path=p.path, sr=p.sr, file_dt=p.file_dt,
+                        chunk_indices=[p.chunk_indices[i] for i in keep],
+                        chunk_offsets=[p.chunk_offsets[i] for i in keep],
+                        chunks=p.chunks[keep], scores=file_scores),
+            [file_results[i] for i in keep],
+        ))
+    return out
+
+
+def process_wavs(wav_paths: list[Path]) -> list[Path]:
+    """Process several WAV files with their chunks stacked into shared invokes.
+
+    Returns the files that were analysed; the rest could not be read.
+    """
+    handled = []
+    for prepared, results in _infer_files(wav_paths):
+        _handle_results(prepared, results)
+        handled.append(prepared.path)
+    return handled
+
+
+def process_wav(wav_path: Path):
+    """Process a single WAV file: split into chunks, analyze, save detections."""
+    process_wavs([wav_path])
+
+
+def _files_per_batch() -> int:
+    """How many queued WAVs fill one inference batch."""
+    audio_cfg = config["audio"]
+    sr = int(audio_cfg["sample_rate"])
+    windows_per_file = -(-int(sr * audio_cfg["record_duration"]) // _window_hop(sr))
+    return max(1, int(config["model"].get("batch_size", 1)) // max(1, windows_per_file))
+
+
+def _infer_files_in_worker(wav_paths: list[Path]):
+    """Pool task: _infer_files plus the worker's stage timings and gate state for the parent."""
+    files = _infer_files(wav_paths)
+    gate = energy_gate.snapshot() if energy_gate is not None else None
+    return files, metrics.drain(), (os.getpid(), gate)
+
+
+def _gate_snapshot() -> dict | None:
+    """Energy-gate stats for this process, or summed over the pool's workers."""
+    if energy_gate is not None:
+        return energy_gate.snapshot()
+    snaps = list(_worker_gates.values())
+    if not snaps:
+        return None
+    stats = {k: sum(s[k] for s in snaps) for k in ("chunks", "skipped", "audited", "missed")}
+    floors = [s["noise_floor_db"] for s in snaps if s["noise_floor_db"] is not None]
+    stats["noise_floor_db"] = sum(floors) / len(floors) if floors else None
+    stats["skip_ratio"] = stats["skipped"] / stats["chunks"] if stats["chunks"] else 0.0
+    return stats
+
+
+def _init_worker():
+    """Pool initializer: each worker process loads its own interpreter."""
+    global _pool_worker
+    _pool_worker = True
+    load_config()
+    load_model()
+    load_labels()
+    load_species_filter()
+    load_energy_gate()
+
+
+class AnalyzerPool:
+    """Dispatches WAV files to worker processes, each with its own Interpreter.
+
+    Results come back to a single writer thread that always takes the
+    outstanding group with the earliest filename (capture time), whatever
+    order groups were submitted or finished in, so the DetectionTracker,
+    saving and WAV deletion see files in timestamp order. The writer also
+    owns saving detections and deleting WAVs.
+    If a worker dies (e.g. killed for running out of memory) the pool is
+    replaced and the affected group is retried once on the new one.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._executor = self._new_executor()
+        self.restarts = 0
+        # Outstanding groups as (first filename, submit seq, paths, future, executor, on_done)
+        self._pending: list[tuple] = []
+        self._pending_cond = threading.Condition()
+        self._seq = 0
+        self._closing = False
+        self._last_written = ""
+        # Cap outstanding groups so callers feel backpressure instead of
+        # queueing the whole backlog inside the executor
+        self._in_flight = threading.BoundedSemaphore(workers * 2)
+        self._writer = threading.Thread(target=self._write_loop, name="analyzer-writer",
+                                        daemon=True)
+        self._writer.start()
+
+    def submit(self, wav_paths: list[Path], on_done=None):
+        """Queue a group of WAVs; groups are written back in filename order.
+
+        Blocks while too many groups are outstanding. on_done, if given, is
+        called from the writer thread once the group has been written.
+        """
+        wav_paths = sorted(wav_paths, key=lambda p: p.name)
+        self._in_flight.acquire()
+        future, executor = self._dispatch(wav_paths)
+        with self._pending_cond:
+            heapq.heappush(self._pending, (wav_paths[0].name, self._seq, wav_paths,
+                                           future, executor, on_done))
+            self._seq += 1
+            self._pending_cond.notify_all()
+        future.add_done_callback(self._wake_writer)
+
+    def _wake_writer(self, _future=None):
+        with self._pending_cond:
+            self._pending_cond.notify_all()
+
+    def _next_done(self) -> tuple | None:
+        """Pop the earliest-named outstanding group once its result is in."""
+        with self._pending_cond:
+            while True:
+                if self._pending and self._pending[0][3].done():
+                    return heapq.heappop(self._pending)
+                if not self._pending and self._closing:
+                    return None
+                self._pending_cond.wait()
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+
+    def _dispatch(self, wav_paths: list[Path]) -> tuple[Future, ProcessPoolExecutor]:
+        """Submit to the current executor, replacing it first if it is broken."""
+        while True:
+            with self._lock:
+                executor = self._executor
+                try:
+                    return executor.submit(_infer_files_in_worker, wav_paths), executor
+                except BrokenProcessPool:
+                    pass
+            self._restart(executor)
+
+    def _restart(self, broken: ProcessPoolExecutor):
+        """Replace broken with a fresh executor unless that has already happened."""
+        with self._lock:
+            if self._executor is not broken:
+                return
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._new_executor()
+            self.restarts += 1
+            # The dead workers' counters stay in the totals; their floors are stale
+            for gate in _worker_gates.values():
+                gate["noise_floor_db"] = None
+        metrics.inc("pool_restarts")
+        logger.error("Analyzer worker process died — restarted the pool (%d restart(s))",
+                     self.restarts)
+
+    def _result(self, wav_paths: list[Path], future: Future, executor: ProcessPoolExecutor):
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            self._restart(executor)
+        logger.warning("Retrying %s on the new pool", ", ".join(w.name for w in wav_paths))
+        future, _ = self._dispatch(wav_paths)
+        return future.result()
+
+    def _write_loop(self):
+        while True:
+            item = self._next_done()
+            if item is None:
+                return
+            first, _seq, wav_paths, future, executor, on_done = item
+            if first < self._last_written:
+                logger.warning("%s submitted after %s was written — tracker sees it out of order",
+                               first, self._last_written)
+            self._last_written = max(self._last_written, wav_paths[-1].name)
+            try:
+                files, worker_metrics, (pid, gate) = self._result(wav_paths, future, executor)
+                metrics.merge(worker_metrics)
+                if gate is not None:
+                    _worker_gates[pid] = gate
+                for prepared, results in files:
+                    _handle_results(prepared, results)
+            except Exception as e:
+                logger.error("Error processing %s: %s",
+                             ", ".join(w.name for w in wav_paths), e, exc_info=True)
+            finally:
+                self._in_flight.release()
+                if on_done is not None:
+                    on_done(wav_paths)
+
+    def close(self):
+        """Drain outstanding work, then stop the writer and the workers."""
+        with self._pending_cond:
+            self._closing = True
+            self._pending_cond.notify_all()
+        self._writer.join()
+        self._executor.shutdown()
+
+
+analysis_pool: AnalyzerPool | None = None
+
+
+def _make_capture(source: str) -> StreamCapture:
+    """Build a StreamCapture for "arecord", "synthetic", a pi_audio_server URL or an audio file path."""
+    audio_cfg = config["audio"]
+    sr = audio_cfg["sample_rate"]
+    block_frames = sr // 10
+    buffer_seconds = float(audio_cfg.get("stream_buffer_seconds", 60))
+
+    if source == "arecord":
+        factory = lambda stop: capture.arecord_source(audio_cfg["device"], sr, block_frames, stop)
+        return StreamCapture(factory, sr, buffer_seconds)
+    if source == "synthetic":
+        factory = lambda stop: capture.synthetic_source(sr, block_frames, stop, seconds=60)
+        return StreamCapture(factory, sr, buffer_seconds, lossless=True)
+    if source.startswith(("http://", "https://")):
+        codec = config.get("remote", {}).get("stream_codec", "flac")
+        factory = lambda stop: capture.remote_source(source, sr, stop, codec=codec)
+        return StreamCapture(factory, sr, buffer_seconds)
+    path = Path(source)
+    factory = lambda stop: capture.file_source(path, sr, block_frames, stop)
+    return StreamCapture(factory, sr, buffer_seconds, lossless=True)
+
+
+def run_stream(stream: StreamCapture):
+    """Analyze windows straight from a capture ring buffer, never touching disk."""
+    sr = stream.sample_rate
+    window_samples = _expected_samples()
+    hop = _window_hop(sr)
+    logger.info("Streaming analysis: %d-sample windows, hop=%d, batch_size=%d",
+                window_samples, hop, batch_size)
+
+    pending: list[tuple[int, np.ndarray]] = []
+
+    def flush():
+        chunks = np.stack([w for _, w in pending])
+        indices = [start // hop for start, _ in pending]
+        scores = [] if raw_scores is not None else None
+        results = _analyze_gated(chunks, indices, stream.time_at(pending[0][0]), scores)
+        _store_scores(scores, [stream.time_at(start) for start, _ in pending])
+        for (start, window), chunk_results in zip(pending, results):
+            _track_and_save(window, sr, stream.time_at(start), chunk_results)
+        pending.clear()
+
+    for start, window in stream.windows(window_samples, hop):
+        pending.append((start, window))
+        if len(pending) >= batch_size:
+            flush()
+    if pending:
+        flush()
+
+    if stream.ring.dropped:
+        logger.warning("Streaming analysis dropped %d samples to capture overruns",
+                       stream.ring.dropped)
+
+
+# Filename timestamps: the recorder's, then AudioMoth / Song Meter style
+_INGEST_NAME_FORMATS = ("%Y-%m-%d-%H-%M-%S", "%Y%m%d_%H%M%S", "%Y%m%d-%H%M%S")
+
+_ingest_stop = threading.Event()
+
+
+def _ingest_start_time(path: Path, duration_s: float) -> datetime:
+    """Recording start from the filename, else file mtime minus its duration."""
+    for fmt in _INGEST_NAME_FORMATS:
+        for part in (path.stem, path.stem.split("_", 1)[-1]):
+            try:
+                return datetime.strptime(part, fmt)
+            except ValueError:
+                continue
+    start = datetime.fromtimestamp(path.stat().st_mtime) - timedelta(seconds=duration_s)
+    logger.warning("No timestamp in %r — assuming it started at %s (mtime - duration)",
+                   path.name, start.isoformat(timespec="seconds"))
+    return start
+
+
+def ingest_file(path: Path, start_dt: datetime | None = None):
+    """Analyze an arbitrarily long WAV/FLAC block by block in constant memory.
+
+    Blocks of record_duration seconds are decoded one at a time; windows
+    that straddle a block boundary are completed from the next block, and
+    each window is stamped with start_dt plus its offset in the file. The
+    source file is left in place.
+    """
+    sr = config["audio"]["sample_rate"]
+    chunk_samples = sr * config["audio"]["chunk_duration"]
+    hop = _window_hop(sr)
+    block_frames = sr * int(config["audio"]["record_duration"])
+    min_samples = int(sr * 1.5)
+
+    duration_s = audio_duration(path)
+    start_dt = start_dt or _ingest_start_time(path, duration_s)
+    logger.info("Ingesting %s: %.1f min from %s, %d-sample windows, hop=%d",
+                path.name, duration_s / 60, start_dt.isoformat(timespec="seconds"),
+                chunk_samples, hop)
+
+    pending: list[tuple[int, np.ndarray]] = []
+    detections = 0
+    windows_done = 0
+
+    def flush(group: list[tuple[int, np.ndarray]]):
+        nonlocal detections, windows_done
+        indices = [pos // hop for pos, _ in group]
+        chunks = np.stack([w if len(w) == _expected_samples() else _fit_chunk(w, i)
+                           for i, (_, w) in zip(indices, group)])
+        times = [start_dt + timedelta(seconds=pos / sr) for pos, _ in group]
+        scores = [] if raw_scores is not None else None
+        results = _analyze_gated(chunks, indices, times[0], scores)
+        _store_scores(scores, times)
+        for (_pos, window), chunk_time, chunk_results in zip(group, times, results):
+            detections += len(chunk_results)
+            _track_and_save(window, sr, chunk_time, chunk_results)
+        windows_done += len(group)
+
+    started = time.monotonic()
+    next_progress = started + 60
+    buf = np.zeros(0, dtype=np.float32)
+    buf_pos = 0  # absolute sample index of buf[0]
+    analyzed_to = 0  # end of the last window
+
+    for block in iter_blocks(path, sr, block_frames):
+        if _ingest_stop.is_set():
+            logger.info("Ingest interrupted at %.1f min", buf_pos / sr / 60)
+            break
+        with metrics.timed("chunk"):
+            buf = np.concatenate([buf, block])
+            n_windows = (len(buf) - chunk_samples) // hop + 1 if len(buf) >= chunk_samples else 0
+            for k in range(n_windows):
+                pending.append((buf_pos + k * hop, buf[k * hop:k * hop + chunk_samples]))
+            if n_windows:
+                analyzed_to = buf_pos + (n_windows - 1) * hop + chunk_samples
+                buf = buf[n_windows * hop:]
+                buf_pos += n_windows * hop
+        metrics.inc("audio_seconds", len(block) / sr)
+        while len(pending) >= batch_size:
+            flush(pending[:batch_size])
+            del pending[:batch_size]
+        if time.monotonic() >= next_progress:
+            next_progress += 60
+            elapsed = time.monotonic() - started
+            logger.info("  %s: %.1f / %.1f min analyzed (%.1fx real time), %d detection(s)",
+                        path.name, buf_pos / sr / 60, duration_s / 60,
+                        (buf_pos / sr) / elapsed, detections)
+    else:
+        # Tail shorter than a window: analyze it padded, like prepare_wav
+        fresh = buf_pos + len(buf) - analyzed_to
+        if fresh >= min_samples:
+            pending.append((buf_pos, np.pad(buf, (0, chunk_samples - len(buf)))))
+    if pending:
+        flush(pending)
+
+    elapsed = time.monotonic() - started
+    logger.info("Ingested %s: %d window(s), %d detection(s) in %.1fs (%.1fx real time)",
+                path.name, windows_done, detections, elapsed,
+                duration_s / elapsed if elapsed else 0.0)
+    metrics.inc("files_processed")
+
+
+def _main_remote(url: str):
+    """Pull mode: analyze a remote pi_audio_server's recordings."""
+    remote_cfg = config.get("remote", {})
+    client = remote_client.AudioServerClient(
+        url,
+        timeout=float(remote_cfg.get("timeout_seconds", 30)),
+        max_retries=int(remote_cfg.get("max_retries", 5)),
+        backoff_max=float(remote_cfg.get("backoff_max_seconds", 60)),
+    )
+    puller = RemotePuller(client, data_dir / "RemoteSpool",
+                          prefetch=int(remote_cfg.get("prefetch", 10)),
+                          poll_seconds=float(remote_cfg.get("poll_seconds", 5)))
+
+    def handle_signal(signum, frame):
+        logger.info("Signal %d received — shutting down", signum)
+        puller.stop()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    logger.info("Remote pull mode: %s (prefetch %d)", client.base_url, puller._ready.maxsize)
+    puller.start()
+    try:
+        puller.run()
+    finally:
+        # The final acks wait on the media queue, so the writer closes after
+        puller.close()
+        _close_media_writer()
+        _stop_metrics_exporter()
+        _close_score_store()
+        logger.info("Analyzer stopped")
+
+
+def _main_ingest(paths: list[Path], start: datetime | None):
+    """`analyzer.py ingest`: analyze long recordings, then flush the tracker's output."""
+    def handle_signal(signum, frame):
+        logger.info("Signal %d received — stopping ingest", signum)
+        _ingest_stop.set()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    try:
+        for path in sorted(paths, key=lambda p: p.name):
+            if _ingest_stop.is_set():
+                break
+            if not path.is_file():
+                logger.error("Not a file: %s", path)
+                continue
+            ingest_file(path, start)
+            # An explicit start only applies to the first file
+            start = None
+    finally:
+        _close_media_writer()
+        _stop_metrics_exporter()
+        _close_score_store()
+        logger.info("Ingest finished")
+
+
+class MediaWriter:
+    """Bounded background queue for save_detection work.
+
+    Spectrogram rendering, MP3 encoding and the DB insert run on worker
+    threads so inference never waits on them. When the queue is full a new
+    detection waits for room, so the analyzer slows down rather than lose
+    it; with put_timeout > 0 it is dropped (and counted) after that long.
+    """
+
+    def __init__(self, workers: int, maxsize: int, put_timeout: float = 0.0):
+        self.put_timeout = put_timeout
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._done = threading.Condition(self._lock)
+        self._next_ticket = 0
+        self._outstanding: set[int] = set()  # tickets queued or being written
+        self._threads = [
+            threading.Thread(target=self._run, name=f"media-writer-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        self.stats = {
+            "enqueued": 0,
+            "written": 0,
+            "failed": 0,
+            "dropped": 0,
+            "latency_seconds_total": 0.0,
+            "latency_seconds_max": 0.0,
+        }
+        for t in self._threads:
+            t.start()
+
+    def submit(self, *args) -> bool:
+        """Queue a _write_detection call. Returns False if it was dropped."""
+        # Copy so a queued job doesn't pin the whole batch array it came from
+        args = (np.array(args[0], dtype=np.float32),) + args[1:]
+        with self._lock:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            self._outstanding.add(ticket)
+        try:
+            self._queue.put((ticket, time.monotonic(), args),
+                            timeout=self.put_timeout if self.put_timeout > 0 else None)
+        except queue.Full:
+            with self._lock:
+                self._outstanding.discard(ticket)
+                self._done.notify_all()
+                self.stats["dropped"] += 1
+            metrics.inc("media_dropped")
+            logger.error("  Media queue full — dropped detection %s at %s",
+                         args[3], args[2].strftime("%H:%M:%S"))
+            return False
+        with self._lock:
+            self.stats["enqueued"] += 1
+        return True
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            ticket, enqueued_at, args = item
+            latency = time.monotonic() - enqueued_at
+            metrics.observe("media_queue_wait", latency)
+            try:
+                _write_detection(*args)
+                ok = True
+            except Exception as e:
+                logger.error("  Saving detection failed: %s", e, exc_info=True)
+                ok = False
+            with self._lock:
+                self.stats["written" if ok else "failed"] += 1
+                self.stats["latency_seconds_total"] += latency
+                self.stats["latency_seconds_max"] = max(self.stats["latency_seconds_max"], latency)
+                self._outstanding.discard(ticket)
+                self._done.notify_all()
+            self._queue.task_done()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+        done = max(1, stats["written"] + stats["failed"])
+        stats["depth"] = self._queue.qsize()
+        stats["avg_latency_seconds"] = stats["latency_seconds_total"] / done
+        return stats
+
+    def mark(self) -> int:
+        """Position after every detection submitted so far, for wait_until()."""
+        with self._lock:
+            return self._next_ticket
+
+    def wait_until(self, mark: int, timeout: float | None = None) -> bool:
+        """Block until every detection submitted before mark is written or failed.
+
+        Later submissions are not waited for. False on timeout.
+        """
+        with self._done:
+            return self._done.wait_for(
+                lambda: min(self._outstanding, default=mark) >= mark, timeout)
+
+    def close(self):
+        """Flush every queued detection, then stop the workers."""
+        pending = self._queue.qsize()
+        if pending:
+            logger.info("Flushing %d queued detection(s)", pending)
+        self._queue.join()
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join()
+
+
+class WavReaper:
+    """Deletes analysed WAVs only once the detections saved from them are stored.
+
+    The media and DB writers hold queued detections in memory, so deleting
+    a WAV as soon as its saves are queued would lose both on a power cut.
+    Each file waits until the media writer has finished everything queued
+    before it (MediaWriter.mark()) and the DB writer has committed, then is
+    unlinked. If that doesn't happen within wait_seconds the WAV is kept
+    and analysed again later, which can duplicate a detection but not lose it.
+    """
+
+    def __init__(self, wait_seconds: float = 60.0):
+        self.wait_seconds = wait_seconds
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._waiting: set[str] = set()  # names analysed but not yet deleted
+        self._thread = threading.Thread(target=self._run, name="wav-reaper", daemon=True)
+        self.stats = {"deleted": 0, "kept": 0}
+        self._thread.start()
+
+    def submit(self, path: Path):
+        """Delete path once the detections queued so far are saved."""
+        with self._lock:
+            self._waiting.add(path.name)
+        self._queue.put((path, media_writer.mark() if media_writer is not None else 0))
+
+    def waiting(self, name: str) -> bool:
+        """True while an analysed WAV is still waiting to be deleted."""
+        with self._lock:
+            return name in self._waiting
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            path, mark = item
+            saved = ((media_writer is None or media_writer.wait_until(mark, self.wait_seconds))
+                     and (db_writer is None or db_writer.flush(self.wait_seconds)))
+            if saved:
+                _delete_wav(path)
+                self.stats["deleted"] += 1
+            else:
+                self.stats["kept"] += 1
+                logger.warning("  Detections from %s not saved after %.0fs — keeping the WAV",
+                               path.name, self.wait_seconds)
+            with self._lock:
+                self._waiting.discard(path.name)
+
+    def close(self):
+        """Delete (or keep) every WAV submitted so far, then stop the thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+
+media_writer: MediaWriter | None = None
+db_writer: database.DetectionWriter | None = None
+wav_reaper: WavReaper | None = None
 
 
 def save_detection(audio_chunk: np.ndarray, sr: int, detection_time: datetime,
                    common_name: str, scientific_name: str, confidence: float):
-    """Save a detection: spectrogram PNG, MP3 clip, and database record."""
+    """Save a detection, in the background when the media writer is running."""
+    if media_writer is not None:
+        media_writer.submit(audio_chunk, sr, detection_time,
+                            common_name, scientific_name, confidence)
+    else:
+        _write_detection(audio_chunk, sr, detection_time,
+                         common_name, scientific_name, confidence)
+
+
+def _write_detection(audio_chunk: np.ndarray, sr: int, detection_time: datetime,
+                     common_name: str, scientific_name: str, confidence: float):
+    """Save a detection: spectrogram PNG, audio clip, and database record."""
     date_str = detection_time.strftime("%Y-%m-%d")
-    time_str = detection_time.strftime("%H-%M-%S")
+    # Milliseconds keep windows less than a second apart from sharing a name
+    time_str = detection_time.strftime("%H-%M-%S-%f")[:-3]
     safe_species = common_name.replace(" ", "_")
 
     det_dir = data_dir / "detections" / date_str / safe_species
     det_dir.mkdir(parents=True, exist_ok=True)
 
+    clip_format = config["audio"].get("clip_format", "mp3")
     base_name = f"{time_str}_{confidence:.2f}"
     png_path = det_dir / f"{base_name}.png"
-    mp3_path = det_dir / f"{base_name}.mp3"
+    clip_path = det_dir / f"{base_name}{clip_encoder.suffix_for(clip_format)}"
 
     logger.debug("  Saving detection to %s", det_dir)
 
     # Generate spectrogram
     try:
-        spec_module.generate_spectrogram(audio_chunk, sr, str(png_path),
-                                         common_name, confidence)
+        with metrics.timed("spectrogram"):
+            spec_module.generate_spectrogram(audio_chunk, sr, str(png_path),
+                                             common_name, confidence)
         logger.debug("  Spectrogram saved: %s", png_path.name)
     except Exception as e:
         logger.error("  Spectrogram generation failed: %s", e)
 
-    # Convert audio chunk to MP3 via ffmpeg (write temp WAV first)
-    tmp_wav = det_dir / f"{base_name}_tmp.wav"
+    # Encode the clip in process, straight from the float32 chunk
     try:
-        import soundfile as sf
-        sf.write(str(tmp_wav), audio_chunk, sr)
-        result = subprocess.run(
-            ["ffmpeg", "-y", "-i", str(tmp_wav), "-q:a", "6", str(mp3_path)],
-            capture_output=True, timeout=30
-        )
-        tmp_wav.unlink(missing_ok=True)
-        if result.returncode != 0:
-            logger.error("  ffmpeg failed (rc=%d): %s",
-                         result.returncode, result.stderr.decode(errors="replace").strip())
-        else:
-            logger.debug("  MP3 saved: %s", mp3_path.name)
+        with metrics.timed("encode"):
+            clip_encoder.encode_clip(audio_chunk, sr, clip_path, clip_format)
+        logger.debug("  Clip saved: %s", clip_path.name)
     except Exception as e:
-        logger.error("  MP3 conversion failed: %s", e)
-        tmp_wav.unlink(missing_ok=True)
+        logger.error("  Clip encoding failed: %s", e)
 
     # Relative paths for database storage
     rel_png = str(png_path.relative_to(data_dir))
-    rel_mp3 = str(mp3_path.relative_to(data_dir))
+    rel_clip = str(clip_path.relative_to(data_dir))
 
+    row = (date_str, detection_time.strftime("%H:%M:%S"), common_name, scientific_name,
+           confidence, rel_png, rel_clip)
+    if db_writer is not None:
+        # Committed with whatever else arrives in the same window
+        db_writer.submit(row)
+        return
     try:
-        database.insert_detection(
-            str(data_dir), date_str, detection_time.strftime("%H:%M:%S"),
-            common_name, scientific_name, confidence, rel_png, rel_mp3
-        )
+        with metrics.timed("db_insert"):
+            database.insert_detection(str(data_dir), *row)
         logger.debug("  Detection written to DB")
+        metrics.inc("detections_saved")
     except Exception as e:
         logger.error("  DB insert failed: %s", e)
+        metrics.inc("db_insert_failed")
+
+
+class RemotePuller:
+    """Pull mode: analyze WAVs recorded by a pi_audio_server on another host.
+
+    A fetch thread downloads files into a local spool directory up to
+    prefetch ahead, so downloads overlap inference. The main thread
+    analyzes them in batches, and an ack thread deletes them on the server
+    only once their detections have been saved (media queue drained).
+    Files arrive as one tar per prefetch-sized page after the newest name
+    already fetched, so nothing is fetched twice within a run, and are
+    acknowledged with one batch delete; a large server backlog costs a
+    couple of requests per page rather than two per file. A failed delete
+    is retried; one still failing at shutdown means that file is fetched
+    and analyzed again on the next start. A file that cannot be decoded is
+    moved to spool_dir/failed/ and logged, then acknowledged like the rest,
+    so it is neither lost nor fetched again forever.
+    """
+
+    _ACK_WAIT_SECONDS = 30.0  # per wait on the media and DB writers before retrying
+
+    def __init__(self, client: remote_client.AudioServerClient, spool_dir: Path,
+                 prefetch: int, poll_seconds: float):
+        self.client = client
+        self.spool_dir = spool_dir
+        self.poll_seconds = poll_seconds
+        self.stop_event = threading.Event()
+        self._ready: queue.Queue = queue.Queue(maxsize=max(1, prefetch))
+        self._acks: queue.Queue = queue.Queue()
+        self._cursor: str | None = None  # newest name fetched; names sort by capture time
+        self._page = max(1, prefetch)
+        self._fetcher = threading.Thread(target=self._fetch_loop, name="remote-fetch", daemon=True)
+        self._acker = threading.Thread(target=self._ack_loop, name="remote-ack", daemon=True)
+        self.stats = {"downloaded": 0, "deleted": 0, "delete_failures": 0,
+                      "download_failures": 0, "quarantined": 0}
+
+    def start(self):
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        for part in self.spool_dir.glob("*.part"):
+            part.unlink()
+        # Files downloaded but not acknowledged before a restart go first
+        leftovers = sorted(self.spool_dir.glob("*.wav"))
+        if leftovers:
+            logger.info("Remote: %d spooled WAV(s) from a previous run", len(leftovers))
+        self._leftovers = leftovers
+        self._cursor = leftovers[-1].name if leftovers else None
+        self._fetcher.start()
+        self._acker.start()
+
+    def _offer(self, path: Path) -> bool:
+        while not self.stop_event.is_set():
+            try:
+                self._ready.put(path, timeout=1.0)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _fetch_loop(self):
+        for path in self._leftovers:
+            if not self._offer(path):
+                return
+        while not self.stop_event.is_set():
+            try:
+                with metrics.timed("remote_download"):
+                    paths = self.client.download_batch(self.spool_dir, since=self._cursor,
+                                                       limit=self._page)
+            except (remote_client.RemoteError, OSError) as e:
+                # OSError: the spool could not be written (e.g. disk full)
+                self.stats["download_failures"] += 1
+                metrics.inc("remote_download_failures")
+                logger.error("Remote: batch download failed: %s", e)
+                self.stop_event.wait(self.poll_seconds)
+                continue
+            if not paths:
+                self.stop_event.wait(self.poll_seconds)
+                continue
+            self._cursor = paths[-1].name
+            self.stats["downloaded"] += len(paths)
+            metrics.inc("remote_downloads", len(paths))
+            logger.debug("Remote: downloaded %d file(s) up to %s", len(paths), self._cursor)
+            for path in paths:
+                if not self._offer(path):
+                    return
+
+    def _saved(self, mark: int) -> bool:
+        """Wait for detections submitted before mark to reach the database."""
+        if media_writer is not None and not media_writer.wait_until(mark, self._ACK_WAIT_SECONDS):
+            logger.warning("Remote: media writer still busy after %.0fs — delaying delete",
+                           self._ACK_WAIT_SECONDS)
+            return False
+        if db_writer is not None and not db_writer.flush(self._ACK_WAIT_SECONDS):
+            logger.warning("Remote: detections not committed after %.0fs — delaying delete",
+                           self._ACK_WAIT_SECONDS)
+            return False
+        return True
+
+    def _ack_loop(self):
+        retry: list[str] = []
+        retry_mark = 0
+        while True:
+            try:
+                item = self._acks.get(timeout=self.poll_seconds if retry else None)
+            except queue.Empty:
+                item = ([], 0)
+            if item is None:
+                if not retry:
+                    return
+                self._acks.put(None)  # finish the retry, then stop
+                item = ([], 0)
+            names, mark = item
+            names = retry + names
+            mark = max(mark, retry_mark)
+            retry = []
+            # Coalesce everything acknowledged so far into one request
+            while True:
+                try:
+                    more = self._acks.get_nowait()
+                except queue.Empty:
+                    break
+                if more is None:
+                    self._acks.put(None)
+                    break
+                names += more[0]
+                mark = max(mark, more[1])
+            # Detections from these files are queued on the media writer; wait
+            # for them (not whatever was queued since) to reach the database
+            # before the server copies go
+            if names and not self._saved(mark):
+                retry, retry_mark = names, mark
+                names = []
+            if names:
+                try:
+                    self.client.delete_batch(names)
+                except remote_client.RemoteError as e:
+                    self.stats["delete_failures"] += 1
+                    logger.error("Remote: deleting %d file(s) failed: %s — will retry", len(names), e)
+                    retry, retry_mark = names, mark
+                else:
+                    self.stats["deleted"] += len(names)
+                    metrics.inc("remote_deletes", len(names))
+            if self.stop_event.is_set() and retry:
+                logger.warning("Remote: %d file(s) not deleted on the server at shutdown — "
+                               "they will be analyzed again", len(retry))
+                return
+
+    def run(self):
+        """Analyze downloaded files in batches until stop() is called."""
+        while not self.stop_event.is_set():
+            try:
+                group = [self._ready.get(timeout=1.0)]
+            except queue.Empty:
+                continue
+            limit = _files_per_batch()
+            while len(group) < limit:
+                try:
+                    group.append(self._ready.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                # Deletes the local copies once their detections are saved
+                handled = set(process_wavs(group))
+            except Exception as e:
+                logger.error("Unhandled error processing %s: %s",
+                             ", ".join(p.name for p in group), e, exc_info=True)
+                continue  # keep them on the server; they are retried after a restart
+            for path in group:
+                if path not in handled and path.exists():
+                    self._quarantine(path)
+            self._acks.put(([p.name for p in group],
+                            media_writer.mark() if media_writer is not None else 0))
+
+    def _quarantine(self, path: Path):
+        """Keep a spooled file process_wavs could not handle out of the way of the next run."""
+        failed_dir = self.spool_dir / "failed"
+        try:
+            failed_dir.mkdir(exist_ok=True)
+            path.replace(failed_dir / path.name)
+        except OSError as e:
+            logger.error("Remote: could not quarantine %s: %s", path.name, e)
+            return
+        self.stats["quarantined"] += 1
+        metrics.inc("remote_quarantined")
+        logger.error("Remote: %s could not be analyzed — moved to %s", path.name, failed_dir)
+
+    def stop(self):
+        self.stop_event.set()
+
+    def close(self):
+        """Wait for outstanding acknowledgements, then stop the threads."""
+        self.stop_event.set()
+        self._fetcher.join(timeout=self.client.timeout + 5)
+        self._acks.put(None)
+        self._acker.join()
+        self.client.close()
+        cs = self.client.stats
+        logger.info("Remote: downloaded=%d deleted=%d delete_failures=%d download_failures=%d "
+                    "quarantined=%d (%d request(s) over %d connection(s), %d retries, %.1f MB)",
+                    self.stats["downloaded"], self.stats["deleted"],
+                    self.stats["delete_failures"], self.stats["download_failures"],
+                    self.stats["quarantined"],
+                    cs["requests"], cs["reconnects"], cs["retries"], cs["bytes"] / 1e6)
+
+
+# inotify delivers IN_CLOSE_WRITE as on_closed; other platforms fall back to
+# on_created plus size polling
+_CLOSE_EVENTS = sys.platform.startswith("linux")
+
+
+class IngestQueue:
+    """Bounded queue of WAV paths drained by a dedicated worker thread.
+
+    Watchdog callbacks only enqueue, so the observer thread never blocks on
+    file I/O or inference. When the queue is full the path is left on disk
+    and a rescan of StreamData/ is scheduled for when the queue drains; the
+    same rescan picks up the backlog at startup. Files too recent to trust
+    are picked up by a follow-up rescan once they have settled. While such
+    a backlog is waiting on disk, new files join it rather than jumping the
+    queue, so everything is analysed in filename (capture time) order.
+    """
+
+    # Files modified this recently are probably still being written by arecord
+    _SETTLE_SECONDS = 2.0
+
+    def __init__(self, stream_dir: Path, maxsize: int):
+        self.stream_dir = stream_dir
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._known: set[str] = set()  # queued or being processed
+        self._rescan = threading.Event()
+        self._rescan_at = 0.0  # monotonic time before which a rescan is deferred
+        self._settle_retry = False  # the pending rescan is the follow-up for recent files
+        self._backlog = False  # WAVs are waiting on disk for a rescan
+        self._deferred = False  # a put() was left for the rescan during the current one
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="analyzer-ingest", daemon=True)
+        self.stats = {
+            "enqueued": 0,
+            "processed": 0,
+            "overflows": 0,
+            "max_depth": 0,
+            "wait_seconds_total": 0.0,
+            "process_seconds_total": 0.0,
+        }
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def put(self, path: Path, needs_wait: bool = False) -> bool:
+        """Enqueue a finished WAV without blocking. Returns False if dropped.
+
+        With a backlog on disk the file is left for the rescan instead, which
+        queues it after the older ones.
+        """
+        with self._lock:
+            if self._backlog:
+                self._deferred = True
+                self._rescan.set()
+                logger.debug("Backlog pending — %s left for rescan", path.name)
+                return False
+        return self._enqueue(path, needs_wait)
+
+    def _enqueue(self, path: Path, needs_wait: bool = False) -> bool:
+        with self._lock:
+            if path.name in self._known:
+                return False
+            try:
+                self._queue.put_nowait((path, needs_wait, time.monotonic()))
+            except queue.Full:
+                self.stats["overflows"] += 1
+                metrics.inc("ingest_overflows")
+                self._backlog = True
+                self._rescan.set()
+                logger.warning("Ingest queue full (%d) — %s left for rescan",
+                               self._queue.maxsize, path.name)
+                return False
+            self._known.add(path.name)
+            self.stats["enqueued"] += 1
+            self.stats["max_depth"] = max(self.stats["max_depth"], self._queue.qsize())
+        return True
+
+    def request_rescan(self):
+        """Queue whatever is in stream_dir, ahead of files that arrive meanwhile."""
+        with self._lock:
+            self._backlog = True
+        self._rescan.set()
+
+    def snapshot(self) -> dict:
+        """Current depth plus cumulative wait/processing statistics."""
+        with self._lock:
+            stats = dict(self.stats)
+        processed = max(1, stats["processed"])
+        stats["depth"] = self._queue.qsize()
+        stats["avg_wait_seconds"] = stats["wait_seconds_total"] / processed
+        stats["avg_process_seconds"] = stats["process_seconds_total"] / processed
+        return stats
+
+    def _rescan_dir(self):
+        with self._lock:
+            self._deferred = False
+        self._rescan.clear()
+        cutoff = time.time() - self._SETTLE_SECONDS
+        found = 0
+        recent = 0
+        complete = True
+        for path in sorted(self.stream_dir.glob("*.wav")):
+            if path.name in self._known or (wav_reaper is not None and wav_reaper.waiting(path.name)):
+                continue
+            try:
+                if path.stat().st_mtime > cutoff:
+                    recent += 1
+                    continue
+            except FileNotFoundError:
+                continue
+            if not self._enqueue(path):
+                complete = False
+                break  # full again; _enqueue() re-armed the rescan
+            found += 1
+        if found:
+            logger.info("Rescan queued %d WAV file(s) from %s", found, self.stream_dir)
+        with self._lock:
+            # Files left by put() during this scan may have closed after the
+            # glob; they keep the backlog (and the re-armed rescan) going.
+            # Recent files don't: they are the newest and get close events.
+            if complete and not self._deferred:
+                self._backlog = False
+        if recent and not self._settle_retry:
+            # Their close events may have come before we were watching or while
+            # the queue was full; look again once they have settled. One retry
+            # only: a file still being recorded then gets its own close event.
+            logger.debug("Rescan: %d WAV file(s) too recent — retrying in %.0fs",
+                         recent, self._SETTLE_SECONDS)
+            self._settle_retry = True
+            self._rescan_at = time.monotonic() + self._SETTLE_SECONDS
+            self._rescan.set()
+        else:
+            self._settle_retry = False
+
+    def _next_group(self) -> list[tuple[Path, bool, float]]:
+        """Block for one item, then take whatever else fills a batch."""
+        try:
+            group = [self._queue.get(timeout=1.0)]
+        except queue.Empty:
+            return []
+        limit = _files_per_batch()
+        while len(group) < limit:
+            try:
+                group.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return group
+
+    def _finish(self, paths: list[Path], started: float):
+        elapsed = time.monotonic() - started
+        with self._lock:
+            for path in paths:
+                self._known.discard(path.name)
+            self.stats["processed"] += len(paths)
+            self.stats["process_seconds_total"] += elapsed
+
+    def _run(self):
+        while not self._stop.is_set():
+            if (self._rescan.is_set() and not self._queue.full()
+                    and time.monotonic() >= self._rescan_at):
+                self._rescan_dir()
+
+            group = self._next_group()
+            if not group:
+                continue
+
+            now = time.monotonic()
+            paths = []
+            with self._lock:
+                for path, _needs_wait, enqueued_at in group:
+                    self.stats["wait_seconds_total"] += now - enqueued_at
+            for path, needs_wait, enqueued_at in group:
+                metrics.observe("queue_wait", now - enqueued_at)
+                if needs_wait:
+                    with metrics.timed("file_ready"):
+                        ready = _wait_for_file_ready(path)
+                    if not ready:
+                        logger.error("File never became ready: %s", path.name)
+                        with self._lock:
+                            self._known.discard(path.name)
+                        continue
+                paths.append(path)
+            if not paths:
+                continue
+
+            if analysis_pool is not None:
+                analysis_pool.submit(paths, on_done=lambda done, t=now: self._finish(done, t))
+                continue
+
+            try:
+                process_wavs(paths)
+            except Exception as e:
+                logger.error("Unhandled error processing %s: %s",
+                             ", ".join(p.name for p in paths), e, exc_info=True)
+            finally:
+                self._finish(paths, now)
+
+
+ingest_queue: IngestQueue | None = None
 
 
 class WavHandler(FileSystemEventHandler):
-    """Watches for new WAV files in StreamData/."""
+    """Watches for finished WAV files in StreamData/ and enqueues them."""
 
-    def on_created(self, event):
-        if event.is_directory:
-            return
-        path = Path(event.src_path)
+    @staticmethod
+    def _wav_path(raw_path) -> Path | None:
+        path = Path(raw_path if isinstance(raw_path, str) else raw_path.decode())
         if path.suffix.lower() != ".wav":
             logger.debug("Ignoring non-WAV file event: %s", path.name)
+            return None
+        return path
+
+    def on_created(self, event):
+        if event.is_directory or _CLOSE_EVENTS:
             return
+        path = self._wav_path(event.src_path)
+        if path is not None:
+            logger.debug("Watchdog on_created: %s", path.name)
+            ingest_queue.put(path, needs_wait=True)
 
-        logger.debug("Watchdog on_created: %s", path.name)
+    def on_closed(self, event):
+        if event.is_directory:
+            return
+        path = self._wav_path(event.src_path)
+        if path is not None:
+            logger.debug("Watchdog on_closed: %s", path.name)
+            ingest_queue.put(path)
 
-        # Wait for arecord to finish writing the file
-        if not _wait_for_file_ready(path):
-            logger.error("File never became ready: %s", path.name)
+    def on_moved(self, event):
+        if event.is_directory:
             return
+        path = self._wav_path(event.dest_path)
+        if path is not None:
+            logger.debug("Watchdog on_moved: %s", path.name)
+            ingest_queue.put(path)
 
-        try:
-            process_wav(path)
-        except Exception as e:
-            logger.error("Unhandled error processing %s: %s", path.name, e, exc_info=True)
+
+def bench_models(runs: int = 20, top_k: int = 5):
+    """--bench-model: time load, warm-up and steady-state invoke per model variant.
+
+    Every variant sees the same synthetic batch; top-k agreement is measured
+    against the first variant that loads (normally fp32).
+    """
+    variants = list(config["model"].get("variants") or [None])
+    sr = config["audio"]["sample_rate"]
+    rows = []
+    sample = None
+    reference = None
+
+    for name in variants:
+        path = _model_path(name)
+        if not path.exists():
+            print(f"{name or path.name:>8}  missing ({path})")
+            continue
+
+        t0 = time.perf_counter()
+        load_model(name)
+        load_s = time.perf_counter() - t0
+
+        if sample is None:
+            n = _expected_samples()
+            pcm = np.concatenate(list(capture.synthetic_source(
+                sr, n, threading.Event(), seconds=batch_size * n / sr)))
+            sample = (pcm[:batch_size * n].astype(np.float32) / _PCM_SCALE).reshape(batch_size, n)
+
+        t0 = time.perf_counter()
+        logits = _run_inference(sample)
+        warmup_s = time.perf_counter() - t0
+
+        times = []
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            _run_inference(sample)
+            times.append(time.perf_counter() - t0)
+        times = np.array(times)
+
+        top = np.argpartition(logits, -top_k, axis=1)[:, -top_k:]
+        if reference is None:
+            reference = top
+        agreement = float(np.mean([len(set(a) & set(b)) / top_k for a, b in zip(top, reference)]))
+
+        rows.append((name or path.name, load_s, warmup_s,
+                     float(np.median(times)) / batch_size,
+                     float(np.percentile(times, 90)) / batch_size, agreement))
+
+    threads = config["model"].get("num_threads") or "default"
+    print(f"\nbackend={_INTERP_BACKEND} num_threads={threads} "
+          f"xnnpack={config['model'].get('xnnpack', True)} batch_size={batch_size} runs={runs}")
+    print(f"{'variant':>8}  {'load':>8}  {'warm-up':>8}  {'p50/chunk':>10}  {'p90/chunk':>10}  "
+          f"{'top-' + str(top_k) + ' agree':>12}")
+    for name, load_s, warmup_s, p50, p90, agreement in rows:
+        print(f"{name:>8}  {load_s * 1e3:>6.0f}ms  {warmup_s * 1e3:>6.0f}ms  "
+              f"{p50 * 1e3:>8.1f}ms  {p90 * 1e3:>8.1f}ms  {agreement:>12.0%}")
+
+
+def _main_stream(source: str):
+    """Streaming mode: capture in-process and analyze windows from memory."""
+    stream = _make_capture(source)
+
+    def handle_signal(signum, frame):
+        logger.info("Signal %d received — shutting down", signum)
+        stream.stop()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    stream.start()
+    try:
+        run_stream(stream)
+    finally:
+        stream.stop()
+        stream.join()
+        _close_media_writer()
+        _stop_metrics_exporter()
+        _close_score_store()
+        logger.info("Analyzer stopped")
+
+
+def _start_media_writer():
+    global media_writer
+    cfg = config.get("analyzer", {})
+    workers = int(cfg.get("media_workers", 1))
+    if workers < 1:
+        logger.info("Media writer disabled — detections are saved inline")
+        return
+    media_writer = MediaWriter(workers, maxsize=int(cfg.get("media_queue_size", 32)),
+                               put_timeout=float(cfg.get("media_put_timeout_seconds", 0)))
+    logger.info("Media writer: %d thread(s), queue size %d", workers, media_writer._queue.maxsize)
+
+
+def _start_wav_reaper():
+    global wav_reaper
+    if media_writer is not None or db_writer is not None:
+        wav_reaper = WavReaper()
+
+
+def _on_db_commit(rows: int, seconds: float, ok: bool):
+    if ok:
+        metrics.observe("db_commit", seconds)
+        metrics.inc("db_commits")
+        metrics.inc("detections_saved", rows)
+    else:
+        metrics.inc("db_insert_failed", rows)
+
+
+def _start_db_writer():
+    global db_writer
+    cfg = config.get("analyzer", {})
+    commit_ms = float(cfg.get("db_commit_ms", 200))
+    if commit_ms <= 0:
+        logger.info("DB group commit disabled — one transaction per detection")
+        return
+    db_writer = database.DetectionWriter(str(data_dir), max_delay=commit_ms / 1000,
+                                         max_rows=int(cfg.get("db_commit_max_rows", 64)),
+                                         on_commit=_on_db_commit)
+    logger.info("DB writer: group commit every %.0f ms or %d rows", commit_ms, db_writer.max_rows)
+
+
+def _close_media_writer():
+    if media_writer is not None:
+        media_writer.close()
+        st = media_writer.snapshot()
+        logger.info("Media writer: written=%d failed=%d dropped=%d avg_latency=%.2fs max_latency=%.2fs",
+                    st["written"], st["failed"], st["dropped"],
+                    st["avg_latency_seconds"], st["latency_seconds_max"])
+        enc = clip_encoder.stats()
+        logger.info("Clips: encoded=%d failed=%d %.1f clips/s",
+                    enc["clips"], enc["failed"], enc["clips_per_second"])
+    # WAVs wait for their rows, so close the reaper while the DB writer runs
+    if wav_reaper is not None:
+        wav_reaper.close()
+    # The flushed saves have queued their rows; commit them before exit
+    _close_db_writer()
+
+
+def _close_db_writer():
+    if db_writer is None:
+        return
+    db_writer.close()
+    st = db_writer.snapshot()
+    logger.info("DB writer: commits=%d rows=%d (%.1f rows/commit) failures=%d "
+                "avg_commit=%.1fms max_commit=%.1fms",
+                st["commits"], st["rows"], st["rows_per_commit"], st["failures"],
+                1000 * st["avg_commit_seconds"], 1000 * st["commit_seconds_max"])
+
+
+metrics_exporter: metrics.Exporter | None = None
+
+
+def _collect_gauges():
+    """Refresh point-in-time gauges before each metrics export."""
+    if ingest_queue is not None:
+        metrics.set_gauge("ingest_queue_depth", ingest_queue.snapshot()["depth"])
+    if media_writer is not None:
+        metrics.set_gauge("media_queue_depth", media_writer.snapshot()["depth"])
+    if db_writer is not None:
+        metrics.set_gauge("db_writer_queued", db_writer.snapshot()["queued"])
+    if detection_tracker is not None:
+        ts = detection_tracker.snapshot()
+        metrics.set_gauge("tracker_pending", ts["pending"])
+        metrics.set_gauge("tracker_pending_bytes", ts["pending_bytes"])
+    gs = _gate_snapshot()
+    if gs is not None and gs["noise_floor_db"] is not None:
+        metrics.set_gauge("energy_gate_noise_floor_db", gs["noise_floor_db"])
+    for name, value in database.pool_stats().items():
+        metrics.set_counter(f"db_pool_{name}", value)
+
+
+def _start_metrics_exporter():
+    global metrics_exporter
+    cfg = config.get("metrics", {})
+    if not cfg.get("enabled", True):
+        return
+    metrics_exporter = metrics.Exporter(
+        Path(cfg.get("file", "/dev/shm/birdnet_analyzer.prom")),
+        float(cfg.get("interval_seconds", 15)),
+        collect=_collect_gauges,
+    )
+    metrics_exporter.start()
+
+
+def _stop_metrics_exporter():
+    if metrics_exporter is not None:
+        metrics_exporter.stop()
 
 
 def main():
-    global detection_tracker
+    global detection_tracker, analysis_pool, ingest_queue
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--stream", action="store_true",
+                        help="analyze audio captured in memory instead of StreamData/ WAVs")
+    parser.add_argument("--source", default="arecord",
+                        help='streaming source: "arecord", "synthetic", a pi_audio_server URL '
+                             '(follows its /stream) or an audio file path')
+    parser.add_argument("--remote", metavar="URL",
+                        help="pull WAVs from a pi_audio_server (e.g. http://birdpi.local:7008); "
+                             "default: remote.url")
+    parser.add_argument("command", nargs="?", choices=["ingest"],
+                        help="ingest: analyze long WAV/FLAC recordings given as paths, then exit")
+    parser.add_argument("paths", nargs="*", type=Path, help="recordings for ingest")
+    parser.add_argument("--start", type=datetime.fromisoformat,
+                        help="ingest: recording start time (default: from filename or mtime)")
+    parser.add_argument("--bench-model", action="store_true",
+                        help="benchmark every configured model variant and exit")
+    parser.add_argument("--bench-runs", type=int, default=20,
+                        help="steady-state invokes per variant for --bench-model")
+    args = parser.parse_args()
+
     load_config()
-    load_model()
-    load_labels()
+    if args.bench_model:
+        bench_models(args.bench_runs)
+        return
+    ingest_mode = args.command == "ingest"
+    if ingest_mode and not args.paths:
+        parser.error("ingest needs at least one recording path")
+    remote_url = None if ingest_mode else (args.remote or config.get("remote", {}).get("url"))
+    stream_mode = not ingest_mode and not remote_url and (
+        args.stream or config["audio"].get("capture_mode", "files") == "stream")
+
+    workers = max(1, int(config.get("analyzer", {}).get("workers", 1)))
+    if workers > 1 and not stream_mode and not ingest_mode and not remote_url:
+        logger.info("Starting analyzer pool with %d worker process(es)", workers)
+        analysis_pool = AnalyzerPool(workers)
+    else:
+        load_model()
+        load_labels()
+        load_species_filter()
+        load_energy_gate()
 
     detection_tracker = DetectionTracker(
         min_count=config.get("min_detection_count", 2),
         window_seconds=config.get("detection_window_seconds", 300),
+        max_pending_bytes=int(config.get("max_pending_audio_mb", 64) * 1024 * 1024),
     )
     logger.info("Detection tracker: min_count=%d, window=%ds",
                 detection_tracker.min_count, detection_tracker.window_seconds)
 
     logger.info("Initialising database at %s", data_dir)
     database.init_db(str(data_dir))
+    if analysis_pool is not None:
+        load_labels()  # the store header records the class count
+    load_score_store()
+    _start_media_writer()
+    _start_db_writer()
+    _start_wav_reaper()
+    _start_metrics_exporter()
+
+    if ingest_mode:
+        _main_ingest(args.paths, args.start)
+        return
+
+    if remote_url:
+        _main_remote(remote_url)
+        return
+
+    if stream_mode:
+        _main_stream(args.source)
+        return
 
     stream_dir = data_dir / "StreamData"
     stream_dir.mkdir(parents=True, exist_ok=True)
     logger.info("StreamData dir: %s", stream_dir)
 
-    # Process any existing WAV files first
-    existing = sorted(stream_dir.glob("*.wav"))
+    ingest_queue = IngestQueue(
+        stream_dir, maxsize=int(config.get("analyzer", {}).get("queue_size", 64)),
+    )
+
+    # Mark the backlog before watching so new files queue behind it, and
+    # start watching before it is scanned so none is missed
+    existing = list(stream_dir.glob("*.wav"))
     if existing:
-        logger.info("Found %d existing WAV file(s) — processing now", len(existing))
-        for wav in existing:
-            try:
-                process_wav(wav)
-            except Exception as e:
-                logger.error("Error processing %s: %s", wav.name, e, exc_info=True)
+        logger.info("Found %d existing WAV file(s) — queueing for processing", len(existing))
+        ingest_queue.request_rescan()
     else:
         logger.info("No existing WAV files in StreamData — waiting for recorder")
 
-    # Start watching for new files
     observer = Observer()
     observer.schedule(WavHandler(), str(stream_dir), recursive=False)
     observer.start()
     logger.info("Watchdog started — watching %s", stream_dir)
+    ingest_queue.start()
 
     shutdown = False
 
@@ -503,12 +2377,48 @@ def main():
     signal.signal(signal.SIGINT, handle_signal)
     signal.signal(signal.SIGTERM, handle_signal)
 
+    stats_interval = float(config.get("analyzer", {}).get("stats_interval_seconds", 300))
+    next_stats = time.monotonic() + stats_interval
+
     try:
         while not shutdown:
             time.sleep(1)
+            if time.monotonic() >= next_stats:
+                next_stats += stats_interval
+                st = ingest_queue.snapshot()
+                logger.info("Ingest: depth=%d max_depth=%d processed=%d overflows=%d "
+                            "avg_wait=%.2fs avg_process=%.2fs",
+                            st["depth"], st["max_depth"], st["processed"], st["overflows"],
+                            st["avg_wait_seconds"], st["avg_process_seconds"])
+                if media_writer is not None:
+                    mw = media_writer.snapshot()
+                    logger.info("Media: depth=%d written=%d failed=%d dropped=%d "
+                                "avg_latency=%.2fs max_latency=%.2fs",
+                                mw["depth"], mw["written"], mw["failed"], mw["dropped"],
+                                mw["avg_latency_seconds"], mw["latency_seconds_max"])
+                ts = detection_tracker.snapshot()
+                logger.info("Tracker: pending=%d (%d species, %.1f MB) flushed=%d "
+                            "expired=%d evicted=%d",
+                            ts["pending"], ts["species_pending"], ts["pending_bytes"] / 1e6,
+                            ts["flushed"], ts["expired"], ts["evicted"])
+                gs = _gate_snapshot()
+                if gs is not None:
+                    logger.info("Energy gate: skipped=%d/%d (%.0f%%) audit_missed=%d/%d",
+                                gs["skipped"], gs["chunks"], 100 * gs["skip_ratio"],
+                                gs["missed"], gs["audited"])
+                enc = clip_encoder.stats()
+                logger.info("Clips: encoded=%d failed=%d ffmpeg_fallbacks=%d %.1f clips/s",
+                            enc["clips"], enc["failed"], enc["fallbacks"],
+                            enc["clips_per_second"])
     finally:
         observer.stop()
         observer.join()
+        ingest_queue.stop()
+        if analysis_pool is not None:
+            analysis_pool.close()
+        _close_media_writer()
+        _stop_metrics_exporter()
+        _close_score_store()
         logger.info("Analyzer stopped")
 
 
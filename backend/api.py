@@ -12,10 +12,12 @@ from pathlib import Path
 import yaml
 from fastapi import FastAPI, Query, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 
+import clip_encoder
 import database
+import score_store
 
 # WittyPi I2C power monitoring (graceful fallback when unavailable)
 try:
@@ -136,6 +138,23 @@ def health():
     return {"status": "ok", "power": _read_wittypi_power()}
 
 
+@app.get("/api/metrics")
+def get_metrics():
+    """Republish the analyzer's Prometheus metrics file, plus its age."""
+    metrics_path = Path(config.get("metrics", {}).get("file", "/dev/shm/birdnet_analyzer.prom"))
+    try:
+        body = metrics_path.read_text()
+        age = datetime.now().timestamp() - metrics_path.stat().st_mtime
+    except FileNotFoundError:
+        return PlainTextResponse("# analyzer metrics not available yet\n", status_code=503)
+    body += ("# TYPE birdnet_analyzer_metrics_age_seconds gauge\n"
+             f"birdnet_analyzer_metrics_age_seconds {age:.1f}\n")
+    # The API's own DB connection pool
+    for name, value in database.pool_stats().items():
+        body += f"# TYPE birdnet_api_db_pool_{name}_total counter\nbirdnet_api_db_pool_{name}_total {value}\n"
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+
 @app.get("/api/recent")
 def recent(limit: int = Query(10, ge=1, le=100)):
     return database.get_recent(str(data_dir), limit)
@@ -162,6 +181,37 @@ def species():
     return database.get_species(str(data_dir))
 
 
+_score_labels = None
+
+
+@app.get("/api/replay")
+def replay_scores(start: str = Query(...), end: str = Query(None),
+                  threshold: float = Query(None, ge=0.0, le=1.0),
+                  min_count: int = Query(None, ge=1),
+                  window_seconds: float = Query(None, gt=0),
+                  detections: bool = Query(False)):
+    """Re-threshold the analyzer's stored top-k scores over a date range."""
+    global _score_labels
+    try:
+        start_day = datetime.strptime(start, "%Y-%m-%d").date()
+        end_day = datetime.strptime(end, "%Y-%m-%d").date() if end else start_day
+    except ValueError:
+        return JSONResponse({"error": "dates must be YYYY-MM-DD"}, status_code=400)
+    if (end_day - start_day).days > 366:
+        return JSONResponse({"error": "range is limited to one year"}, status_code=400)
+    if _score_labels is None:
+        _score_labels = score_store.load_labels(Path(__file__).parent / config["model"]["labels"])
+
+    result = score_store.replay(
+        data_dir / "scores", start_day, end_day,
+        threshold=threshold if threshold is not None else config["confidence_threshold"],
+        min_count=min_count if min_count is not None else config.get("min_detection_count", 2),
+        window_seconds=(window_seconds if window_seconds is not None
+                        else config.get("detection_window_seconds", 300)),
+    )
+    return score_store.summarize(result, _score_labels, detections)
+
+
 @app.get("/api/spectrogram/{date}/{species}/{filename}")
 def get_spectrogram(date: str, species: str, filename: str):
     file_path = data_dir / "detections" / date / species / filename
@@ -180,7 +230,7 @@ def get_audio(date: str, species: str, filename: str):
         return JSONResponse({"error": "not found"}, status_code=404)
     if not file_path.resolve().is_relative_to(data_dir.resolve()):
         return JSONResponse({"error": "forbidden"}, status_code=403)
-    return FileResponse(str(file_path), media_type="audio/mpeg")
+    return FileResponse(str(file_path), media_type=clip_encoder.mime_type_for(file_path))
 
 
 # ---------------------------------------------------------------------------
@@ -357,7 +407,7 @@ def reset_data():
 
     errors = []
 
-    for subdir in ["detections", "StreamData", "bird_images"]:
+    for subdir in ["detections", "StreamData", "bird_images", "scores"]:
         target = data_dir / subdir
         logger.info("subdir %s  exists=%s", target, target.exists())
         if target.exists():
@@ -376,13 +426,16 @@ def reset_data():
 
     db_file = data_dir / "birds.db"
     logger.info("db_file=%s  exists=%s", db_file, db_file.exists())
-    if db_file.exists():
-        try:
-            db_file.unlink()
-            logger.info("deleted %s", db_file)
-        except OSError as e:
-            logger.error("failed to delete %s: %s", db_file, e)
-            errors.append(str(e))
+    database.close_pool(str(data_dir))
+    # WAL mode keeps recent commits in the -wal file; it must go with the DB
+    for path in (db_file, db_file.with_name("birds.db-wal"), db_file.with_name("birds.db-shm")):
+        if path.exists():
+            try:
+                path.unlink()
+                logger.info("deleted %s", path)
+            except OSError as e:
+                logger.error("failed to delete %s: %s", path, e)
+                errors.append(str(e))
 
     # Recreate the DB with an empty schema so live services don't hit "no such table"
     try:
@@ -0,0 +1,198 @@
+"""Fast WAV loading: memory-mapped int16 PCM straight to float32.
+
+The recorder always writes 48 kHz mono S16_LE, so the common case needs no
+decoder and no resampler. Anything else (other sample widths, FLAC, other
+rates or channel counts) goes through soundfile and, when the rate differs,
+a polyphase resampler whose filter is designed once per rate pair.
+
+iter_blocks() decodes the same formats a block at a time for multi-hour
+recordings, so memory stays flat regardless of file length.
+"""
+
+import logging
+import struct
+from functools import lru_cache
+from math import gcd
+from pathlib import Path
+from typing import Callable, Iterator
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+_INT16_SCALE = np.float32(1.0 / 32768.0)
+
+
+def _find_pcm16_data(path: Path) -> tuple[int, int, int, int] | None:
+    """Walk the RIFF chunks of a WAV file.
+
+    Returns (sample_rate, channels, data_offset, data_bytes) for 16-bit PCM,
+    or None when the file is not something the fast path can handle.
+    """
+    file_size = path.stat().st_size
+    with open(path, "rb") as f:
+        riff = f.read(12)
+        if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+            return None
+
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                return None
+            chunk_id, chunk_size = struct.unpack("<4sI", header)
+            if chunk_id == b"fmt ":
+                body = f.read(chunk_size)
+                if len(body) < 16:
+                    return None
+                fmt = struct.unpack("<HHIIHH", body[:16])
+            elif chunk_id == b"data":
+                if fmt is None:
+                    return None
+                fmt_tag, channels, sample_rate, _byte_rate, _align, bits = fmt
+                if fmt_tag not in (_WAVE_FORMAT_PCM, _WAVE_FORMAT_EXTENSIBLE) or bits != 16:
+                    return None
+                offset = f.tell()
+                # arecord may leave a placeholder size if it was interrupted
+                data_bytes = min(chunk_size, file_size - offset)
+                return sample_rate, channels, offset, data_bytes
+            else:
+                f.seek(chunk_size + (chunk_size & 1), 1)
+
+
+@lru_cache(maxsize=8)
+def _polyphase_filter(up: int, down: int) -> np.ndarray:
+    """Anti-aliasing FIR for resample_poly, designed once per rate ratio."""
+    from scipy.signal import firwin
+
+    max_rate = max(up, down)
+    half_len = 10 * max_rate
+    return firwin(2 * half_len + 1, 1.0 / max_rate, window=("kaiser", 5.0))
+
+
+def _resample(audio: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    from scipy.signal import resample_poly
+
+    g = gcd(orig_sr, target_sr)
+    up, down = target_sr // g, orig_sr // g
+    logger.debug("Resampling %d Hz → %d Hz (up=%d, down=%d)", orig_sr, target_sr, up, down)
+    return resample_poly(audio, up, down, window=_polyphase_filter(up, down)).astype(np.float32)
+
+
+def load_audio(path: Path, sr: int) -> tuple[np.ndarray, int]:
+    """Load an audio file as mono float32 at the requested sample rate.
+
+    Returns (audio, sr).
+    """
+    path = Path(path)
+    info = _find_pcm16_data(path)
+
+    if info is not None:
+        file_sr, channels, offset, data_bytes = info
+        frames = data_bytes // (2 * channels)
+        if frames == 0:
+            return np.zeros(0, dtype=np.float32), sr
+        pcm = np.memmap(path, dtype="<i2", mode="r", offset=offset,
+                        shape=(frames * channels,))
+        if channels == 1:
+            audio = np.multiply(pcm, _INT16_SCALE, dtype=np.float32)
+        else:
+            audio = pcm.reshape(frames, channels).mean(axis=1, dtype=np.float32)
+            audio *= _INT16_SCALE
+        del pcm
+    else:
+        import soundfile as sf
+
+        logger.debug("%s is not 16-bit PCM WAV — decoding with soundfile", path.name)
+        data, file_sr = sf.read(str(path), dtype="float32", always_2d=True)
+        channels = data.shape[1]
+        audio = data[:, 0] if channels == 1 else data.mean(axis=1, dtype=np.float32)
+        audio = np.ascontiguousarray(audio)
+
+    if file_sr != sr:
+        audio = _resample(audio, file_sr, sr)
+    return audio, sr
+
+
+def _open_reader(path: Path) -> tuple[int, int, Callable[[int, int], np.ndarray], Callable[[], None]]:
+    """Random-access mono float32 reader: (sample_rate, frames, read(start, n), close)."""
+    info = _find_pcm16_data(path)
+    if info is not None:
+        file_sr, channels, offset, data_bytes = info
+        frames = data_bytes // (2 * channels)
+        pcm = np.memmap(path, dtype="<i2", mode="r", offset=offset,
+                        shape=(frames, channels)) if frames else None
+
+        def read(start: int, n: int) -> np.ndarray:
+            block = pcm[start:start + n]
+            if channels == 1:
+                return np.multiply(block[:, 0], _INT16_SCALE, dtype=np.float32)
+            return block.mean(axis=1, dtype=np.float32) * _INT16_SCALE
+
+        def close():
+            nonlocal pcm
+            pcm = None
+
+        return file_sr, frames, read, close
+
+    import soundfile as sf
+
+    f = sf.SoundFile(str(path))
+
+    def read(start: int, n: int) -> np.ndarray:
+        f.seek(start)
+        data = f.read(n, dtype="float32", always_2d=True)
+        return np.ascontiguousarray(data[:, 0] if f.channels == 1
+                                    else data.mean(axis=1, dtype=np.float32))
+
+    return f.samplerate, f.frames, read, f.close
+
+
+def audio_duration(path: Path) -> float:
+    """Length of an audio file in seconds, without decoding it."""
+    file_sr, frames, _read, close = _open_reader(Path(path))
+    close()
+    return frames / file_sr
+
+
+def iter_blocks(path: Path, sr: int, block_frames: int) -> Iterator[np.ndarray]:
+    """Yield an audio file as consecutive mono float32 blocks at sr.
+
+    Blocks are block_frames long (the last may be shorter) and concatenate
+    to what load_audio() returns. When resampling, each block is read with
+    enough neighbouring input for the polyphase filter and then trimmed,
+    so block edges introduce no discontinuities.
+    """
+    path = Path(path)
+    file_sr, frames, read, close = _open_reader(path)
+    try:
+        if file_sr == sr:
+            for start in range(0, frames, block_frames):
+                yield read(start, block_frames)
+            return
+
+        from scipy.signal import resample_poly
+
+        g = gcd(file_sr, sr)
+        up, down = sr // g, file_sr // g
+        logger.debug("Block-resampling %s: %d Hz → %d Hz (up=%d, down=%d)",
+                     path.name, file_sr, sr, up, down)
+        window = _polyphase_filter(up, down)
+        # Input context either side, aligned to down so output samples line up
+        pad = -(-(len(window) // 2 // up + 1) // down) * down
+        # Whole input blocks per output block, also aligned to down
+        in_block = max(down, block_frames * down // up // down * down)
+        total_out = -(-frames * up // down)
+
+        for start in range(0, frames, in_block):
+            lo = max(0, start - pad)
+            hi = min(frames, start + in_block + pad)
+            out = resample_poly(read(lo, hi - lo), up, down, window=window)
+            first = (start - lo) * up // down
+            out_start = start * up // down
+            n = min(in_block * up // down, total_out - out_start)
+            yield out[first:first + n].astype(np.float32)
+    finally:
+        close()
@@ -0,0 +1,274 @@
+"""Offline analyzer benchmark: replays WAVs through the real file pipeline.
+
+    python bench.py --synthetic 20                 # generated noise + tone fixtures
+    python bench.py --wav-dir /path/to/wavs --save # real recordings, full save path
+    python bench.py --synthetic 20 --output before.json
+
+Files go through analyzer.process_wav exactly as the watcher would hand
+them over (copies are used, since processing deletes the WAV). Each stage
+is timed by wrapping the analyzer function that implements it, and the
+run is summarised as JSON so two commits can be diffed. Without --save,
+save_detection is replaced by a counter; with it, detections are written
+synchronously to a scratch data dir so spectrogram, encode and DB time are
+measured too. Nothing touches the station's real data dir.
+"""
+
+import argparse
+import json
+import logging
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import wave
+from datetime import datetime, timedelta
+from functools import wraps
+from pathlib import Path
+
+import numpy as np
+
+import analyzer
+import capture
+import clip_encoder
+import database
+import spectrogram as spec_module
+
+
+class StageTimer:
+    """Accumulates call counts and wall time per named stage."""
+
+    def __init__(self):
+        self.calls: dict[str, int] = {}
+        self.seconds: dict[str, float] = {}
+
+    def wrap(self, owner, attr: str, stage: str):
+        """Replace owner.attr with a timed version of itself."""
+        func = getattr(owner, attr)
+
+        @wraps(func)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add(stage, time.perf_counter() - started)
+
+        setattr(owner, attr, timed)
+
+    def add(self, stage: str, seconds: float):
+        self.calls[stage] = self.calls.get(stage, 0) + 1
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+
+    def report(self) -> dict:
+        return {
+            stage: {
+                "calls": self.calls[stage],
+                "total_s": round(self.seconds[stage], 6),
+                "mean_ms": round(1e3 * self.seconds[stage] / self.calls[stage], 3),
+            }
+            for stage in self.calls
+        }
+
+
+def make_fixtures(out_dir: Path, count: int, sample_rate: int, duration: int) -> list[Path]:
+    """Write count back-to-back synthetic WAVs (noise plus tone bursts) named like the recorder's."""
+    frames = sample_rate * duration
+    source = capture.synthetic_source(sample_rate, frames, threading.Event(),
+                                      seconds=count * duration)
+    start = datetime(2026, 5, 1, 6, 0, 0)
+    paths = []
+    for i, pcm in enumerate(source):
+        path = out_dir / f"{(start + timedelta(seconds=i * duration)):%Y-%m-%d-%H-%M-%S}.wav"
+        with wave.open(str(path), "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(sample_rate)
+            w.writeframes(pcm.astype("<i2").tobytes())
+        paths.append(path)
+    return paths
+
+
+def _audio_seconds(path: Path) -> float:
+    try:
+        with wave.open(str(path), "rb") as w:
+            return w.getnframes() / w.getframerate()
+    except (wave.Error, EOFError):
+        import soundfile as sf
+        return sf.info(str(path)).duration
+
+
+def _peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                             text=True, timeout=5, cwd=Path(__file__).parent)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run(wav_paths: list[Path], scratch: Path, save: bool) -> dict:
+    """Process copies of wav_paths one by one and return the benchmark report."""
+    cfg = analyzer.config
+    timer = StageTimer()
+
+    analyzer.data_dir = scratch / "data"
+    stream_dir = analyzer.data_dir / "StreamData"
+    stream_dir.mkdir(parents=True)
+    database.init_db(str(analyzer.data_dir))
+
+    analyzer.detection_tracker = analyzer.DetectionTracker(
+        min_count=cfg.get("min_detection_count", 2),
+        window_seconds=cfg.get("detection_window_seconds", 300),
+        max_pending_bytes=int(cfg.get("max_pending_audio_mb", 64) * 1024 * 1024),
+    )
+
+    saved = 0
+
+    def count_detection(*_args, **_kwargs):
+        nonlocal saved
+        saved += 1
+
+    if save:
+        # Synchronous saves (no media writer) so their cost lands in this run
+        analyzer.media_writer = None
+        timer.wrap(spec_module, "generate_spectrogram", "spectrogram")
+        timer.wrap(clip_encoder, "encode_clip", "encode")
+        timer.wrap(database, "insert_detection", "db_insert")
+        timer.wrap(analyzer, "_write_detection", "save")
+    else:
+        analyzer.save_detection = count_detection
+
+    timer.wrap(analyzer, "load_audio", "decode")
+    timer.wrap(analyzer, "prepare_wav", "prepare")
+    timer.wrap(analyzer, "_run_inference", "invoke")
+    timer.wrap(analyzer, "_postprocess", "postprocess")
+    timer.wrap(analyzer, "_track_and_save", "track")
+    if analyzer.energy_gate is not None:
+        timer.wrap(analyzer.energy_gate, "evaluate", "gate")
+
+    # First invoke allocates and (with XNNPACK) packs weights; keep it out of the totals
+    started = time.perf_counter()
+    analyzer._run_inference(np.zeros((1, analyzer._expected_samples()), dtype=np.float32))
+    warmup_s = time.perf_counter() - started
+    timer.calls.clear()
+    timer.seconds.clear()
+
+    audio_seconds = 0.0
+    wall = 0.0
+    per_file = []
+    for path in wav_paths:
+        copy = stream_dir / path.name
+        shutil.copyfile(path, copy)
+        audio_seconds += _audio_seconds(copy)
+        started = time.perf_counter()
+        analyzer.process_wav(copy)
+        elapsed = time.perf_counter() - started
+        wall += elapsed
+        per_file.append(elapsed)
+
+    stages = timer.report()
+    # prepare_wav = decode + chunking; report chunking on its own
+    if "prepare" in stages:
+        chunk_s = timer.seconds["prepare"] - timer.seconds.get("decode", 0.0)
+        stages["chunk"] = {
+            "calls": timer.calls["prepare"],
+            "total_s": round(chunk_s, 6),
+            "mean_ms": round(1e3 * chunk_s / timer.calls["prepare"], 3),
+        }
+        del stages["prepare"]
+
+    chunks = timer.calls.get("postprocess", 0)
+    tracker = analyzer.detection_tracker.snapshot()
+    record_duration = cfg["audio"]["record_duration"]
+    per_file = np.array(per_file) if per_file else np.zeros(1)
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "machine": platform.machine(),
+        "python": platform.python_version(),
+        "tflite_backend": analyzer._INTERP_BACKEND,
+        "config": {
+            "model_variant": cfg["model"].get("variant"),
+            "batch_size": analyzer.batch_size,
+            "num_threads": cfg["model"].get("num_threads"),
+            "xnnpack": cfg["model"].get("xnnpack", True),
+            "overlap": cfg["audio"].get("overlap", 0.0),
+            "energy_gate": analyzer.energy_gate is not None,
+            "species_filter": analyzer._species_source is not None,
+            "save": save,
+        },
+        "files": len(wav_paths),
+        "audio_seconds": round(audio_seconds, 3),
+        "wall_seconds": round(wall, 6),
+        "warmup_seconds": round(warmup_s, 6),
+        "chunks_analyzed": chunks,
+        "chunks_per_second": round(chunks / wall, 3) if wall else 0.0,
+        "realtime_factor": round(wall / audio_seconds, 6) if audio_seconds else None,
+        "file_seconds_p50": round(float(np.median(per_file)), 6),
+        "file_seconds_max": round(float(per_file.max()), 6),
+        "record_duration": record_duration,
+        "record_duration_used": round(float(np.median(per_file)) / record_duration, 6),
+        "detections_saved": saved if not save else timer.calls.get("save", 0),
+        "tracker_pending": tracker["pending"],
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "stages": stages,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--wav-dir", type=Path, help="directory of recorder-named WAVs to replay")
+    source.add_argument("--synthetic", type=int, metavar="N",
+                        help="generate N record_duration-long noise + tone fixtures")
+    parser.add_argument("--save", action="store_true",
+                        help="run the real save path (spectrogram, clip, DB) into a scratch dir")
+    parser.add_argument("--output", type=Path, help="write the JSON report here instead of stdout")
+    parser.add_argument("--verbose", action="store_true", help="keep the analyzer's INFO/DEBUG logging")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.getLogger("analyzer").setLevel(logging.WARNING)
+
+    analyzer.load_config()
+    analyzer.load_model()
+    analyzer.load_labels()
+    analyzer.load_species_filter()
+    analyzer.load_energy_gate()
+
+    with tempfile.TemporaryDirectory(prefix="birdnet-bench-") as tmp:
+        scratch = Path(tmp)
+        if args.synthetic:
+            fixtures = scratch / "fixtures"
+            fixtures.mkdir()
+            audio_cfg = analyzer.config["audio"]
+            wav_paths = make_fixtures(fixtures, args.synthetic,
+                                      audio_cfg["sample_rate"], audio_cfg["record_duration"])
+        else:
+            wav_paths = sorted(args.wav_dir.glob("*.wav"))
+            if not wav_paths:
+                parser.error(f"no .wav files in {args.wav_dir}")
+        report = run(wav_paths, scratch, args.save)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+        print(f"Wrote {args.output} — RTF {report['realtime_factor']}, "
+              f"{report['chunks_per_second']} chunks/s, peak RSS {report['peak_rss_mb']} MB")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""In-memory audio capture: PCM sources feeding a ring buffer of analysis windows.
+
+Used by the analyzer's streaming mode instead of recorder.py's 15 s WAV files.
+A capture thread pulls int16 blocks from a source (arecord stdout, a file, a
+remote pi_audio_server's /stream, or a synthetic signal) into a RingBuffer;
+the analyzer slices fixed-length windows out of it, so nothing is written to
+the SD card unless a detection is saved.
+"""
+
+import bisect
+import http.client
+import logging
+import subprocess
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_INT16_SCALE = np.float32(1.0 / 32768.0)
+_MAX_GAP_FILL_SECONDS = 10.0  # longer than any analysis window
+
+
+class RingBuffer:
+    """Fixed-capacity int16 ring addressed by absolute sample position.
+
+    A lossy buffer (live capture) overwrites the oldest samples when the
+    reader falls behind; a lossless one (file/synthetic replay) makes the
+    writer wait instead.
+    """
+
+    def __init__(self, capacity: int, lossless: bool = False):
+        self.capacity = capacity
+        self.lossless = lossless
+        self._buf = np.zeros(capacity, dtype=np.int16)
+        self._written = 0   # total samples ever written
+        self._released = 0  # samples the reader no longer needs
+        self._closed = False
+        self._cond = threading.Condition()
+        self.dropped = 0
+
+    @property
+    def written(self) -> int:
+        return self._written
+
+    def write(self, block: np.ndarray):
+        block = block[-self.capacity:]
+        n = len(block)
+        with self._cond:
+            if self.lossless:
+                self._cond.wait_for(
+                    lambda: self._closed or self._written + n - self._released <= self.capacity)
+                if self._closed:
+                    return
+            pos = self._written % self.capacity
+            first = min(n, self.capacity - pos)
+            self._buf[pos:pos + first] = block[:first]
+            self._buf[:n - first] = block[first:]
+            self._written += n
+            self._cond.notify_all()
+
+    def read(self, start: int, n: int) -> tuple[int, np.ndarray] | None:
+        """Wait for samples [start, start+n) and return (start, float32 copy).
+
+        If the writer has already overwritten part of the range, the read
+        skips forward to the oldest samples still held. Returns None once
+        the buffer is closed and cannot satisfy the request.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._closed or self._written >= start + n)
+            if self._written < start + n:
+                return None
+            oldest = self._written - self.capacity
+            if start < oldest:
+                self.dropped += oldest - start
+                logger.warning("Capture overrun: reader fell behind, dropped %d samples",
+                               oldest - start)
+                start = oldest
+            pos = start % self.capacity
+            first = min(n, self.capacity - pos)
+            out = np.empty(n, dtype=np.float32)
+            np.multiply(self._buf[pos:pos + first], _INT16_SCALE, out=out[:first])
+            np.multiply(self._buf[:n - first], _INT16_SCALE, out=out[first:])
+            return start, out
+
+    def release(self, upto: int):
+        """Tell a lossless writer that samples before upto may be overwritten."""
+        with self._cond:
+            self._released = max(self._released, upto)
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+# ---------------------------------------------------------------------------
+# Sources — generators of int16 blocks
+# ---------------------------------------------------------------------------
+
+def arecord_source(device: str, sample_rate: int, block_frames: int,
+                   stop: threading.Event) -> Iterator[np.ndarray]:
+    """Stream raw S16_LE mono PCM from arecord's stdout."""
+    cmd = [
+        "arecord",
+        "-D", device,
+        "-f", "S16_LE",
+        "-c", "1",
+        "-r", str(sample_rate),
+        "-t", "raw",
+        "-q",
+    ]
+    logger.info("Starting capture: %s", " ".join(cmd))
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    block_bytes = block_frames * 2
+    try:
+        while not stop.is_set():
+            data = proc.stdout.read(block_bytes)
+            if not data:
+                err = proc.stderr.read().decode(errors="replace").strip()
+                logger.error("arecord exited (rc=%s): %s", proc.poll(), err)
+                return
+            yield np.frombuffer(data[:len(data) - len(data) % 2], dtype="<i2")
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def file_source(path: Path, sample_rate: int, block_frames: int,
+                stop: threading.Event, realtime: bool = False) -> Iterator[np.ndarray]:
+    """Replay an audio file as if it were being captured."""
+    from audio_loader import load_audio
+
+    audio, _ = load_audio(path, sample_rate)
+    pcm = np.clip(audio * 32768.0, -32768, 32767).astype(np.int16)
+    logger.info("Replaying %s (%.1fs) as capture source", Path(path).name, len(pcm) / sample_rate)
+    for start in range(0, len(pcm), block_frames):
+        if stop.is_set():
+            return
+        yield pcm[start:start + block_frames]
+        if realtime:
+            time.sleep(block_frames / sample_rate)
+
+
+def synthetic_source(sample_rate: int, block_frames: int, stop: threading.Event,
+                     tone_hz: float = 3000.0, seconds: float | None = None,
+                     realtime: bool = False) -> Iterator[np.ndarray]:
+    """Low-level noise with a 1 s tone burst every 5 s, for local testing."""
+    rng = np.random.default_rng(0)
+    produced = 0
+    limit = None if seconds is None else int(seconds * sample_rate)
+    while not stop.is_set() and (limit is None or produced < limit):
+        t = (produced + np.arange(block_frames)) / sample_rate
+        signal = rng.normal(0.0, 0.01, block_frames)
+        signal += np.where(t % 5.0 < 1.0, 0.3 * np.sin(2 * np.pi * tone_hz * t), 0.0)
+        yield np.clip(signal * 32768.0, -32768, 32767).astype(np.int16)
+        produced += block_frames
+        if realtime:
+            time.sleep(block_frames / sample_rate)
+
+
+def remote_source(url: str, sample_rate: int, stop: threading.Event,
+                  codec: str = "flac",
+                  backoff_max: float = 30.0) -> Iterator[tuple[np.ndarray, float]]:
+    """Follow a pi_audio_server's /stream, resuming by sequence number after drops.
+
+    Yields (pcm, capture_time) so StreamCapture timestamps windows with the
+    server's clock rather than when frames happened to arrive. Frames the
+    server no longer had when we reconnected, or missed while it restarted,
+    are replaced by silence spanning the capture_time gap (at most
+    _MAX_GAP_FILL_SECONDS; later frames carry their own time anyway), so
+    windows don't splice audio across it.
+    """
+    from remote_client import AudioServerClient, RemoteError
+
+    client = AudioServerClient(url)
+    next_seq = None
+    next_time = None  # capture_time the frame after the last one should have
+    failures = 0
+    while not stop.is_set():
+        try:
+            for frame in client.stream(next_seq, codec):
+                if frame.sample_rate != sample_rate:
+                    logger.error("Remote stream is %d Hz, expected %d — stopping",
+                                 frame.sample_rate, sample_rate)
+                    return
+                if next_seq is not None and frame.seq != next_seq:
+                    gap = int(round((frame.capture_time - next_time) * sample_rate))
+                    gap = min(gap, int(_MAX_GAP_FILL_SECONDS * sample_rate))
+                    if frame.seq < next_seq:
+                        logger.warning("Remote stream: server restarted (seq %d, expected %d) — "
+                                       "filling %.2f s with silence",
+                                       frame.seq, next_seq, max(gap, 0) / sample_rate)
+                    else:
+                        logger.warning("Remote stream: %d frame(s) lost — filling %.2f s with silence",
+                                       frame.seq - next_seq, max(gap, 0) / sample_rate)
+                    if gap > 0:
+                        yield np.zeros(gap, dtype=np.int16), next_time
+                next_seq = frame.seq + 1
+                next_time = frame.capture_time + len(frame.pcm) / sample_rate
+                failures = 0
+                yield frame.pcm, frame.capture_time
+                if stop.is_set():
+                    return
+            logger.warning("Remote stream closed by server — reconnecting")
+        except (OSError, EOFError, ValueError, RemoteError, http.client.HTTPException) as e:
+            failures += 1
+            delay = min(backoff_max, 2 ** failures)
+            logger.warning("Remote stream error (%s) — resuming from seq %s in %.0fs",
+                           e, next_seq, delay)
+            stop.wait(delay)
+
+
+# ---------------------------------------------------------------------------
+# Capture
+# ---------------------------------------------------------------------------
+
+class StreamCapture:
+    """Runs a source on a background thread and yields analysis windows.
+
+    Sources yield int16 blocks, or (block, capture_time) pairs when they know
+    the epoch time of the block's first sample; those anchor time_at().
+    """
+
+    def __init__(self, source_factory, sample_rate: int, buffer_seconds: float,
+                 lossless: bool = False):
+        self.sample_rate = sample_rate
+        self.stop_event = threading.Event()
+        self.ring = RingBuffer(int(buffer_seconds * sample_rate), lossless=lossless)
+        self.start_time: datetime | None = None
+        # (sample position, epoch time) anchors from timestamped sources
+        self._anchors: list[tuple[int, float]] = []
+        self._anchor_lock = threading.Lock()
+        self._source_factory = source_factory
+        self._thread = threading.Thread(target=self._run, name="capture", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        """Ask the source to finish; safe to call from a signal handler."""
+        self.stop_event.set()
+        self.ring.close()
+
+    def join(self):
+        self._thread.join(timeout=10)
+
+    def _run(self):
+        try:
+            for block in self._source_factory(self.stop_event):
+                if isinstance(block, tuple):
+                    block, capture_time = block
+                    self._add_anchor(capture_time)
+                if self.start_time is None:
+                    # Back-date to the first sample of the first block
+                    self.start_time = datetime.now() - timedelta(
+                        seconds=len(block) / self.sample_rate)
+                self.ring.write(block)
+        except Exception as e:
+            logger.error("Capture source failed: %s", e, exc_info=True)
+        finally:
+            self.ring.close()
+
+    def _add_anchor(self, capture_time: float):
+        pos = self.ring.written
+        with self._anchor_lock:
+            self._anchors.append((pos, capture_time))
+            # Keep one anchor at or before the oldest sample the ring still holds
+            oldest = pos - self.ring.capacity
+            drop = bisect.bisect_right(self._anchors, oldest, key=lambda a: a[0]) - 1
+            if drop > 0:
+                del self._anchors[:drop]
+
+    def time_at(self, sample: int) -> datetime:
+        """Wall-clock capture time of an absolute sample position."""
+        with self._anchor_lock:
+            i = bisect.bisect_right(self._anchors, sample, key=lambda a: a[0]) - 1
+            anchor = self._anchors[max(i, 0)] if self._anchors else None
+        if anchor is not None:
+            pos, capture_time = anchor
+            return datetime.fromtimestamp(capture_time + (sample - pos) / self.sample_rate)
+        return (self.start_time or datetime.now()) + timedelta(seconds=sample / self.sample_rate)
+
+    def windows(self, window_samples: int,
+                hop: int | None = None) -> Iterator[tuple[int, np.ndarray]]:
+        """Yield (start_sample, float32 window) pairs every hop samples until the source ends."""
+        hop = hop or window_samples
+        cursor = 0
+        while True:
+            got = self.ring.read(cursor, window_samples)
+            if got is None:
+                return
+            start, window = got
+            yield start, window
+            cursor = start + hop
+            self.ring.release(cursor)
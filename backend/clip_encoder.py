@@ -0,0 +1,108 @@
+"""In-process encoding of detection clips (MP3, Ogg/Opus or FLAC).
+
+libsndfile (via soundfile) encodes straight from the float32 chunk, so a
+clip costs no temp WAV and no ffmpeg process. Older libsndfile builds
+without MP3/Opus support fall back to a single ffmpeg call fed over stdin.
+"""
+
+import logging
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# format name -> (file suffix, soundfile format, soundfile subtype, MIME type)
+FORMATS = {
+    "mp3": (".mp3", "MP3", "MPEG_LAYER_III", "audio/mpeg"),
+    "ogg": (".ogg", "OGG", "OPUS", "audio/ogg"),
+    "flac": (".flac", "FLAC", "PCM_16", "audio/flac"),
+}
+
+# Roughly matches the old `ffmpeg -q:a 6` VBR quality
+_COMPRESSION_LEVEL = 0.6
+
+_lock = threading.Lock()
+_stats = {"clips": 0, "failed": 0, "fallbacks": 0, "seconds": 0.0}
+_native_ok: dict[str, bool] = {}  # format -> libsndfile can encode it
+
+
+def suffix_for(fmt: str) -> str:
+    return FORMATS[fmt][0]
+
+
+def mime_type_for(path: str | Path) -> str:
+    """MIME type for a clip file, by suffix."""
+    suffix = Path(path).suffix.lower()
+    for ext, _fmt, _subtype, mime in FORMATS.values():
+        if ext == suffix:
+            return mime
+    return "application/octet-stream"
+
+
+def _encode_native(audio: np.ndarray, sr: int, path: Path, fmt: str):
+    import soundfile as sf
+
+    _ext, sf_format, subtype, _mime = FORMATS[fmt]
+    kwargs = {}
+    if fmt in ("mp3", "ogg"):
+        kwargs["compression_level"] = _COMPRESSION_LEVEL
+    sf.write(str(path), audio, sr, format=sf_format, subtype=subtype, **kwargs)
+
+
+def _encode_ffmpeg(audio: np.ndarray, sr: int, path: Path):
+    result = subprocess.run(
+        ["ffmpeg", "-y", "-loglevel", "error",
+         "-f", "f32le", "-ar", str(sr), "-ac", "1", "-i", "pipe:0",
+         "-q:a", "6", str(path)],
+        input=np.ascontiguousarray(audio, dtype="<f4").tobytes(),
+        capture_output=True, timeout=30,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed (rc={result.returncode}): "
+                           f"{result.stderr.decode(errors='replace').strip()}")
+
+
+def encode_clip(audio: np.ndarray, sr: int, path: Path, fmt: str = "mp3"):
+    """Encode a mono float32 clip to path in the given format."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown clip format: {fmt!r}")
+
+    started = time.perf_counter()
+    try:
+        if _native_ok.get(fmt, True):
+            try:
+                _encode_native(audio, sr, path, fmt)
+            except Exception as e:
+                # Only give up on libsndfile for this format if it never worked
+                if fmt in _native_ok:
+                    raise
+                logger.warning("libsndfile cannot encode %s (%s) — falling back to ffmpeg", fmt, e)
+                _native_ok[fmt] = False
+                path.unlink(missing_ok=True)
+                _encode_ffmpeg(audio, sr, path)
+            else:
+                _native_ok[fmt] = True
+        else:
+            _encode_ffmpeg(audio, sr, path)
+    except Exception:
+        with _lock:
+            _stats["failed"] += 1
+        raise
+
+    with _lock:
+        _stats["clips"] += 1
+        _stats["seconds"] += time.perf_counter() - started
+        if not _native_ok.get(fmt, True):
+            _stats["fallbacks"] += 1
+
+
+def stats() -> dict:
+    """Clips encoded so far and encoder throughput in clips per second."""
+    with _lock:
+        out = dict(_stats)
+    out["clips_per_second"] = out["clips"] / out["seconds"] if out["seconds"] else 0.0
+    return out
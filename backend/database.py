@@ -1,10 +1,21 @@
-"""SQLite database operations for BirdNET detections."""
+"""SQLite database operations for BirdNET detections.
 
+Connections are pooled per process and database file, so the schema is
+parsed and statements are prepared once rather than on every call. The
+database runs in WAL mode: the API's readers see the last committed
+state and never wait for the analyzer's inserts, and a write only waits
+for another writer.
+"""
+
+import os
+import queue
 import sqlite3
+import threading
 import time
 import logging
 from pathlib import Path
 from datetime import datetime, timedelta
+from typing import Callable
 
 logger = logging.getLogger(__name__)
 
@@ -19,37 +30,274 @@ CREATE TABLE IF NOT EXISTS detections (
     file_path TEXT NOT NULL,
     audio_path TEXT NOT NULL
 );
+"""
+
+# Per-day aggregates kept in step with detections by triggers, so the
+# dashboard's overview, species and hourly queries never scan the full table
+ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_species_counts (
+    date TEXT NOT NULL,
+    scientific_name TEXT NOT NULL,
+    common_name TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    max_confidence REAL NOT NULL,
+    PRIMARY KEY (date, scientific_name)
+) WITHOUT ROWID;
 
-CREATE INDEX IF NOT EXISTS idx_date ON detections(date);
-CREATE INDEX IF NOT EXISTS idx_species ON detections(scientific_name);
+CREATE TABLE IF NOT EXISTS hourly_counts (
+    date TEXT NOT NULL,
+    hour TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (date, hour)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS detections_rollup_insert AFTER INSERT ON detections
+BEGIN
+    INSERT INTO daily_species_counts (date, scientific_name, common_name, count, max_confidence)
+    VALUES (NEW.date, NEW.scientific_name, NEW.common_name, 1, NEW.confidence)
+    ON CONFLICT (date, scientific_name) DO UPDATE SET
+        count = count + 1,
+        common_name = excluded.common_name,
+        max_confidence = max(max_confidence, excluded.max_confidence);
+    INSERT INTO hourly_counts (date, hour, count)
+    VALUES (NEW.date, substr(NEW.time, 1, 2), 1)
+    ON CONFLICT (date, hour) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS detections_rollup_delete AFTER DELETE ON detections
+BEGIN
+    UPDATE daily_species_counts SET
+        count = count - 1,
+        max_confidence = coalesce((SELECT MAX(confidence) FROM detections
+                                   WHERE date = OLD.date AND scientific_name = OLD.scientific_name), 0)
+    WHERE date = OLD.date AND scientific_name = OLD.scientific_name;
+    DELETE FROM daily_species_counts
+    WHERE date = OLD.date AND scientific_name = OLD.scientific_name AND count <= 0;
+    UPDATE hourly_counts SET count = count - 1
+    WHERE date = OLD.date AND hour = substr(OLD.time, 1, 2);
+    DELETE FROM hourly_counts WHERE date = OLD.date AND hour = substr(OLD.time, 1, 2) AND count <= 0;
+END;
+"""
+
+ROLLUP_BACKFILL = """
+DELETE FROM daily_species_counts;
+DELETE FROM hourly_counts;
+INSERT INTO daily_species_counts (date, scientific_name, common_name, count, max_confidence)
+    SELECT g.date, g.scientific_name, d.common_name, g.n, g.max_confidence
+    FROM (SELECT date, scientific_name, COUNT(*) AS n, MAX(confidence) AS max_confidence,
+                 MAX(id) AS last_id
+          FROM detections GROUP BY date, scientific_name) g
+    JOIN detections d ON d.id = g.last_id;
+INSERT INTO hourly_counts (date, hour, count)
+    SELECT date, substr(time, 1, 2), COUNT(*) FROM detections GROUP BY date, substr(time, 1, 2);
 """
 
+# Seconds since 1970-01-01 00:00:00 of a row's date and time, read as they
+# are written (naive local time, no timezone conversion), so ts sorts exactly
+# like (date, time) whatever the process TZ or a DST change. Computed by
+# SQLite so the backfill, INSERT_SQL and the fallback trigger agree exactly.
+TS_EXPR = "CAST(strftime('%s', {date} || ' ' || {time}) AS INTEGER)"
+
+# ts replaces the TEXT date/time pair for ordering and range filters. The
+# implicit rowid at the end of each index breaks ts ties by id, so
+# ORDER BY ts DESC, id DESC is an index walk with no sort.
+TS_SCHEMA = f"""
+CREATE INDEX IF NOT EXISTS idx_ts ON detections(ts);
+CREATE INDEX IF NOT EXISTS idx_species_ts ON detections(scientific_name, ts);
+CREATE INDEX IF NOT EXISTS idx_common_ts ON detections(common_name, ts);
+DROP INDEX IF EXISTS idx_date;
+DROP INDEX IF EXISTS idx_species;
+
+CREATE TRIGGER IF NOT EXISTS detections_fill_ts AFTER INSERT ON detections
+WHEN NEW.ts IS NULL
+BEGIN
+    UPDATE detections SET ts = {TS_EXPR.format(date="NEW.date", time="NEW.time")} WHERE id = NEW.id;
+END;
+"""
+
+# PRAGMA user_version: 1 = rollup tables, 2 = ts column and indexes,
+# 3 = ts without the 'utc' conversion
+SCHEMA_VERSION = 3
+
 MAX_RETRIES = 3
 RETRY_DELAY = 0.5
 
+POOL_SIZE = 4               # connections per database file per process
+BUSY_TIMEOUT_MS = 10_000
+CACHE_KIB = 8 * 1024        # page cache per connection
+MMAP_BYTES = 64 * 1024 * 1024
+STATEMENT_CACHE = 64        # prepared statements kept per connection
+
+PRAGMAS = (
+    f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}",
+    "PRAGMA synchronous = NORMAL",  # WAL: durable at checkpoints, never corrupt
+    f"PRAGMA cache_size = -{CACHE_KIB}",
+    f"PRAGMA mmap_size = {MMAP_BYTES}",
+    "PRAGMA temp_store = MEMORY",
+)
+
 
 def _get_db_path(data_dir: str) -> str:
     return str(Path(data_dir) / "birds.db")
 
 
+class _Connection(sqlite3.Connection):
+    inode: int | None = None  # of the database file when opened
+
+
+class _Pool:
+    """Up to POOL_SIZE open connections to one database file.
+
+    A connection is handed to one thread at a time. Before reuse, the file's
+    inode is checked, so a database deleted and recreated by another process
+    (the API's reset) is reopened rather than written to after unlinking.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._open = 0
+        self.stats = {"opened": 0, "hits": 0, "waits": 0, "discarded": 0, "lock_retries": 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_MS / 1000,
+                               check_same_thread=False, cached_statements=STATEMENT_CACHE,
+                               factory=_Connection)
+        conn.row_factory = sqlite3.Row
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        conn.inode = _inode(self.db_path)
+        self._count("opened")
+        logger.debug("Opened DB connection %d/%d to %s", self._open, POOL_SIZE, self.db_path)
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._lock:
+                if self._open < POOL_SIZE:
+                    self._open += 1
+                    opening = True
+                else:
+                    opening = False
+            if opening:
+                try:
+                    return self._connect()
+                except Exception:
+                    with self._lock:
+                        self._open -= 1
+                    raise
+            self._count("waits")
+            conn = self._idle.get()
+        if conn.inode != _inode(self.db_path):
+            self.discard(conn)
+            return self.acquire()
+        self._count("hits")
+        return conn
+
+    def _count(self, key: str):
+        # acquire/release run on many threads; += on a shared dict loses updates
+        with self._lock:
+            self.stats[key] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self.stats)
+
+    def release(self, conn: sqlite3.Connection):
+        self._idle.put(conn)
+
+    def discard(self, conn: sqlite3.Connection):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._open -= 1
+            self.stats["discarded"] += 1
+
+    def close(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self.discard(conn)
+
+
+_pools: dict[str, _Pool] = {}
+_pools_lock = threading.Lock()
+_pools_pid = os.getpid()
+
+
+def _inode(path: str) -> int | None:
+    try:
+        return os.stat(path).st_ino
+    except FileNotFoundError:
+        return None
+
+
+def _get_pool(db_path: str) -> _Pool:
+    global _pools, _pools_pid
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            # Forked child: the parent's connections must not be used here
+            _pools, _pools_pid = {}, os.getpid()
+        pool = _pools.get(db_path)
+        if pool is None:
+            pool = _pools[db_path] = _Pool(db_path)
+        return pool
+
+
+def close_pool(data_dir: str):
+    """Close this process's idle connections to data_dir's database (e.g. before deleting it)."""
+    with _pools_lock:
+        pool = _pools.pop(_get_db_path(data_dir), None)
+    if pool is not None:
+        pool.close()
+
+
+def pool_stats() -> dict:
+    """Connection pool counters for this process, summed over database files."""
+    totals = {"opened": 0, "hits": 0, "waits": 0, "discarded": 0, "lock_retries": 0}
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        for key, value in pool.snapshot().items():
+            totals[key] += value
+    return totals
+
+
 def _execute_with_retry(db_path: str, func, *args):
     """Execute a database function with retry logic for busy/locked errors."""
+    pool = _get_pool(db_path)
     for attempt in range(MAX_RETRIES):
+        conn = pool.acquire()
         try:
-            conn = sqlite3.connect(db_path, timeout=10)
-            conn.row_factory = sqlite3.Row
-            try:
-                result = func(conn, *args)
-                conn.commit()
-                return result
-            finally:
-                conn.close()
+            result = func(conn, *args)
+            conn.commit()
+            pool.release(conn)
+            return result
         except (sqlite3.OperationalError, sqlite3.DatabaseError) as e:
+            if isinstance(e, sqlite3.OperationalError):
+                # Busy/locked: the connection is fine once the transaction is rolled back
+                conn.rollback()
+                pool.release(conn)
+                if "locked" in str(e) or "busy" in str(e):
+                    pool._count("lock_retries")
+            else:
+                pool.discard(conn)
             if attempt < MAX_RETRIES - 1:
                 logger.warning("DB retry %d/%d: %s", attempt + 1, MAX_RETRIES, e)
                 time.sleep(RETRY_DELAY * (attempt + 1))
             else:
                 raise
+        except BaseException:
+            pool.discard(conn)
+            raise
 
 
 def init_db(data_dir: str):
@@ -57,38 +305,214 @@ def init_db(data_dir: str):
     db_path = _get_db_path(data_dir)
     Path(db_path).parent.mkdir(parents=True, exist_ok=True)
 
-    conn = sqlite3.connect(db_path)
-    conn.executescript(SCHEMA)
-    conn.close()
-    logger.info("Database initialized at %s", db_path)
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+    try:
+        # WAL is a property of the file, so setting it once here covers every connection
+        mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+        conn.executescript(SCHEMA)
+        _migrate(conn)
+    finally:
+        conn.close()
+    logger.info("Database initialized at %s (journal_mode=%s)", db_path, mode)
+
+
+def _migrate(conn: sqlite3.Connection):
+    """Bring an older database up to SCHEMA_VERSION.
+
+    The API and the analyzer both call init_db at startup, so the version is
+    re-read under a write lock and only one of them does the work.
+    """
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            started = time.monotonic()
+            for statement in _split_sql(ROLLUP_SCHEMA) + _split_sql(ROLLUP_BACKFILL):
+                conn.execute(statement)
+            rows = conn.execute("SELECT COALESCE(SUM(count), 0) FROM daily_species_counts").fetchone()[0]
+            logger.info("Built rollup tables from %d detection(s) in %.1fs",
+                        rows, time.monotonic() - started)
+        if version < 2:
+            started = time.monotonic()
+            columns = [r[1] for r in conn.execute("PRAGMA table_info(detections)")]
+            if "ts" not in columns:
+                conn.execute("ALTER TABLE detections ADD COLUMN ts INTEGER")
+            conn.execute(f"UPDATE detections SET ts = {TS_EXPR.format(date='date', time='time')}")
+            for statement in _split_sql(TS_SCHEMA):
+                conn.execute(statement)
+            logger.info("Added ts column and indexes in %.1fs", time.monotonic() - started)
+        elif version < 3:
+            # ts was converted from local time to UTC, which depends on TZ and
+            # goes backwards across a DST change; recompute it naive
+            started = time.monotonic()
+            conn.execute("DROP TRIGGER IF EXISTS detections_fill_ts")
+            conn.execute(f"UPDATE detections SET ts = {TS_EXPR.format(date='date', time='time')}")
+            for statement in _split_sql(TS_SCHEMA):
+                conn.execute(statement)
+            logger.info("Recomputed ts as naive local time in %.1fs", time.monotonic() - started)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _split_sql(script: str) -> list[str]:
+    """Statements of a script, keeping trigger bodies whole (executescript would commit)."""
+    statements, current = [], ""
+    for line in script.strip().splitlines():
+        current += line + "\n"
+        if sqlite3.complete_statement(current):
+            statements.append(current.strip())
+            current = ""
+    return statements
+
+
+INSERT_SQL = (
+    "INSERT INTO detections (date, time, common_name, scientific_name, "
+    "confidence, file_path, audio_path, ts) VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, "
+    + TS_EXPR.format(date="?1", time="?2") + ")"
+)
+
+
+def insert_detections(data_dir: str, rows: list[tuple]):
+    """Insert several detection records in one transaction.
+
+    Each row is (date, time, common_name, scientific_name, confidence,
+    file_path, audio_path), as for insert_detection.
+    """
+    if not rows:
+        return
+
+    def _insert(conn):
+        conn.executemany(INSERT_SQL, rows)
+
+    _execute_with_retry(_get_db_path(data_dir), _insert)
+    for row in rows:
+        logger.info("Saved detection: %s (%.2f)", row[2], row[4])
 
 
 def insert_detection(data_dir: str, date: str, time_str: str, common_name: str,
                      scientific_name: str, confidence: float, file_path: str,
                      audio_path: str):
     """Insert a new detection record."""
-    def _insert(conn, *args):
-        conn.execute(
-            "INSERT INTO detections (date, time, common_name, scientific_name, "
-            "confidence, file_path, audio_path) VALUES (?, ?, ?, ?, ?, ?, ?)",
-            args
-        )
-
-    _execute_with_retry(
-        _get_db_path(data_dir), _insert,
-        date, time_str, common_name, scientific_name, confidence,
-        file_path, audio_path
-    )
-    logger.info("Saved detection: %s (%.2f)", common_name, confidence)
+    insert_detections(data_dir, [(date, time_str, common_name, scientific_name,
+                                  confidence, file_path, audio_path)])
+
+
+class DetectionWriter:
+    """Background group commit: queued rows are inserted together, one transaction per window.
+
+    The first row submitted opens a window of max_delay seconds, and the
+    window closes early once max_rows are queued. A tracker flush or a
+    file with many detections therefore costs one commit instead of one
+    per row. A failed commit is retried on the next window and the rows
+    stay queued. close() commits everything still queued before it
+    returns. on_commit(rows, seconds, ok) is called after each attempt.
+    """
+
+    def __init__(self, data_dir: str, max_delay: float = 0.2, max_rows: int = 64,
+                 on_commit: Callable[[int, float, bool], None] | None = None):
+        self.data_dir = data_dir
+        self.max_delay = max_delay
+        self.max_rows = max_rows
+        self._on_commit = on_commit
+        self._rows: list[tuple] = []
+        self._cond = threading.Condition()
+        self._closing = False
+        self._committed = 0  # rows submitted so far that are now committed
+        self._submitted = 0
+        self.stats = {"commits": 0, "rows": 0, "failures": 0,
+                      "commit_seconds_total": 0.0, "commit_seconds_max": 0.0}
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, row: tuple):
+        with self._cond:
+            self._rows.append(row)
+            self._submitted += 1
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._rows or self._closing)
+                if not self._rows:
+                    return
+                deadline = time.monotonic() + self.max_delay
+                while (len(self._rows) < self.max_rows and not self._closing
+                       and (remaining := deadline - time.monotonic()) > 0):
+                    self._cond.wait(remaining)
+                batch = self._rows
+                self._rows = []
+            if not self._commit(batch):
+                if self._closing:
+                    return
+                time.sleep(RETRY_DELAY)
+
+    def _commit(self, batch: list[tuple]) -> bool:
+        started = time.monotonic()
+        try:
+            insert_detections(self.data_dir, batch)
+            ok = True
+        except Exception as e:
+            logger.error("Group commit of %d detection(s) failed: %s", len(batch), e)
+            ok = False
+        elapsed = time.monotonic() - started
+        with self._cond:
+            if ok:
+                self.stats["commits"] += 1
+                self.stats["rows"] += len(batch)
+                self.stats["commit_seconds_total"] += elapsed
+                self.stats["commit_seconds_max"] = max(self.stats["commit_seconds_max"], elapsed)
+                self._committed += len(batch)
+            else:
+                self.stats["failures"] += 1
+                self._rows[:0] = batch
+            self._cond.notify_all()
+        if self._on_commit is not None:
+            self._on_commit(len(batch), elapsed, ok)
+        return ok
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Block until every row submitted so far is committed. False on timeout."""
+        with self._cond:
+            target = self._submitted
+            return self._cond.wait_for(lambda: self._committed >= target, timeout)
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            stats = dict(self.stats)
+            stats["queued"] = len(self._rows)
+        commits = max(1, stats["commits"])
+        stats["rows_per_commit"] = stats["rows"] / commits
+        stats["avg_commit_seconds"] = stats["commit_seconds_total"] / commits
+        return stats
+
+    def close(self):
+        """Commit everything queued, then stop the thread."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join()
+        # Whatever is left failed its last commit; try once more inline
+        with self._cond:
+            batch, self._rows = self._rows, []
+        if batch and not self._commit(batch):
+            for row in self._rows:
+                logger.error("Detection not saved to DB at shutdown: %s %s %s (%.2f)",
+                             row[0], row[1], row[2], row[4])
+
+
+RECENT_SQL = "SELECT * FROM detections ORDER BY ts DESC, id DESC LIMIT ?"
 
 
 def get_recent(data_dir: str, limit: int = 10) -> list[dict]:
     """Get the most recent N detections."""
     def _query(conn):
-        rows = conn.execute(
-            "SELECT * FROM detections ORDER BY date DESC, time DESC LIMIT ?",
-            (limit,)
-        ).fetchall()
+        rows = conn.execute(RECENT_SQL, (limit,)).fetchall()
         return [dict(r) for r in rows]
 
     return _execute_with_retry(_get_db_path(data_dir), _query)
@@ -101,8 +525,7 @@ def get_by_hour(data_dir: str, date: str = None) -> list[dict]:
 
     def _query(conn):
         rows = conn.execute(
-            "SELECT substr(time, 1, 2) as hour, COUNT(*) as count "
-            "FROM detections WHERE date = ? GROUP BY hour ORDER BY hour",
+            "SELECT hour, count FROM hourly_counts WHERE date = ? ORDER BY hour",
             (date,)
         ).fetchall()
         return [dict(r) for r in rows]
@@ -116,21 +539,23 @@ def get_overview(data_dir: str) -> dict:
         today = datetime.now().strftime("%Y-%m-%d")
         week_ago = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
 
-        total = conn.execute("SELECT COUNT(*) FROM detections").fetchone()[0]
+        total = conn.execute(
+            "SELECT COALESCE(SUM(count), 0) FROM daily_species_counts"
+        ).fetchone()[0]
         unique_species = conn.execute(
-            "SELECT COUNT(DISTINCT scientific_name) FROM detections"
+            "SELECT COUNT(DISTINCT scientific_name) FROM daily_species_counts"
         ).fetchone()[0]
         today_count = conn.execute(
-            "SELECT COUNT(*) FROM detections WHERE date = ?", (today,)
+            "SELECT COALESCE(SUM(count), 0) FROM daily_species_counts WHERE date = ?", (today,)
         ).fetchone()[0]
         week_count = conn.execute(
-            "SELECT COUNT(*) FROM detections WHERE date >= ?", (week_ago,)
+            "SELECT COALESCE(SUM(count), 0) FROM daily_species_counts WHERE date >= ?", (week_ago,)
         ).fetchone()[0]
 
         top_species = conn.execute(
-            "SELECT common_name, scientific_name, COUNT(*) as count "
-            "FROM detections GROUP BY scientific_name "
-            "ORDER BY count DESC LIMIT 10"
+            "SELECT common_name, scientific_name, SUM(count) as count "
+            "FROM daily_species_counts GROUP BY scientific_name "
+            "ORDER BY count DESC, scientific_name LIMIT 10"
         ).fetchall()
 
         return {
@@ -144,22 +569,47 @@ def get_overview(data_dir: str) -> dict:
     return _execute_with_retry(_get_db_path(data_dir), _query)
 
 
+def _detections_query(date: str | None, column: str | None, value: str | None,
+                      limit: int) -> tuple[str, list]:
+    """SQL for get_detections, optionally filtered to one day and one name column.
+
+    The day becomes a ts range so the (ts) or (name, ts) index serves both
+    the filter and the ordering; date = ? stays as an exact recheck.
+    """
+    query = "SELECT * FROM detections WHERE 1=1"
+    params: list = []
+    if column:
+        query += f" AND {column} = ?"
+        params.append(value)
+    if date:
+        query += (" AND ts >= " + TS_EXPR.format(date="?", time="'00:00:00'")
+                  + " AND ts < " + TS_EXPR.format(date="date(?, '+1 day')", time="'00:00:00'")
+                  + " AND date = ?")
+        params.extend([date, date, date])
+    query += " ORDER BY ts DESC, id DESC LIMIT ?"
+    params.append(limit)
+    return query, params
+
+
 def get_detections(data_dir: str, date: str = None, species: str = None,
                    limit: int = 100) -> list[dict]:
-    """Query detections with optional filters."""
+    """Query detections with optional filters.
+
+    species matches the scientific or the common name. Each side is its own
+    index walk and the two newest-first lists are merged here, which SQLite's
+    OR optimization cannot do without sorting every match.
+    """
     def _query(conn):
-        query = "SELECT * FROM detections WHERE 1=1"
-        params = []
-        if date:
-            query += " AND date = ?"
-            params.append(date)
-        if species:
-            query += " AND (scientific_name = ? OR common_name = ?)"
-            params.extend([species, species])
-        query += " ORDER BY date DESC, time DESC LIMIT ?"
-        params.append(limit)
-        rows = conn.execute(query, params).fetchall()
-        return [dict(r) for r in rows]
+        if not species:
+            query, params = _detections_query(date, None, None, limit)
+            return [dict(r) for r in conn.execute(query, params).fetchall()]
+        merged = {}
+        for column in ("scientific_name", "common_name"):
+            query, params = _detections_query(date, column, species, limit)
+            for r in conn.execute(query, params).fetchall():
+                merged[r["id"]] = dict(r)
+        rows = sorted(merged.values(), key=lambda r: (r["ts"], r["id"]), reverse=True)
+        return rows[:limit]
 
     return _execute_with_retry(_get_db_path(data_dir), _query)
 
@@ -168,11 +618,73 @@ def get_species(data_dir: str) -> list[dict]:
     """List all detected species with counts."""
     def _query(conn):
         rows = conn.execute(
-            "SELECT common_name, scientific_name, COUNT(*) as count, "
-            "MAX(confidence) as max_confidence, MAX(date) as last_seen "
-            "FROM detections GROUP BY scientific_name "
-            "ORDER BY count DESC"
+            "SELECT common_name, scientific_name, SUM(count) as count, "
+            "MAX(max_confidence) as max_confidence, MAX(date) as last_seen "
+            "FROM daily_species_counts GROUP BY scientific_name "
+            "ORDER BY count DESC, scientific_name"
         ).fetchall()
         return [dict(r) for r in rows]
 
     return _execute_with_retry(_get_db_path(data_dir), _query)
+
+
+def _plan_checks() -> list[tuple[str, str, list]]:
+    """(label, sql, params) for every detections query the API issues."""
+    checks = [("recent", RECENT_SQL, [10])]
+    for date in (None, "2026-05-01"):
+        for column in (None, "scientific_name", "common_name"):
+            query, params = _detections_query(date, column, "x" if column else None, 100)
+            checks.append((f"detections date={bool(date)} {column or 'all'}", query, params))
+    return checks
+
+
+def check_query_plans(data_dir: str) -> list[str]:
+    """Run EXPLAIN QUERY PLAN on the detections queries and list any that
+    scan the table without an index or sort through a temp b-tree.
+
+    Guards the ts indexes against query edits that silently fall back to
+    a full sort: python database.py check-plans (exits 1 on a problem).
+    """
+    init_db(data_dir)
+    problems = []
+    conn = sqlite3.connect(_get_db_path(data_dir))
+    try:
+        for label, query, params in _plan_checks():
+            plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + query, params)]
+            logger.info("%s: %s", label, " | ".join(plan))
+            for step in plan:
+                if "TEMP B-TREE" in step or (step.startswith("SCAN detections") and "INDEX" not in step):
+                    problems.append(f"{label}: {step}")
+    finally:
+        conn.close()
+    return problems
+
+
+def main():
+    import argparse
+    import sys
+
+    import yaml
+
+    parser = argparse.ArgumentParser(description="BirdNET detections database tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    cp = sub.add_parser("check-plans", help="fail if a detections query scans or sorts the table")
+    cp.add_argument("--data-dir", help="default: data_dir from config.yml")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    data_dir = args.data_dir
+    if data_dir is None:
+        backend = Path(__file__).parent
+        with open(backend / "config.yml") as f:
+            data_dir = str(backend / yaml.safe_load(f)["data_dir"])
+    problems = check_query_plans(data_dir)
+    for problem in problems:
+        print(f"FAIL {problem}")
+    if problems:
+        sys.exit(1)
+    print("OK: every detections query uses an index without sorting")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Cheap band-limited energy gate that skips inference on empty chunks.
+
+Each chunk is split into short frames; the energy in the bird band
+(about 1–10 kHz) of the loudest frame is compared against an adaptive
+noise floor. The floor tracks the median frame energy of recent chunks,
+falling quickly and rising slowly, so wind or rain raise it and a quiet
+night lowers it. The state lives for the life of the process, so it
+carries over from one file to the next.
+"""
+
+import logging
+import threading
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_FRAME = 1024
+_EPS = 1e-12
+
+
+class EnergyGate:
+    """Decides which chunks are worth running through the model."""
+
+    def __init__(self, sample_rate: int, band_hz: tuple[float, float] = (1000.0, 10000.0),
+                 margin_db: float = 6.0, rise: float = 0.05, fall: float = 0.5,
+                 audit: bool = False, report_every: int = 1000):
+        self.sample_rate = sample_rate
+        self.margin_db = margin_db
+        self.rise = rise
+        self.fall = fall
+        self.audit = audit
+        self.report_every = report_every
+        freqs = np.fft.rfftfreq(_FRAME, 1.0 / sample_rate)
+        self._lo, self._hi = np.searchsorted(freqs, band_hz)
+        self._window = np.hanning(_FRAME).astype(np.float32)
+        self._lock = threading.Lock()
+        self.noise_floor_db: float | None = None
+        self.stats = {"chunks": 0, "skipped": 0, "audited": 0, "missed": 0}
+
+    def _band_db(self, chunks: np.ndarray) -> np.ndarray:
+        """Per-frame band energy in dB, shape (n, frames)."""
+        n, length = chunks.shape
+        frames = length // _FRAME
+        framed = chunks[:, :frames * _FRAME].reshape(n, frames, _FRAME) * self._window
+        spec = np.fft.rfft(framed, axis=-1)[..., self._lo:self._hi]
+        power = (spec.real ** 2 + spec.imag ** 2).sum(axis=-1)
+        return 10.0 * np.log10(power + _EPS)
+
+    def evaluate(self, chunks: np.ndarray) -> np.ndarray:
+        """Return a boolean mask of chunks that pass the gate, updating the floor."""
+        if len(chunks) == 0:
+            return np.zeros(0, dtype=bool)
+        band_db = self._band_db(chunks)
+        peaks = band_db.max(axis=1)
+        medians = np.median(band_db, axis=1)
+
+        passed = np.empty(len(chunks), dtype=bool)
+        with self._lock:
+            for i, (peak, median) in enumerate(zip(peaks, medians)):
+                if self.noise_floor_db is None:
+                    self.noise_floor_db = float(median)
+                passed[i] = peak - self.noise_floor_db >= self.margin_db
+                alpha = self.fall if median < self.noise_floor_db else self.rise
+                self.noise_floor_db += alpha * (float(median) - self.noise_floor_db)
+
+            before = self.stats["chunks"]
+            self.stats["chunks"] += len(chunks)
+            self.stats["skipped"] += int((~passed).sum())
+            if before // self.report_every != self.stats["chunks"] // self.report_every:
+                self._report()
+        return passed
+
+    def record_audit(self, skipped_with_detections: int, skipped: int):
+        """Audit mode: note how many gated chunks would have produced detections."""
+        with self._lock:
+            self.stats["audited"] += skipped
+            self.stats["missed"] += skipped_with_detections
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["noise_floor_db"] = self.noise_floor_db
+        stats["skip_ratio"] = stats["skipped"] / stats["chunks"] if stats["chunks"] else 0.0
+        return stats
+
+    def _report(self):
+        st = self.stats
+        msg = "Energy gate: %d/%d chunk(s) skipped, noise floor %.1f dB"
+        args = [st["skipped"], st["chunks"], self.noise_floor_db]
+        if self.audit:
+            msg += ", audit: %d of %d gated chunk(s) had detections"
+            args += [st["missed"], st["audited"]]
+        logger.info(msg, *args)
@@ -0,0 +1,159 @@
+"""Per-stage timers and counters for the analyzer, exported as Prometheus text.
+
+Each stage (decode, invoke, encode, ...) feeds a fixed-bucket histogram;
+counters and gauges cover everything else. The analyzer renders the lot
+to a small file on tmpfs every few seconds and api.py republishes it at
+/api/metrics, so field units can be scraped without DEBUG logging. Pool
+workers drain() their local values and the parent merge()s them.
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "birdnet_analyzer"
+
+# Seconds; covers a ~1 ms postprocess up to a multi-second stalled save
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_lock = threading.Lock()
+_stages: dict[str, list] = {}  # stage -> [bucket counts..., +Inf count, sum]
+_counters: dict[str, float] = {}
+_gauges: dict[str, float] = {}
+
+
+def _new_stage() -> list:
+    return [0] * (len(BUCKETS) + 1) + [0.0]
+
+
+def observe(stage: str, seconds: float):
+    """Record one duration for a stage."""
+    with _lock:
+        h = _stages.get(stage)
+        if h is None:
+            h = _stages[stage] = _new_stage()
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                h[i] += 1
+                break
+        else:
+            h[len(BUCKETS)] += 1
+        h[-1] += seconds
+
+
+@contextmanager
+def timed(stage: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - started)
+
+
+def inc(name: str, amount: float = 1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def set_counter(name: str, value: float):
+    """Publish a running total this process keeps elsewhere (e.g. database.pool_stats())."""
+    with _lock:
+        _counters[name] = value
+
+
+def set_gauge(name: str, value: float):
+    with _lock:
+        _gauges[name] = value
+
+
+def drain() -> dict:
+    """Take and reset this process's stages and counters (pool workers)."""
+    global _stages, _counters
+    with _lock:
+        out = {"stages": _stages, "counters": _counters}
+        _stages, _counters = {}, {}
+    return out
+
+
+def merge(delta: dict):
+    """Add values drained from another process."""
+    with _lock:
+        for stage, values in delta["stages"].items():
+            h = _stages.setdefault(stage, _new_stage())
+            for i, v in enumerate(values):
+                h[i] += v
+        for name, value in delta["counters"].items():
+            _counters[name] = _counters.get(name, 0) + value
+
+
+def render() -> str:
+    """All metrics in Prometheus text exposition format."""
+    with _lock:
+        stages = {k: list(v) for k, v in _stages.items()}
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+
+    lines = [f"# HELP {PREFIX}_stage_seconds Time spent in each analyzer stage.",
+             f"# TYPE {PREFIX}_stage_seconds histogram"]
+    for stage in sorted(stages):
+        h = stages[stage]
+        cumulative = 0
+        for bound, count in zip(BUCKETS, h):
+            cumulative += count
+            lines.append(f'{PREFIX}_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+        cumulative += h[len(BUCKETS)]
+        lines.append(f'{PREFIX}_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {cumulative}')
+        lines.append(f'{PREFIX}_stage_seconds_sum{{stage="{stage}"}} {h[-1]:.6f}')
+        lines.append(f'{PREFIX}_stage_seconds_count{{stage="{stage}"}} {cumulative}')
+    for name in sorted(counters):
+        lines.append(f"# TYPE {PREFIX}_{name}_total counter")
+        lines.append(f"{PREFIX}_{name}_total {counters[name]:g}")
+    for name in sorted(gauges):
+        lines.append(f"# TYPE {PREFIX}_{name} gauge")
+        lines.append(f"{PREFIX}_{name} {gauges[name]:g}")
+    return "\n".join(lines) + "\n"
+
+
+def write(path: Path):
+    """Atomically replace path with the current render()."""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(render())
+    os.replace(tmp, path)
+
+
+class Exporter:
+    """Background thread that refreshes gauges and rewrites the metrics file."""
+
+    def __init__(self, path: Path, interval: float, collect=None):
+        self.path = path
+        self.interval = interval
+        self._collect = collect
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-exporter", daemon=True)
+
+    def start(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        logger.info("Writing metrics to %s every %.0fs", self.path, self.interval)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self._export()
+
+    def _export(self):
+        try:
+            if self._collect is not None:
+                self._collect()
+            write(self.path)
+        except Exception as e:
+            logger.warning("Could not write metrics to %s: %s", self.path, e)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._export()
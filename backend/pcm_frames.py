@@ -0,0 +1,89 @@
+"""Wire format for pi_audio_server's live audio stream.
+
+The stream is a sequence of self-describing frames, each a fixed 36-byte
+header followed by the payload:
+
+    magic "BNPF" | version u8 | codec u8 | 2 pad | seq u64 |
+    capture time f64 (epoch s, first sample) | sample rate u32 |
+    samples u32 | payload bytes u32
+
+Codec 0 is raw int16 LE mono PCM; codec 1 is one FLAC file per frame
+(about half the size for field audio). Sequence numbers increase by one
+per frame, so a client resumes with ?from_seq=<last + 1> and can tell
+from a jump how much audio it missed.
+"""
+
+import io
+import struct
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator
+
+import numpy as np
+
+MAGIC = b"BNPF"
+VERSION = 1
+HEADER = struct.Struct("<4sBB2xQdIII")
+CODECS = {"pcm": 0, "flac": 1}
+_CODEC_NAMES = {v: k for k, v in CODECS.items()}
+MEDIA_TYPE = "application/x-birdnet-pcm-frames"
+
+
+@dataclass
+class Frame:
+    seq: int
+    capture_time: float
+    sample_rate: int
+    pcm: np.ndarray  # int16 mono
+
+
+def encode(pcm: np.ndarray, sample_rate: int, codec: str) -> bytes:
+    """Payload bytes for an int16 block."""
+    if codec == "pcm":
+        return pcm.astype("<i2", copy=False).tobytes()
+    import soundfile as sf
+
+    buf = io.BytesIO()
+    sf.write(buf, pcm, sample_rate, format="FLAC", subtype="PCM_16")
+    return buf.getvalue()
+
+
+def pack(seq: int, capture_time: float, sample_rate: int, samples: int,
+         codec: str, payload: bytes) -> bytes:
+    return HEADER.pack(MAGIC, VERSION, CODECS[codec], seq, capture_time,
+                       sample_rate, samples, len(payload)) + payload
+
+
+def _read_exact(f: BinaryIO, n: int) -> bytes:
+    parts = []
+    while n:
+        part = f.read(n)
+        if not part:
+            raise EOFError("stream ended mid-frame")
+        parts.append(part)
+        n -= len(part)
+    return b"".join(parts)
+
+
+def read_frames(f: BinaryIO) -> Iterator[Frame]:
+    """Decode frames from a byte stream until it ends cleanly between frames."""
+    while True:
+        head = f.read(HEADER.size)
+        if not head:
+            return
+        if len(head) < HEADER.size:
+            head += _read_exact(f, HEADER.size - len(head))
+        magic, version, codec, seq, capture_time, sample_rate, samples, length = HEADER.unpack(head)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a BirdNET PCM frame stream")
+        payload = _read_exact(f, length)
+        if _CODEC_NAMES.get(codec) == "pcm":
+            pcm = np.frombuffer(payload, dtype="<i2")
+        elif _CODEC_NAMES.get(codec) == "flac":
+            import soundfile as sf
+
+            pcm, _sr = sf.read(io.BytesIO(payload), dtype="int16")
+        else:
+            raise ValueError(f"unknown frame codec {codec}")
+        if len(pcm) != samples:
+            raise ValueError(f"frame {seq}: expected {samples} samples, got {len(pcm)}")
+        yield Frame(seq, capture_time, sample_rate, pcm)
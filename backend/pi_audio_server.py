@@ -4,28 +4,43 @@ Run this on the Raspberry Pi:
     source ~/birdnet-venv/bin/activate
     cd /home/pi/backend
     python pi_audio_server.py
+    python pi_audio_server.py --no-record   # serve existing WAVs only (testing)
+    python pi_audio_server.py --synthetic   # generated signal instead of arecord
 
 Endpoints:
-    GET  /wavs           — list available WAV files
+    GET  /wavs           — list available WAV files (?since=<name>&limit=N to page)
     GET  /wavs/{name}    — download a WAV file
     DELETE /wavs/{name}  — delete after processing
+    GET  /wavs/batch     — the next N WAVs as one streamed tar (?since=<name>&limit=N)
+    POST /wavs/delete    — delete a list of names after processing (idempotent)
+    GET  /stream         — live audio as sequence-numbered frames (see pcm_frames.py)
     GET  /status         — recorder health check
 """
 
+import argparse
+import bisect
 import logging
+import os
 import signal
-import subprocess
 import sys
+import tarfile
 import threading
 import time
+import wave
+from collections import deque
 from datetime import datetime
 from pathlib import Path
 
+import numpy as np
 import yaml
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from pydantic import BaseModel
 import uvicorn
 
+import capture
+import pcm_frames
+
 logging.basicConfig(
     level=logging.DEBUG,
     format="%(asctime)s [pi-server] %(levelname)s %(message)s",
@@ -49,6 +64,12 @@ STREAM_DIR = DATA_DIR / "StreamData"
 STREAM_DIR.mkdir(parents=True, exist_ok=True)
 
 SERVER_PORT = 7008  # separate from the main API on 7007
+BATCH_MAX_FILES = 500
+_READ_CHUNK = 256 * 1024
+
+# Live stream: one frame per FRAME_SECONDS, the last STREAM_BUFFER_SECONDS kept for resume
+FRAME_SECONDS = 1.0
+STREAM_BUFFER_SECONDS = float(audio_cfg.get("stream_buffer_seconds", 60))
 
 # ---------------------------------------------------------------------------
 # Recorder thread
@@ -56,54 +77,183 @@ SERVER_PORT = 7008  # separate from the main API on 7007
 _shutdown = threading.Event()
 _recorder_thread = None
 _last_recording: dict = {"file": None, "time": None, "error": None}
-_current_recording: str | None = None  # filename arecord is currently writing
-
-
-def recorder_loop():
-    """Background thread: continuously records 15-second WAV clips."""
+_current_recording: str | None = None  # WAV currently being written (not yet indexed)
+
+
+class LiveFrames:
+    """Recent capture blocks, numbered in order, for /stream clients to follow."""
+
+    def __init__(self, max_frames: int):
+        self._frames: deque[tuple[int, float, np.ndarray, dict]] = deque(maxlen=max_frames)
+        self._next_seq = 0
+        self._cond = threading.Condition()
+
+    @property
+    def next_seq(self) -> int:
+        return self._next_seq
+
+    def oldest_seq(self) -> int:
+        with self._cond:
+            return self._frames[0][0] if self._frames else self._next_seq
+
+    def append(self, pcm: np.ndarray, capture_time: float):
+        with self._cond:
+            # The dict caches encoded payloads per codec
+            self._frames.append((self._next_seq, capture_time, pcm, {}))
+            self._next_seq += 1
+            self._cond.notify_all()
+
+    def wait_from(self, seq: int, timeout: float) -> list[tuple[int, float, np.ndarray, dict]]:
+        """Frames with sequence >= seq, waiting up to timeout for the first one."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._next_seq > seq or _shutdown.is_set(), timeout)
+            return [f for f in self._frames if f[0] >= seq]
+
+
+live_frames = LiveFrames(max(1, int(STREAM_BUFFER_SECONDS / FRAME_SECONDS)))
+
+
+class WavIndex:
+    """Finished WAVs in StreamData/, kept sorted by name (= capture time).
+
+    Built once from a directory scan at startup, then maintained by the
+    recorder and DELETE, so listing a backlog of thousands of clips costs a
+    bisect instead of a glob + sort of the SD card on every poll.
+    """
+
+    def __init__(self):
+        self._names: list[str] = []
+        self._info: dict[str, tuple[int, float]] = {}  # name -> (bytes, capture epoch s)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def rebuild(self, directory: Path):
+        entries = {}
+        for path in directory.glob("*.wav"):
+            try:
+                captured = datetime.strptime(path.stem, "%Y-%m-%d-%H-%M-%S").timestamp()
+            except ValueError:
+                captured = path.stat().st_mtime
+            entries[path.name] = (path.stat().st_size, captured)
+        with self._lock:
+            self._names = sorted(entries)
+            self._info = entries
+            self._bytes = sum(size for size, _ in entries.values())
+        logger.info("Indexed %d WAV(s) in %s", len(entries), directory)
+
+    def add(self, name: str, size: int, captured: float):
+        with self._lock:
+            if name in self._info:
+                self._bytes -= self._info[name][0]
+            else:
+                bisect.insort(self._names, name)
+            self._info[name] = (size, captured)
+            self._bytes += size
+
+    def remove(self, name: str) -> bool:
+        with self._lock:
+            info = self._info.pop(name, None)
+            if info is None:
+                return False
+            del self._names[bisect.bisect_left(self._names, name)]
+            self._bytes -= info[0]
+            return True
+
+    def page(self, since: str | None, limit: int | None) -> list[str]:
+        """Names after since (exclusive), oldest first, at most limit."""
+        with self._lock:
+            lo = bisect.bisect_right(self._names, since) if since else 0
+            hi = len(self._names) if limit is None else lo + limit
+            return self._names[lo:hi]
+
+    def summary(self) -> dict:
+        with self._lock:
+            if not self._names:
+                return {"files": 0, "bytes": 0, "oldest": None, "newest": None}
+            return {
+                "files": len(self._names),
+                "bytes": self._bytes,
+                "oldest": datetime.fromtimestamp(self._info[self._names[0]][1]).isoformat(),
+                "newest": datetime.fromtimestamp(self._info[self._names[-1]][1]).isoformat(),
+            }
+
+
+wav_index = WavIndex()
+
+
+def _open_wav(captured: float) -> tuple[wave.Wave_write, Path]:
+    """Start a clip named after captured, the capture time of its first frame."""
+    global _current_recording
+    filepath = STREAM_DIR / f"{datetime.fromtimestamp(captured):%Y-%m-%d-%H-%M-%S}.wav"
+    wav = wave.open(str(filepath), "wb")
+    wav.setnchannels(1)
+    wav.setsampwidth(2)
+    wav.setframerate(SAMPLE_RATE)
+    _current_recording = filepath.name
+    logger.info("Recording → %s", filepath.name)
+    return wav, filepath
+
+
+def _close_wav(wav: wave.Wave_write, filepath: Path):
+    global _current_recording
+    wav.close()
+    _current_recording = None
+    size = filepath.stat().st_size if filepath.exists() else 0
+    if size:
+        wav_index.add(filepath.name, size,
+                      datetime.strptime(filepath.stem, "%Y-%m-%d-%H-%M-%S").timestamp())
+    logger.info("Recorded %s (%.1f KB)", filepath.name, size / 1024)
+    _last_recording["file"] = filepath.name
+    _last_recording["time"] = datetime.now().isoformat()
+    _last_recording["error"] = None
+
+
+def recorder_loop(synthetic: bool = False):
+    """Background thread: one continuous arecord feeding 15-second WAVs and /stream.
+
+    Raw PCM is read in FRAME_SECONDS blocks; each block is appended to the
+    current WAV (rotated every DURATION seconds of audio, so clips are
+    gapless) and published to live_frames for streaming clients. With
+    synthetic, a generated test signal stands in for the microphone.
+    """
     logger.info("Recorder thread started (device=%s, rate=%d, duration=%ds)",
                 DEVICE, SAMPLE_RATE, DURATION)
+    block_frames = int(SAMPLE_RATE * FRAME_SECONDS)
+    clip_frames = SAMPLE_RATE * DURATION
     while not _shutdown.is_set():
-        timestamp = datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
-        filepath = STREAM_DIR / f"{timestamp}.wav"
-
-        cmd = [
-            "arecord",
-            "-D", DEVICE,
-            "-f", "S16_LE",
-            "-c", "1",
-            "-r", str(SAMPLE_RATE),
-            "-d", str(DURATION),
-            "-t", "wav",
-            str(filepath),
-        ]
-
-        logger.info("Recording → %s", filepath.name)
-        global _current_recording
-        _current_recording = filepath.name
+        wav, filepath = None, None
+        written = 0
         try:
-            proc = subprocess.run(cmd, capture_output=True, timeout=DURATION + 10)
-            if proc.returncode != 0:
-                err = proc.stderr.decode(errors="replace").strip()
-                logger.error("arecord failed (rc=%d): %s", proc.returncode, err)
-                _last_recording["error"] = err
-                _shutdown.wait(5)
-                continue
-
-            _current_recording = None
-            size = filepath.stat().st_size if filepath.exists() else 0
-            logger.info("Recorded %s (%.1f KB)", filepath.name, size / 1024)
-            _last_recording["file"] = filepath.name
-            _last_recording["time"] = datetime.now().isoformat()
-            _last_recording["error"] = None
-
-        except subprocess.TimeoutExpired:
-            logger.warning("arecord timed out")
-            _last_recording["error"] = "timeout"
-            _shutdown.wait(2)
+            if synthetic:
+                source = capture.synthetic_source(SAMPLE_RATE, block_frames, _shutdown, realtime=True)
+            else:
+                source = capture.arecord_source(DEVICE, SAMPLE_RATE, block_frames, _shutdown)
+            for block in source:
+                # A block is read once complete, so its first frame was captured a block ago
+                captured = time.time() - len(block) / SAMPLE_RATE
+                live_frames.append(block, captured)
+                offset = 0
+                while offset < len(block):
+                    if wav is None:
+                        wav, filepath = _open_wav(captured + offset / SAMPLE_RATE)
+                        written = 0
+                    take = block[offset:offset + clip_frames - written]
+                    wav.writeframes(take.astype("<i2", copy=False).tobytes())
+                    written += len(take)
+                    offset += len(take)
+                    if written >= clip_frames:
+                        _close_wav(wav, filepath)
+                        wav = None
         except Exception as e:
             logger.error("Recording error: %s", e)
             _last_recording["error"] = str(e)
+        finally:
+            if wav is not None:
+                # Keep the partial clip; it is still valid audio
+                _close_wav(wav, filepath)
+
+        if not _shutdown.is_set():
+            _last_recording["error"] = _last_recording["error"] or "arecord exited"
             _shutdown.wait(5)
 
     logger.info("Recorder thread stopped")
@@ -117,29 +267,104 @@ app = FastAPI(title="BirdNET Pi Audio Server")
 
 @app.get("/status")
 def status():
-    files = sorted(STREAM_DIR.glob("*.wav"))
+    queued = wav_index.summary()
     return {
         "device": DEVICE,
         "sample_rate": SAMPLE_RATE,
         "record_duration": DURATION,
         "stream_dir": str(STREAM_DIR),
-        "queued_files": len(files),
+        "queued_files": queued["files"],
+        "queued_bytes": queued["bytes"],
+        "oldest_file": queued["oldest"],
+        "newest_file": queued["newest"],
+        "current_recording": _current_recording,
         "last_recording": _last_recording,
+        "stream": {"oldest_seq": live_frames.oldest_seq(), "next_seq": live_frames.next_seq,
+                   "frame_seconds": FRAME_SECONDS},
     }
 
 
 @app.get("/wavs")
-def list_wavs():
-    """Return a list of available WAV filenames, oldest first (excludes in-progress file)."""
-    files = sorted(STREAM_DIR.glob("*.wav"))
-    return [f.name for f in files if f.name != _current_recording]
+def list_wavs(since: str | None = None, limit: int | None = Query(None, ge=1)):
+    """Return finished WAV filenames, oldest first.
+
+    Page with since=<last name received>&limit=N; the file being recorded
+    is only indexed once it is closed.
+    """
+    return wav_index.page(since, limit)
+
+
+def _check_name(filename: str):
+    if ".." in filename or "/" in filename:
+        raise HTTPException(status_code=400, detail="Invalid filename")
+
+
+def _tar_stream(names: list[str]):
+    """Yield a ustar archive of names, reading each file only as it is sent.
+
+    Files deleted since they were listed are left out.
+    """
+    sent = 0
+    for name in names:
+        try:
+            f = open(STREAM_DIR / name, "rb")
+        except FileNotFoundError:
+            continue
+        with f:
+            st = os.fstat(f.fileno())
+            info = tarfile.TarInfo(name)
+            info.size = st.st_size
+            info.mtime = int(st.st_mtime)
+            info.mode = 0o644
+            yield info.tobuf(format=tarfile.USTAR_FORMAT)
+            remaining = st.st_size
+            while remaining:
+                chunk = f.read(min(_READ_CHUNK, remaining))
+                if not chunk:
+                    # Truncated under us; pad so the archive stays well-formed
+                    chunk = b"\0" * remaining
+                remaining -= len(chunk)
+                yield chunk
+            yield b"\0" * (-st.st_size % tarfile.BLOCKSIZE)
+        sent += 1
+    yield b"\0" * (2 * tarfile.BLOCKSIZE)
+    logger.info("Served batch of %d file(s)", sent)
+
+
+@app.get("/wavs/batch")
+def get_batch(since: str | None = None, limit: int = Query(50, ge=1, le=BATCH_MAX_FILES)):
+    """The next limit finished WAVs after since, streamed as one tar archive."""
+    names = wav_index.page(since, limit)
+    return StreamingResponse(_tar_stream(names), media_type="application/x-tar",
+                             headers={"X-Batch-Files": str(len(names))})
+
+
+class DeleteBatchRequest(BaseModel):
+    names: list[str]
+
+
+@app.post("/wavs/delete")
+def delete_batch(req: DeleteBatchRequest):
+    """Delete processed WAVs in one call. Names already gone are reported, not errors."""
+    for name in req.names:
+        _check_name(name)
+    deleted, missing = [], []
+    for name in req.names:
+        wav_index.remove(name)
+        try:
+            (STREAM_DIR / name).unlink()
+            deleted.append(name)
+        except FileNotFoundError:
+            missing.append(name)
+    logger.info("Deleted %d file(s) (confirmed by client%s)", len(deleted),
+                f", {len(missing)} already gone" if missing else "")
+    return {"deleted": deleted, "missing": missing}
 
 
 @app.get("/wavs/{filename}")
 def get_wav(filename: str):
     """Download a WAV file."""
-    if ".." in filename or "/" in filename:
-        raise HTTPException(status_code=400, detail="Invalid filename")
+    _check_name(filename)
     path = STREAM_DIR / filename
     if not path.exists():
         raise HTTPException(status_code=404, detail="File not found")
@@ -147,12 +372,54 @@ def get_wav(filename: str):
     return FileResponse(str(path), media_type="audio/wav", filename=filename)
 
 
+@app.get("/stream")
+def stream(from_seq: int | None = Query(None, ge=0), codec: str = Query("flac")):
+    """Live audio as pcm_frames over a chunked response.
+
+    Starts at from_seq (clamped to the frames still buffered) or, by
+    default, at the next frame captured. Reconnect with from_seq set to the
+    last sequence received + 1 to resume without loss. Sequence numbers
+    restart at 0 with the server, so a from_seq beyond the next frame (a
+    client resuming across a restart) starts live.
+    """
+    if codec not in pcm_frames.CODECS:
+        raise HTTPException(status_code=400, detail=f"codec must be one of {list(pcm_frames.CODECS)}")
+    next_seq = live_frames.next_seq
+    if from_seq is None:
+        start = next_seq
+    elif from_seq > next_seq:
+        start = next_seq
+        logger.warning("Stream resume from %d: server is at %d (restarted?) — starting live",
+                       from_seq, next_seq)
+    else:
+        start = max(from_seq, live_frames.oldest_seq())
+        if start > from_seq:
+            logger.warning("Stream resume from %d: frames up to %d already dropped",
+                           from_seq, start - 1)
+    logger.info("Stream client connected (codec=%s, from_seq=%d)", codec, start)
+
+    def frames():
+        seq = start
+        while not _shutdown.is_set():
+            batch = live_frames.wait_from(seq, timeout=5.0)
+            if batch and batch[0][0] > seq:
+                logger.warning("Stream client fell behind: skipped %d frame(s)", batch[0][0] - seq)
+            for frame_seq, capture_time, pcm, cache in batch:
+                payload = cache.get(codec)
+                if payload is None:
+                    payload = cache[codec] = pcm_frames.encode(pcm, SAMPLE_RATE, codec)
+                yield pcm_frames.pack(frame_seq, capture_time, SAMPLE_RATE, len(pcm), codec, payload)
+                seq = frame_seq + 1
+
+    return StreamingResponse(frames(), media_type=pcm_frames.MEDIA_TYPE)
+
+
 @app.delete("/wavs/{filename}")
 def delete_wav(filename: str):
     """Delete a WAV file after the client has finished processing it."""
-    if ".." in filename or "/" in filename:
-        raise HTTPException(status_code=400, detail="Invalid filename")
+    _check_name(filename)
     path = STREAM_DIR / filename
+    wav_index.remove(filename)
     if not path.exists():
         raise HTTPException(status_code=404, detail="File not found")
     path.unlink()
@@ -166,8 +433,21 @@ def delete_wav(filename: str):
 def main():
     global _recorder_thread
 
-    _recorder_thread = threading.Thread(target=recorder_loop, daemon=True)
-    _recorder_thread.start()
+    parser = argparse.ArgumentParser(description="BirdNET Pi audio server")
+    parser.add_argument("--no-record", action="store_true",
+                        help="only serve WAVs already in StreamData/ (no arecord)")
+    parser.add_argument("--synthetic", action="store_true",
+                        help="record a generated test signal instead of the microphone")
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    args = parser.parse_args()
+
+    wav_index.rebuild(STREAM_DIR)
+    if args.no_record:
+        logger.info("Recording disabled — serving existing files in %s", STREAM_DIR)
+    else:
+        _recorder_thread = threading.Thread(target=recorder_loop, args=(args.synthetic,),
+                                            daemon=True)
+        _recorder_thread.start()
 
     def handle_signal(signum, frame):
         logger.info("Shutting down...")
@@ -177,8 +457,8 @@ def main():
     signal.signal(signal.SIGINT, handle_signal)
     signal.signal(signal.SIGTERM, handle_signal)
 
-    logger.info("Starting audio server on port %d", SERVER_PORT)
-    uvicorn.run(app, host="0.0.0.0", port=SERVER_PORT, log_level="warning")
+    logger.info("Starting audio server on port %d", args.port)
+    uvicorn.run(app, host="0.0.0.0", port=args.port, log_level="warning")
 
 
 if __name__ == "__main__":
@@ -31,6 +31,14 @@ def main():
         config = yaml.safe_load(f)
 
     audio_cfg = config["audio"]
+    if audio_cfg.get("capture_mode", "files") == "stream":
+        # analyzer.py owns the microphone in stream mode; stay up for supervisord
+        logger.info("capture_mode=stream — analyzer captures audio directly, recorder idle")
+        while not shutdown:
+            time.sleep(1)
+        logger.info("Recorder stopped")
+        return
+
     device = audio_cfg["device"]
     sample_rate = audio_cfg["sample_rate"]
     duration = audio_cfg["record_duration"]
@@ -0,0 +1,187 @@
+"""HTTP client for pi_audio_server, used by the analyzer's pull mode.
+
+All requests share one keep-alive connection (http.client, no extra
+dependencies); a dropped connection is reopened on the next attempt.
+Each request is retried a bounded number of times with exponential
+backoff before RemoteError is raised.
+"""
+
+import http.client
+import json
+import logging
+import random
+import shutil
+import tarfile
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+import pcm_frames
+
+logger = logging.getLogger(__name__)
+
+_CHUNK = 64 * 1024
+
+
+class RemoteError(Exception):
+    """A request to the audio server failed after all retries."""
+
+
+class AudioServerClient:
+    """pi_audio_server endpoints over one shared keep-alive connection."""
+
+    def __init__(self, base_url: str, timeout: float = 30.0, max_retries: int = 5,
+                 backoff_max: float = 60.0):
+        url = urllib.parse.urlsplit(base_url)
+        if url.scheme not in ("http", "https") or not url.hostname:
+            raise ValueError(f"Bad audio server URL: {base_url!r}")
+        self.base_url = base_url.rstrip("/")
+        self._scheme = url.scheme
+        self._host = url.hostname
+        self._port = url.port
+        self._prefix = url.path.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_max = backoff_max
+        self._conn: http.client.HTTPConnection | None = None
+        self._lock = threading.Lock()  # one request at a time on the shared connection
+        self.stats = {"requests": 0, "retries": 0, "bytes": 0, "reconnects": 0}
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self._conn is None:
+            cls = (http.client.HTTPSConnection if self._scheme == "https"
+                   else http.client.HTTPConnection)
+            self._conn = cls(self._host, self._port, timeout=self.timeout)
+            self.stats["reconnects"] += 1
+        return self._conn
+
+    def _close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def _backoff(self, attempt: int) -> float:
+        return min(self.backoff_max, 2 ** attempt) * random.uniform(0.5, 1.0)
+
+    def request(self, method: str, path: str, ok=(200,),
+                into: BinaryIO | None = None, json_body=None) -> tuple[int, bytes]:
+        """Send a request, retrying connection errors and 5xx responses.
+
+        Returns (status, body). With into, a successful body is streamed
+        into that file (rewound on each attempt) and b"" is returned.
+        Other statuses are returned as-is for the caller to interpret.
+        """
+        url = self._prefix + path
+        headers = {"Connection": "keep-alive"}
+        payload = None
+        if json_body is not None:
+            payload = json.dumps(json_body).encode()
+            headers["Content-Type"] = "application/json"
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.stats["retries"] += 1
+                delay = self._backoff(attempt)
+                logger.warning("%s %s failed (%s) — retry %d/%d in %.1fs",
+                               method, path, last_error, attempt, self.max_retries, delay)
+                time.sleep(delay)
+            with self._lock:
+                try:
+                    conn = self._connect()
+                    conn.request(method, url, body=payload, headers=headers)
+                    resp = conn.getresponse()
+                    self.stats["requests"] += 1
+                    if resp.status >= 500:
+                        resp.read()
+                        last_error = f"HTTP {resp.status}"
+                        continue
+                    if into is not None and resp.status in ok:
+                        into.seek(0)
+                        into.truncate()
+                        while chunk := resp.read(_CHUNK):
+                            into.write(chunk)
+                            self.stats["bytes"] += len(chunk)
+                        body = b""
+                    else:
+                        body = resp.read()
+                        self.stats["bytes"] += len(body)
+                    if resp.will_close:
+                        self._close()
+                    return resp.status, body
+                except (OSError, http.client.HTTPException) as e:
+                    last_error = e
+                    self._close()
+        raise RemoteError(f"{method} {path}: {last_error}")
+
+    def download_batch(self, dest_dir: Path, since: str | None = None,
+                       limit: int = 50) -> list[Path]:
+        """Fetch the next limit WAVs after since in one request; returns their paths, oldest first.
+
+        The tar is spooled to a .part file so the request can be retried,
+        then each member is moved into dest_dir via its own .part file.
+        """
+        query = {"limit": limit}
+        if since is not None:
+            query["since"] = since
+        part = dest_dir / ".batch.tar.part"
+        paths = []
+        try:
+            with open(part, "w+b") as f:
+                status, _ = self.request("GET", f"/wavs/batch?{urllib.parse.urlencode(query)}", into=f)
+                if status != 200:
+                    raise RemoteError(f"GET /wavs/batch: HTTP {status}")
+                f.seek(0)
+                with tarfile.open(fileobj=f, mode="r|") as tar:
+                    for member in tar:
+                        name = member.name
+                        if not member.isfile() or "/" in name or not name.endswith(".wav"):
+                            logger.warning("Skipping unexpected batch member %r", name)
+                            continue
+                        dest = dest_dir / name
+                        tmp = dest.with_name(name + ".part")
+                        with open(tmp, "wb") as out:
+                            shutil.copyfileobj(tar.extractfile(member), out, _CHUNK)
+                        tmp.replace(dest)
+                        paths.append(dest)
+        except tarfile.TarError as e:
+            raise RemoteError(f"GET /wavs/batch: bad archive: {e}") from e
+        finally:
+            part.unlink(missing_ok=True)
+        return paths
+
+    def delete_batch(self, names: list[str]) -> list[str]:
+        """Delete several WAVs in one request; returns the names actually removed.
+
+        Names already gone count as deleted, so a retried call is harmless.
+        """
+        status, body = self.request("POST", "/wavs/delete", json_body={"names": names})
+        if status != 200:
+            raise RemoteError(f"POST /wavs/delete: HTTP {status}")
+        return json.loads(body)["deleted"]
+
+    def stream(self, from_seq: int | None = None, codec: str = "flac") -> Iterator[pcm_frames.Frame]:
+        """Follow /stream on a dedicated connection, yielding decoded frames.
+
+        Returns when the server closes the stream; connection errors raise.
+        The caller resumes by calling again with the last seq + 1.
+        """
+        query = {"codec": codec}
+        if from_seq is not None:
+            query["from_seq"] = from_seq
+        cls = http.client.HTTPSConnection if self._scheme == "https" else http.client.HTTPConnection
+        # Frames arrive every second or so; the timeout only catches a dead link
+        conn = cls(self._host, self._port, timeout=self.timeout)
+        try:
+            conn.request("GET", f"{self._prefix}/stream?{urllib.parse.urlencode(query)}")
+            resp = conn.getresponse()
+            if resp.status != 200:
+                raise RemoteError(f"GET /stream: HTTP {resp.status}")
+            yield from pcm_frames.read_frames(resp)
+        finally:
+            conn.close()
@@ -0,0 +1,294 @@
+"""Append-only store of each analyzed chunk's top-k scores, one file per day.
+
+Every chunk that reaches the model leaves a fixed-size record: its time of
+day in milliseconds and the k highest-scoring label indices with their
+probabilities as float16. Files live in data/scores/YYYY-MM-DD.scores
+behind a 16-byte header and are read back with np.memmap, so a new
+threshold, species mask or tracker setting can be replayed over weeks of
+audio without re-running inference:
+
+    python score_store.py replay --start 2026-05-01 --end 2026-05-07 --threshold 0.6
+"""
+
+import argparse
+import json
+import logging
+import struct
+import threading
+from collections import deque
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"BNSC"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHHI4x")  # magic, version, k, classes, reserved
+SUFFIX = ".scores"
+
+
+def record_dtype(k: int) -> np.dtype:
+    return np.dtype([("ms", "<u4"), ("idx", "<u2", (k,)), ("score", "<f2", (k,))])
+
+
+def top_k(values: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """(n, classes) scores or logits → (n, k) label indices and values, best first."""
+    k = min(k, values.shape[1])
+    idx = np.argpartition(values, -k, axis=1)[:, -k:]
+    top = np.take_along_axis(values, idx, axis=1)
+    order = np.argsort(-top, axis=1)
+    return (np.take_along_axis(idx, order, axis=1).astype(np.uint16),
+            np.take_along_axis(top, order, axis=1))
+
+
+class ScoreStore:
+    """Appends score records to per-day files; safe to call from several threads."""
+
+    def __init__(self, scores_dir: Path, k: int, classes: int):
+        self.scores_dir = scores_dir
+        self.k = k
+        self.classes = classes
+        self._lock = threading.Lock()
+        self._day: date | None = None
+        self._file = None
+        self._path: Path | None = None
+        self._dtype = record_dtype(k)
+        self.records = 0
+
+    def append(self, times: list[datetime], idx: np.ndarray, scores: np.ndarray):
+        """Store one record per chunk; times are the chunks' start times."""
+        if not times:
+            return
+        days = [t.date() for t in times]
+        with self._lock:
+            start = 0
+            for end in range(1, len(times) + 1):
+                if end == len(times) or days[end] != days[start]:
+                    self._write(days[start], times[start:end], idx[start:end], scores[start:end])
+                    start = end
+
+    def _write(self, day: date, times: list[datetime], idx: np.ndarray, scores: np.ndarray):
+        if day != self._day or not self._path.exists():
+            self._open(day)
+        recs = np.zeros(len(times), dtype=self._dtype)
+        midnight = datetime.combine(day, datetime.min.time())
+        recs["ms"] = [int((t - midnight).total_seconds() * 1000) for t in times]
+        # A file created with a different k keeps its own width
+        k = min(self.k, idx.shape[1])
+        recs["idx"][:, :k] = idx[:, :k]
+        recs["score"][:, :k] = scores[:, :k]
+        self._file.write(recs.tobytes())
+        self._file.flush()
+        self.records += len(recs)
+
+    def _open(self, day: date):
+        if self._file is not None:
+            self._file.close()
+        self.scores_dir.mkdir(parents=True, exist_ok=True)
+        path = self.scores_dir / f"{day.isoformat()}{SUFFIX}"
+        if path.exists() and path.stat().st_size >= _HEADER.size:
+            k, _classes = _read_header(path)
+            self._dtype = record_dtype(k)
+            # Drop a partial record left by a crash so the file stays aligned
+            body = path.stat().st_size - _HEADER.size
+            if body % self._dtype.itemsize:
+                with open(path, "r+b") as f:
+                    f.truncate(_HEADER.size + body - body % self._dtype.itemsize)
+            self._file = open(path, "ab")
+        else:
+            self._dtype = record_dtype(self.k)
+            self._file = open(path, "wb")
+            self._file.write(_HEADER.pack(_MAGIC, _VERSION, self.k, self.classes))
+        self._day = day
+        self._path = path
+        logger.debug("Score store: appending to %s", path)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                self._day = None
+
+
+def _read_header(path: Path) -> tuple[int, int]:
+    with open(path, "rb") as f:
+        magic, version, k, classes = _HEADER.unpack(f.read(_HEADER.size))
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError(f"{path} is not a version {_VERSION} score file")
+    return k, classes
+
+
+def read_day(scores_dir: Path, day: date) -> np.ndarray | None:
+    """Memory-map one day's records, or None if there are none."""
+    path = scores_dir / f"{day.isoformat()}{SUFFIX}"
+    if not path.exists() or path.stat().st_size <= _HEADER.size:
+        return None
+    k, _classes = _read_header(path)
+    dtype = record_dtype(k)
+    n = (path.stat().st_size - _HEADER.size) // dtype.itemsize
+    if n == 0:
+        return None
+    return np.memmap(path, dtype=dtype, mode="r", offset=_HEADER.size, shape=(n,))
+
+
+def load_labels(labels_path: Path) -> tuple[list[str], list[str]]:
+    """(common, scientific) names by label index from a BirdNET labels file."""
+    common, scientific = [], []
+    for line in labels_path.read_text().splitlines():
+        sci, _, com = line.strip().partition("_")
+        scientific.append(sci)
+        common.append(com or sci)
+    return common, scientific
+
+
+def _replay_tracker(times: np.ndarray, min_count: int, window_ms: int) -> np.ndarray:
+    """Which of one species' hits (sorted ms timestamps) DetectionTracker would save."""
+    saved = np.zeros(len(times), dtype=bool)
+    if min_count <= 1:
+        saved[:] = True
+        return saved
+    pending: deque[int] = deque()
+    confirmed_at: int | None = None
+    for i, t in enumerate(times):
+        cutoff = t - window_ms
+        while pending and times[pending[0]] <= cutoff:
+            pending.popleft()
+        if confirmed_at is not None and confirmed_at <= cutoff:
+            confirmed_at = None
+        if confirmed_at is not None:
+            saved[i] = True
+            continue
+        pending.append(i)
+        if len(pending) >= min_count:
+            confirmed_at = int(t)
+            saved[list(pending)] = True
+            pending.clear()
+    return saved
+
+
+def replay(scores_dir: Path, start: date, end: date, threshold: float,
+           allowed: np.ndarray | None = None, min_count: int = 1,
+           window_seconds: float = 300) -> dict:
+    """Re-run thresholding, species masking and the tracker over stored scores.
+
+    allowed is an optional array of label indices to keep. Returns
+    per-species hit and saved counts plus the saved detections as arrays
+    (epoch milliseconds, label index, score). The tracker runs on detection
+    time rather than processing time, so backlogs replay as recorded.
+    """
+    out_ms, out_idx, out_score = [], [], []
+    chunks = 0
+    day = start
+    while day <= end:
+        recs = read_day(scores_dir, day)
+        day_ms = int(datetime.combine(day, datetime.min.time()).timestamp() * 1000)
+        day += timedelta(days=1)
+        if recs is None:
+            continue
+        chunks += len(recs)
+        scores = recs["score"].astype(np.float32)
+        hit = scores >= threshold
+        if allowed is not None:
+            hit &= np.isin(recs["idx"], allowed)
+        rows, cols = np.nonzero(hit)
+        out_ms.append(recs["ms"][rows].astype(np.int64) + day_ms)
+        out_idx.append(recs["idx"][rows, cols].astype(np.int64))
+        out_score.append(scores[rows, cols])
+
+    ms = np.concatenate(out_ms) if out_ms else np.zeros(0, dtype=np.int64)
+    idx = np.concatenate(out_idx) if out_idx else np.zeros(0, dtype=np.int64)
+    score = np.concatenate(out_score) if out_score else np.zeros(0, dtype=np.float32)
+
+    order = np.lexsort((ms, idx))
+    ms, idx, score = ms[order], idx[order], score[order]
+    saved = np.zeros(len(ms), dtype=bool)
+    bounds = np.flatnonzero(np.diff(idx)) + 1
+    for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(idx)]):
+        if hi > lo:
+            saved[lo:hi] = _replay_tracker(ms[lo:hi], min_count, int(window_seconds * 1000))
+
+    species, hits = np.unique(idx, return_counts=True)
+    saved_counts = np.bincount(idx[saved], minlength=int(species.max()) + 1) if len(species) else []
+    return {
+        "chunks": chunks,
+        "hits": len(ms),
+        "saved": int(saved.sum()),
+        "species": {int(s): {"hits": int(h), "saved": int(saved_counts[s])}
+                    for s, h in zip(species, hits)},
+        "detections": (ms[saved], idx[saved], score[saved]),
+    }
+
+
+def _species_indices(labels: tuple[list[str], list[str]], names: list[str]) -> np.ndarray:
+    common, scientific = labels
+    wanted = {n.strip().lower() for n in names if n.strip()}
+    return np.array([i for i, (c, s) in enumerate(zip(common, scientific))
+                     if c.lower() in wanted or s.lower() in wanted or f"{s}_{c}".lower() in wanted],
+                    dtype=np.int64)
+
+
+def summarize(result: dict, labels: tuple[list[str], list[str]], detections: bool = False) -> dict:
+    """JSON-friendly replay result with label names."""
+    common, scientific = labels
+    out = {
+        "chunks": result["chunks"],
+        "hits": result["hits"],
+        "saved": result["saved"],
+        "species": sorted(
+            ({"common_name": common[i], "scientific_name": scientific[i], **counts}
+             for i, counts in result["species"].items()),
+            key=lambda s: -s["saved"],
+        ),
+    }
+    if detections:
+        ms, idx, score = result["detections"]
+        out["detections"] = [
+            {"time": datetime.fromtimestamp(m / 1000).isoformat(timespec="milliseconds"),
+             "common_name": common[i], "confidence": round(float(s), 3)}
+            for m, i, s in zip(ms.tolist(), idx.tolist(), score.tolist())
+        ]
+    return out
+
+
+def main():
+    import yaml
+
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    rp = sub.add_parser("replay", help="re-threshold stored scores over a date range")
+    rp.add_argument("--start", type=date.fromisoformat, required=True)
+    rp.add_argument("--end", type=date.fromisoformat, help="default: --start")
+    rp.add_argument("--threshold", type=float, help="default: confidence_threshold")
+    rp.add_argument("--min-count", type=int, help="default: min_detection_count")
+    rp.add_argument("--window", type=float, help="default: detection_window_seconds")
+    rp.add_argument("--species-list", type=Path,
+                    help="only species named in this file (one label or name per line)")
+    rp.add_argument("--detections", action="store_true", help="also list every saved detection")
+    args = parser.parse_args()
+
+    backend = Path(__file__).parent
+    with open(backend / "config.yml") as f:
+        config = yaml.safe_load(f)
+    scores_dir = backend / config["data_dir"] / "scores"
+    labels = load_labels(backend / config["model"]["labels"])
+
+    allowed = None
+    if args.species_list:
+        allowed = _species_indices(labels, args.species_list.read_text().splitlines())
+
+    result = replay(
+        scores_dir, args.start, args.end or args.start,
+        threshold=args.threshold if args.threshold is not None else config["confidence_threshold"],
+        allowed=allowed,
+        min_count=args.min_count if args.min_count is not None else config.get("min_detection_count", 2),
+        window_seconds=args.window if args.window is not None else config.get("detection_window_seconds", 300),
+    )
+    print(json.dumps(summarize(result, labels, args.detections), indent=2))
+
+
+if __name__ == "__main__":
+    main()
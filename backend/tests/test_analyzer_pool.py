@@ -0,0 +1,36 @@
+"""AnalyzerPool result ordering, with threads standing in for worker processes."""
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+analyzer = pytest.importorskip("analyzer")
+
+
+def test_groups_written_in_filename_order(monkeypatch):
+    written = []
+
+    def infer(wav_paths):
+        # Later files finish first
+        time.sleep(0.3 if wav_paths[0].name < "2026-05-01-06-00-30.wav" else 0.05)
+        return [(p, []) for p in wav_paths], {"stages": {}, "counters": {}}, (0, None)
+
+    monkeypatch.setattr(analyzer, "_infer_files_in_worker", infer)
+    monkeypatch.setattr(analyzer, "_handle_results", lambda prepared, _r: written.append(prepared.name))
+    monkeypatch.setattr(analyzer.AnalyzerPool, "_new_executor",
+                        lambda self: ThreadPoolExecutor(max_workers=self.workers))
+
+    pool = analyzer.AnalyzerPool(2)
+    # Submitted out of order, e.g. a live file ahead of the rest of a backlog
+    pool.submit([Path("2026-05-01-06-00-45.wav"), Path("2026-05-01-06-00-30.wav")])
+    pool.submit([Path("2026-05-01-06-00-15.wav")])
+    pool.submit([Path("2026-05-01-06-00-00.wav")])
+    pool.close()
+
+    assert written == ["2026-05-01-06-00-00.wav", "2026-05-01-06-00-15.wav",
+                       "2026-05-01-06-00-30.wav", "2026-05-01-06-00-45.wav"]
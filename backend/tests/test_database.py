@@ -0,0 +1,109 @@
+"""Detections database: ts column and schema migrations."""
+
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import database  # noqa: E402
+
+
+@pytest.fixture
+def berlin(monkeypatch):
+    """Run with a timezone that has DST, as SQLite's 'localtime'/'utc' see it."""
+    monkeypatch.setenv("TZ", "Europe/Berlin")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def _row(date: str, clock: str, name: str = "Turdus merula") -> tuple:
+    return (date, clock, "Blackbird", name, 0.9, f"{date}_{clock}.png", f"{date}_{clock}.mp3")
+
+
+def _ts_order(data_dir: str) -> list[tuple[str, str]]:
+    conn = sqlite3.connect(database._get_db_path(data_dir))
+    try:
+        return conn.execute("SELECT date, time FROM detections ORDER BY ts DESC, id DESC").fetchall()
+    finally:
+        conn.close()
+
+
+def test_ts_orders_like_date_and_time_across_dst(tmp_path, berlin):
+    data_dir = str(tmp_path)
+    database.init_db(data_dir)
+    # 02:30 on 2026-03-29 doesn't exist in Berlin; ingest can still produce it
+    rows = [_row("2026-03-29", "01:59:59"), _row("2026-03-29", "02:30:00"),
+            _row("2026-03-29", "03:00:01"), _row("2026-10-25", "02:30:00")]
+    database.insert_detections(data_dir, rows)
+
+    expected = sorted(((r[0], r[1]) for r in rows), reverse=True)
+    assert _ts_order(data_dir) == expected
+    assert [(r["date"], r["time"]) for r in database.get_recent(data_dir, 10)] == expected
+
+
+def test_trigger_fills_ts_like_insert(tmp_path):
+    data_dir = str(tmp_path)
+    database.init_db(data_dir)
+    database.insert_detections(data_dir, [_row("2026-05-01", "06:00:00")])
+    conn = sqlite3.connect(database._get_db_path(data_dir))
+    try:
+        with conn:
+            conn.execute("INSERT INTO detections (date, time, common_name, scientific_name, "
+                         "confidence, file_path, audio_path) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         _row("2026-05-01", "06:00:00"))
+        assert len({r[0] for r in conn.execute("SELECT ts FROM detections")}) == 1
+    finally:
+        conn.close()
+
+
+def test_migration_recomputes_utc_ts(tmp_path, berlin):
+    data_dir = str(tmp_path)
+    database.init_db(data_dir)
+    database.insert_detections(data_dir, [_row("2026-03-29", "01:59:59"),
+                                          _row("2026-03-29", "02:30:00")])
+    # Roll back to version 2, which stored ts converted to UTC
+    conn = sqlite3.connect(database._get_db_path(data_dir))
+    with conn:
+        conn.execute("UPDATE detections SET ts = CAST(strftime('%s', date || ' ' || time, 'utc') "
+                     "AS INTEGER)")
+        conn.execute("PRAGMA user_version = 2")
+    conn.close()
+
+    database.init_db(data_dir)
+
+    assert _ts_order(data_dir) == [("2026-03-29", "02:30:00"), ("2026-03-29", "01:59:59")]
+    conn = sqlite3.connect(database._get_db_path(data_dir))
+    try:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == database.SCHEMA_VERSION
+    finally:
+        conn.close()
+
+
+def test_pool_counts_every_acquire_across_threads(tmp_path):
+    data_dir = str(tmp_path)
+    database.init_db(data_dir)
+    before = database.pool_stats()
+
+    def query():
+        for _ in range(300):
+            database.get_recent(data_dir, 1)
+
+    threads = [threading.Thread(target=query) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    after = database.pool_stats()
+    # Each acquire is either a reuse (hit) or a fresh connection (opened)
+    acquires = sum(after[k] - before[k] for k in ("hits", "opened"))
+    assert acquires == 8 * 300
+    assert after["opened"] - before["opened"] <= database.POOL_SIZE
+    database.close_pool(data_dir)
@@ -0,0 +1,52 @@
+"""DetectionTracker confirmation window on audio time."""
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+analyzer = pytest.importorskip("analyzer")
+
+_T0 = datetime(2026, 5, 1, 6, 0, 0)
+_AUDIO = np.zeros(480, dtype=np.float32)
+
+
+def _hit(tracker, seconds: float, species: str = "Turdus merula"):
+    when = _T0 + timedelta(seconds=seconds)
+    return tracker.track(_AUDIO, 48000, when, "Blackbird", species, 0.9,
+                         now=when.timestamp())
+
+
+def test_hits_within_window_confirm():
+    tracker = analyzer.DetectionTracker(min_count=2, window_seconds=300)
+    assert _hit(tracker, 0) == []
+    assert len(_hit(tracker, 100)) == 2
+    # Confirmed: the next hit inside the window is saved straight away
+    assert len(_hit(tracker, 200)) == 1
+
+
+def test_hits_far_apart_do_not_confirm():
+    tracker = analyzer.DetectionTracker(min_count=2, window_seconds=300)
+    assert _hit(tracker, 0) == []
+    assert _hit(tracker, 1000) == []
+    assert tracker.snapshot()["pending"] == 1
+
+
+def test_time_going_backwards_does_not_confirm():
+    # A live file analysed ahead of a rescanned backlog
+    tracker = analyzer.DetectionTracker(min_count=2, window_seconds=300)
+    assert _hit(tracker, 200000) == []
+    assert _hit(tracker, 100000) == []
+    assert tracker.snapshot()["pending"] == 1
+
+
+def test_confirmation_does_not_reach_back_in_time():
+    tracker = analyzer.DetectionTracker(min_count=2, window_seconds=300)
+    _hit(tracker, 200000)
+    assert len(_hit(tracker, 200010)) == 2
+    assert _hit(tracker, 100000) == []
+    assert tracker.pending_bytes == 480 * 2
@@ -0,0 +1,98 @@
+"""IngestQueue overflow and rescan behaviour."""
+
+import os
+import sys
+import time
+import wave
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+analyzer = pytest.importorskip("analyzer")
+
+
+def _write_wav(path: Path, age_seconds: float = 0.0):
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(48000)
+        w.writeframes(b"\0\0" * 480)
+    if age_seconds:
+        old = time.time() - age_seconds
+        os.utime(path, (old, old))
+
+
+def test_file_dropped_during_overflow_is_picked_up(tmp_path, monkeypatch):
+    processed = []
+
+    def process_wavs(paths):
+        # Like the real one: handled files are removed from StreamData/
+        time.sleep(0.1)
+        for path in paths:
+            processed.append(path.name)
+            path.unlink()
+
+    monkeypatch.setattr(analyzer, "analysis_pool", None)
+    monkeypatch.setattr(analyzer, "_files_per_batch", lambda: 1)
+    monkeypatch.setattr(analyzer, "process_wavs", process_wavs)
+    monkeypatch.setattr(analyzer.IngestQueue, "_SETTLE_SECONDS", 0.3)
+
+    q = analyzer.IngestQueue(tmp_path, maxsize=1)
+    first = tmp_path / "2026-05-01-06-00-00.wav"
+    _write_wav(first, age_seconds=10)
+    assert q.put(first)
+
+    # Queue full: this one overflows and is left for the rescan
+    overflowed = tmp_path / "2026-05-01-06-00-15.wav"
+    _write_wav(overflowed, age_seconds=10)
+    assert not q.put(overflowed)
+
+    # Closed just now, while the queue was full; its event was lost too
+    fresh = tmp_path / "2026-05-01-06-00-30.wav"
+    _write_wav(fresh)
+
+    q.start()
+    try:
+        deadline = time.monotonic() + 5
+        while len(processed) < 3 and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        q.stop()
+
+    assert processed == [first.name, overflowed.name, fresh.name]
+
+
+def test_live_file_waits_behind_backlog(tmp_path, monkeypatch):
+    processed = []
+
+    def process_wavs(paths):
+        time.sleep(0.05)
+        for path in paths:
+            processed.append(path.name)
+            path.unlink()
+
+    monkeypatch.setattr(analyzer, "analysis_pool", None)
+    monkeypatch.setattr(analyzer, "_files_per_batch", lambda: 1)
+    monkeypatch.setattr(analyzer, "process_wavs", process_wavs)
+
+    backlog = [tmp_path / f"2026-05-01-06-00-0{i}.wav" for i in range(6)]
+    for path in backlog:
+        _write_wav(path, age_seconds=60)
+    q = analyzer.IngestQueue(tmp_path, maxsize=2)
+    q.request_rescan()
+    q.start()
+    try:
+        # Close events for a new recording while the backlog is draining
+        live = tmp_path / "2026-05-02-07-00-00.wav"
+        _write_wav(live, age_seconds=30)
+        q.put(live)
+        q.put(live)
+        deadline = time.monotonic() + 5
+        while len(processed) < 7 and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        q.stop()
+
+    assert processed == [p.name for p in backlog] + [live.name]
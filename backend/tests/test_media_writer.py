@@ -0,0 +1,64 @@
+"""MediaWriter back-pressure and WAV deletion after saves complete."""
+
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+analyzer = pytest.importorskip("analyzer")
+
+_WHEN = datetime(2026, 5, 1, 6, 0, 0)
+
+
+@pytest.fixture
+def slow_writes(monkeypatch):
+    """_write_detection blocks until the returned event is set."""
+    release = threading.Event()
+    written = []
+
+    def write(_audio, _sr, _when, common_name, *_rest):
+        release.wait(5)
+        written.append(common_name)
+
+    monkeypatch.setattr(analyzer, "_write_detection", write)
+    return release, written
+
+
+def test_wav_deleted_only_after_its_saves(tmp_path, monkeypatch, slow_writes):
+    release, written = slow_writes
+    writer = analyzer.MediaWriter(1, maxsize=4)
+    monkeypatch.setattr(analyzer, "media_writer", writer)
+    monkeypatch.setattr(analyzer, "db_writer", None)
+    reaper = analyzer.WavReaper()
+    monkeypatch.setattr(analyzer, "wav_reaper", reaper)
+
+    wav = tmp_path / "2026-05-01-06-00-00.wav"
+    wav.write_bytes(b"RIFF")
+    analyzer.save_detection(np.zeros(10), 48000, _WHEN, "Blackbird", "Turdus merula", 0.9)
+    reaper.submit(wav)
+
+    time.sleep(0.2)
+    assert wav.exists() and reaper.waiting(wav.name)
+
+    release.set()
+    reaper.close()
+    writer.close()
+    assert written == ["Blackbird"]
+    assert not wav.exists() and not reaper.waiting(wav.name)
+
+
+def test_full_queue_waits_instead_of_dropping(slow_writes):
+    release, written = slow_writes
+    writer = analyzer.MediaWriter(1, maxsize=1)
+    threading.Timer(0.3, release.set).start()
+    for name in ("a", "b", "c"):
+        assert writer.submit(np.zeros(10), 48000, _WHEN, name, "x", 0.9)
+    writer.close()
+    assert written == ["a", "b", "c"]
+    assert writer.snapshot()["dropped"] == 0
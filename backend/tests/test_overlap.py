@@ -0,0 +1,45 @@
+"""Overlapping windows: batch sizing and per-window detection files."""
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+analyzer = pytest.importorskip("analyzer")
+
+
+def _config(overlap: float) -> dict:
+    return {"audio": {"sample_rate": 48000, "record_duration": 15, "chunk_duration": 3,
+                      "overlap": overlap, "clip_format": "flac"},
+            "model": {"batch_size": 20}}
+
+
+@pytest.mark.parametrize("overlap, files", [(0.0, 4), (1.5, 2), (2.5, 1)])
+def test_files_per_batch_counts_windows_from_the_hop(monkeypatch, overlap, files):
+    # 15 s files: 5 windows without overlap, 10 at a 1.5 s hop, 30 at 0.5 s
+    monkeypatch.setattr(analyzer, "config", _config(overlap))
+    assert analyzer._files_per_batch() == files
+
+
+def test_windows_under_a_second_apart_get_their_own_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(analyzer, "config", _config(2.5))
+    monkeypatch.setattr(analyzer, "data_dir", tmp_path)
+    monkeypatch.setattr(analyzer, "db_writer", None)
+    monkeypatch.setattr(analyzer.database, "insert_detection", lambda *_a: None)
+    monkeypatch.setattr(analyzer.spec_module, "generate_spectrogram",
+                        lambda _a, _sr, path, *_r: Path(path).write_bytes(b"png"))
+    monkeypatch.setattr(analyzer.clip_encoder, "encode_clip",
+                        lambda _a, _sr, path, _fmt: Path(path).write_bytes(b"clip"))
+
+    start = datetime(2026, 5, 1, 6, 0, 0)
+    for i in range(3):
+        analyzer._write_detection(np.zeros(10, dtype=np.float32), 48000,
+                                  start + timedelta(seconds=0.5 * i),
+                                  "Blackbird", "Turdus merula", 0.9)
+
+    pngs = sorted(p.name for p in tmp_path.rglob("*.png"))
+    assert pngs == ["06-00-00-000_0.90.png", "06-00-00-500_0.90.png", "06-00-01-000_0.90.png"]
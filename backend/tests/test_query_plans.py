@@ -0,0 +1,30 @@
+"""EXPLAIN QUERY PLAN regression test for the detections list queries."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import database  # noqa: E402
+
+
+def test_detections_queries_use_indexes_without_sorting(tmp_path):
+    data_dir = str(tmp_path)
+    database.init_db(data_dir)
+    rows = [(f"2026-05-0{d}", f"0{h}:00:00", "Blackbird", "Turdus merula", 0.9,
+             "x.png", "x.mp3") for d in range(1, 4) for h in range(6)]
+    database.insert_detections(data_dir, rows)
+
+    assert database.check_query_plans(data_dir) == []
+
+
+def test_check_flags_a_sorting_query(tmp_path, monkeypatch):
+    data_dir = str(tmp_path)
+    monkeypatch.setattr(database, "_plan_checks", lambda: [
+        ("by confidence", "SELECT * FROM detections ORDER BY confidence DESC", []),
+    ])
+
+    problems = database.check_query_plans(data_dir)
+
+    assert problems == ["by confidence: SCAN detections",
+                        "by confidence: USE TEMP B-TREE FOR ORDER BY"]
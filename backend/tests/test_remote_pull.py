@@ -0,0 +1,159 @@
+"""Pull mode against a real pi_audio_server --no-record serving fixture WAVs."""
+
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+BACKEND = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND))
+
+pytest.importorskip("fastapi")
+pytest.importorskip("uvicorn")
+analyzer = pytest.importorskip("analyzer")
+import database  # noqa: E402
+import remote_client  # noqa: E402
+
+_NAMES = [f"2026-05-01-06-00-{s:02d}.wav" for s in range(0, 60, 10)]
+
+
+def _write_wav(path: Path, seconds: float = 1.0, sr: int = 48000):
+    pcm = (np.sin(np.arange(int(sr * seconds)) * 0.05) * 8000).astype("<i2")
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sr)
+        wav.writeframes(pcm.tobytes())
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def server(tmp_path):
+    """A pi_audio_server copy whose StreamData/ holds the fixture WAVs; yields (url, dir)."""
+    root = tmp_path / "pi"
+    root.mkdir()
+    for name in ("pi_audio_server.py", "capture.py", "pcm_frames.py", "config.yml"):
+        shutil.copy(BACKEND / name, root / name)
+    stream_dir = root / "data" / "StreamData"
+    stream_dir.mkdir(parents=True)
+    for name in _NAMES:
+        _write_wav(stream_dir / name)
+
+    port = _free_port()
+    proc = subprocess.Popen([sys.executable, "pi_audio_server.py", "--no-record",
+                             "--port", str(port)], cwd=root,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    client = remote_client.AudioServerClient(url, timeout=2, max_retries=0)
+    try:
+        deadline = time.monotonic() + 20
+        while True:
+            try:
+                if client.request("GET", "/status")[0] == 200:
+                    break
+            except remote_client.RemoteError:
+                pass
+            if proc.poll() is not None or time.monotonic() > deadline:
+                pytest.fail("pi_audio_server did not start")
+            time.sleep(0.2)
+        client.close()
+        yield url, stream_dir
+    finally:
+        proc.terminate()
+        proc.wait(10)
+
+
+def test_download_batch_pages_and_delete_batch_is_idempotent(server, tmp_path):
+    url, stream_dir = server
+    client = remote_client.AudioServerClient(url, timeout=5, max_retries=1)
+    spool = tmp_path / "spool"
+    spool.mkdir()
+
+    first = client.download_batch(spool, limit=4)
+    rest = client.download_batch(spool, since=first[-1].name, limit=4)
+    assert [p.name for p in first + rest] == _NAMES
+    assert all(p.read_bytes() == (stream_dir / p.name).read_bytes() for p in first + rest)
+    assert client.download_batch(spool, since=_NAMES[-1]) == []
+    assert not list(spool.glob("*.part"))
+
+    assert client.delete_batch(_NAMES[:2]) == _NAMES[:2]
+    # A retried delete: names already gone are not an error
+    assert client.delete_batch(_NAMES[:3]) == _NAMES[2:3]
+    assert sorted(p.name for p in stream_dir.iterdir()) == _NAMES[3:]
+    assert client.download_batch(spool, limit=10)[0].name == _NAMES[3]
+    client.close()
+
+
+def test_server_copies_deleted_only_after_detections_commit(server, tmp_path, monkeypatch):
+    url, stream_dir = server
+    data_dir = tmp_path / "analyzer"
+    database.init_db(str(data_dir))
+    # A long commit window, so deleting before the commit would be caught
+    writer = database.DetectionWriter(str(data_dir), max_delay=0.5)
+    monkeypatch.setattr(analyzer, "db_writer", writer)
+    monkeypatch.setattr(analyzer, "media_writer", None)
+    monkeypatch.setattr(analyzer, "config", {"audio": {"sample_rate": 48000, "record_duration": 1,
+                                                       "chunk_duration": 3},
+                                             "model": {"batch_size": 2}})
+
+    def process_wavs(paths):
+        # One detection per file, queued for group commit like _handle_results
+        for path in paths:
+            writer.submit(("2026-05-01", path.stem[-8:].replace("-", ":"), "Blackbird",
+                           "Turdus merula", 0.9, path.name, path.name))
+            path.unlink()
+        return list(paths)
+
+    monkeypatch.setattr(analyzer, "process_wavs", process_wavs)
+
+    client = remote_client.AudioServerClient(url, timeout=5, max_retries=0)
+    real_delete = client.delete_batch
+    calls, early = [], []
+
+    def delete_batch(names):
+        conn = sqlite3.connect(database._get_db_path(str(data_dir)))
+        try:
+            committed = {r[0] for r in conn.execute("SELECT file_path FROM detections")}
+        finally:
+            conn.close()
+        early.extend(set(names) - committed)
+        calls.append(list(names))
+        if len(calls) == 1:
+            raise remote_client.RemoteError("POST /wavs/delete: connection reset")
+        return real_delete(names)
+
+    monkeypatch.setattr(client, "delete_batch", delete_batch)
+
+    puller = analyzer.RemotePuller(client, tmp_path / "spool", prefetch=2, poll_seconds=0.2)
+    puller.start()
+    runner = threading.Thread(target=puller.run, daemon=True)
+    runner.start()
+    deadline = time.monotonic() + 20
+    while any(stream_dir.iterdir()) and time.monotonic() < deadline:
+        time.sleep(0.1)
+    puller.stop()
+    runner.join(5)
+    puller.close()
+    writer.close()
+    database.close_pool(str(data_dir))
+
+    assert early == [], "server copies deleted before their detections were committed"
+    assert not any(stream_dir.iterdir())
+    # The first delete failed and its names were sent again
+    assert set(calls[0]) <= set(calls[1])
+    assert puller.stats["delete_failures"] == 1
+    assert puller.stats["deleted"] == len(_NAMES)
+    assert puller.stats["downloaded"] == len(_NAMES)
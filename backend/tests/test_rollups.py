@@ -0,0 +1,99 @@
+"""Rollup tables answer the dashboard queries exactly as a scan of detections does."""
+
+import random
+import sqlite3
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import database  # noqa: E402
+
+_SPECIES = [("Blackbird", "Turdus merula"), ("Robin", "Erithacus rubecula"),
+            ("Great Tit", "Parus major"), ("Wren", "Troglodytes troglodytes"),
+            ("Chaffinch", "Fringilla coelebs")]
+
+
+def _rows(rng: random.Random, n: int) -> list[tuple]:
+    today = date.today()
+    rows = []
+    for _ in range(n):
+        day = (today - timedelta(days=rng.randrange(10))).isoformat()
+        clock = f"{rng.randrange(24):02d}:{rng.randrange(60):02d}:{rng.randrange(60):02d}"
+        common, scientific = rng.choice(_SPECIES)
+        rows.append((day, clock, common, scientific, round(rng.uniform(0.5, 1.0), 3),
+                     "x.png", "x.mp3"))
+    return rows
+
+
+def _baseline(data_dir: str) -> dict:
+    """The pre-rollup queries, GROUP BY over detections (ties broken by scientific_name)."""
+    conn = sqlite3.connect(database._get_db_path(data_dir))
+    conn.row_factory = sqlite3.Row
+    today = date.today().isoformat()
+    week_ago = (date.today() - timedelta(days=7)).isoformat()
+    try:
+        one = lambda sql, *args: conn.execute(sql, args).fetchone()[0]  # noqa: E731
+        every = lambda sql, *args: [dict(r) for r in conn.execute(sql, args)]  # noqa: E731
+        overview = {
+            "total_detections": one("SELECT COUNT(*) FROM detections"),
+            "unique_species": one("SELECT COUNT(DISTINCT scientific_name) FROM detections"),
+            "today_count": one("SELECT COUNT(*) FROM detections WHERE date = ?", today),
+            "week_count": one("SELECT COUNT(*) FROM detections WHERE date >= ?", week_ago),
+            "top_species": every("SELECT common_name, scientific_name, COUNT(*) as count "
+                                 "FROM detections GROUP BY scientific_name "
+                                 "ORDER BY count DESC, scientific_name LIMIT 10"),
+        }
+        species = every("SELECT common_name, scientific_name, COUNT(*) as count, "
+                        "MAX(confidence) as max_confidence, MAX(date) as last_seen "
+                        "FROM detections GROUP BY scientific_name "
+                        "ORDER BY count DESC, scientific_name")
+        by_hour = {d: every("SELECT substr(time, 1, 2) as hour, COUNT(*) as count "
+                            "FROM detections WHERE date = ? GROUP BY hour ORDER BY hour", d)
+                   for (d,) in conn.execute("SELECT DISTINCT date FROM detections")}
+    finally:
+        conn.close()
+    return {"overview": overview, "species": species, "by_hour": by_hour}
+
+
+def _from_rollups(data_dir: str, days) -> dict:
+    return {"overview": database.get_overview(data_dir),
+            "species": database.get_species(data_dir),
+            "by_hour": {d: database.get_by_hour(data_dir, d) for d in days}}
+
+
+def _assert_same(data_dir: str):
+    expected = _baseline(data_dir)
+    assert _from_rollups(data_dir, expected["by_hour"]) == expected
+
+
+def test_rollups_match_detections_through_backfill_inserts_and_deletes(tmp_path):
+    data_dir = str(tmp_path)
+    rng = random.Random(24)
+
+    # A version 0 database: detections only, filled before the rollups existed
+    db_path = database._get_db_path(data_dir)
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.executescript(database.SCHEMA)
+        conn.executemany("INSERT INTO detections (date, time, common_name, scientific_name, "
+                         "confidence, file_path, audio_path) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         _rows(rng, 2000))
+    conn.close()
+
+    database.init_db(data_dir)
+    _assert_same(data_dir)
+
+    database.insert_detections(data_dir, _rows(rng, 500))
+    _assert_same(data_dir)
+
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute("DELETE FROM detections WHERE id % 7 = 0")
+        # Every detection of one species on one day, so its rollup rows go too
+        conn.execute("DELETE FROM detections WHERE scientific_name = 'Parus major' "
+                     "AND date = (SELECT MAX(date) FROM detections)")
+    conn.close()
+    _assert_same(data_dir)
+    database.close_pool(data_dir)